@@ -9,27 +9,37 @@ are left untouched and graded later by the LLM tier.
 
 from __future__ import annotations
 
+from functools import lru_cache
 import json
 import os
 from pathlib import Path
+from typing import Any
 from xml.etree import ElementTree
 
 
-def _read_criterion_max(criteria_path: str, dotted_id: str) -> float | None:
-    """Best-effort lookup of a criterion's max_points from the YAML file."""
+@lru_cache(maxsize=None)
+def _criteria_index(criteria_path: str) -> Any:
+    """Parse the criteria file once and index its leaves by dotted id."""
     try:
-        import yaml  # PyYAML ships with StudentScore
-    except ModuleNotFoundError:
+        from StudentScore import yaml
+        from StudentScore.cache import load_criteria
+        from StudentScore.index import CriteriaIndex
+    except ImportError:
         return None
     try:
-        data = yaml.safe_load(Path(criteria_path).read_text(encoding="utf-8"))
-    except (OSError, yaml.YAMLError):
+        data, _ = load_criteria(criteria_path)
+    except (OSError, ValueError, yaml.YAMLError):
         return None
-    node = data.get("criteria", {}) if isinstance(data, dict) else {}
-    for part in dotted_id.split("."):
-        if not isinstance(node, dict):
-            return None
-        node = node.get(part, {})
+    section = data.get("criteria") if isinstance(data, dict) else None
+    if not isinstance(section, dict):
+        return None
+    return CriteriaIndex.from_raw(section)
+
+
+def _read_criterion_max(criteria_path: str, dotted_id: str) -> float | None:
+    """Best-effort lookup of a criterion's max_points from the YAML file."""
+    index = _criteria_index(criteria_path)
+    node = index.get(dotted_id) if index is not None else None
     if isinstance(node, dict):
         value = node.get("max_points")
         if isinstance(value, (int, float)):
@@ -1,4 +1,15 @@
-from .score import Score
+from __future__ import annotations
+
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use, so the command line does not pay for it.
+    if name == "Score":
+        from .score import Score
+
+        return Score
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ["Score"]
@@ -5,56 +5,42 @@ The same shape is produced both by objective test harnesses (tests passed ->
 points) and by the LLM grader (``score grade --llm``), so a single ``score
 apply`` command closes the loop for both grading tiers.
 
-Applying mutates the *raw* YAML (before schema normalization) so the file keeps
+Applying updates the *raw* YAML (before schema normalization) so the file keeps
 its version 2 layout (``awarded_points`` / ``max_points`` / ``bonus_points``);
 version 1 files (``$points`` / ``$bonus``) are supported too.
+
+Both :func:`apply_results` and :func:`filter_milestone` are copy-on-write:
+the input is never modified, only the mappings on the path to a changed leaf
+are copied, and every other subtree is shared with the input. One loaded
+rubric can thus serve several graders or what-if evaluations at once.
 """
 
 from __future__ import annotations
 
 import sys
-from typing import Any, Dict, Iterator, List, Mapping, Tuple
-
-
-def _is_raw_item(value: Any) -> bool:
-    """Return True when a raw YAML node is a leaf criterion, not a section."""
-    if not isinstance(value, dict):
-        return False
-    keys = {str(k) for k in value.keys()}
-    if keys & {"awarded_points", "max_points", "bonus_points"}:
-        return True
-    return bool(keys) and all(k.startswith("$") for k in keys)
-
-
-def _iter_raw_leaves(
-    node: Mapping[str, Any],
-    prefix: Tuple[str, ...] = (),
-) -> Iterator[Tuple[Tuple[str, ...], Dict[str, Any]]]:
-    """Yield ``(path, item)`` for every leaf criterion in a raw section."""
-    for key, value in node.items():
-        skey = str(key)
-        if skey in {"description", "schema_version", "$description", "$desc"}:
-            continue
-        if not isinstance(value, dict):
-            continue
-        if _is_raw_item(value):
-            yield prefix + (skey,), value
-        else:
-            yield from _iter_raw_leaves(value, prefix + (skey,))
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
 
+from .index import CriteriaIndex
+from .milestones import MilestoneIndex
+from .model import CriteriaTree
+from .traversal import copy_path
 
-def _clamp(points: float, item: Dict[str, Any]) -> Tuple[float, str | None]:
-    """Clamp awarded points to the criterion's valid range; return a note if changed."""
-    total: float | None = None
+
+def _item_total(item: Dict[str, Any]) -> float | None:
+    """Return the available points of a raw leaf criterion, if declared."""
     if "max_points" in item:
-        total = float(item["max_points"])
-    elif "bonus_points" in item:
-        total = float(item["bonus_points"])
-    elif "$points" in item and isinstance(item["$points"], list):
-        total = float(item["$points"][1])
-    elif "$bonus" in item and isinstance(item["$bonus"], list):
-        total = float(item["$bonus"][1])
+        return float(item["max_points"])
+    if "bonus_points" in item:
+        return float(item["bonus_points"])
+    if "$points" in item and isinstance(item["$points"], list):
+        return float(item["$points"][1])
+    if "$bonus" in item and isinstance(item["$bonus"], list):
+        return float(item["$bonus"][1])
+    return None
+
 
+def _clamp(points: float, total: float | None) -> Tuple[float, str | None]:
+    """Clamp awarded points to the criterion's valid range; return a note if changed."""
     if total is None:
         return points, None
 
@@ -92,76 +78,107 @@ def _set_award(
 
 def filter_milestone(
     raw_criteria: Mapping[str, Any],
-    name: str,
+    name: str | Sequence[str],
 ) -> Tuple[Dict[str, Any], int]:
     """Return ``(filtered, kept)`` keeping only leaves tagged with a milestone.
 
     An intermediate review (``score grade --milestone <name>``) grades only
     the criteria carrying ``milestone: <name>`` (version 2) or ``$milestone:
-    <name>`` (version 1). Sections left without any leaf are dropped; section
-    descriptions, the ``grading`` block and the other top-level keys are kept
-    so the filtered mapping stays a valid criteria file.
+    <name>`` (version 1); a list of names keeps the leaves of each of them.
+    Sections left without any leaf are dropped; section descriptions, the
+    ``grading`` block and the other top-level keys are kept so the filtered
+    mapping stays a valid criteria file. Sections keeping all their entries
+    are shared with ``raw_criteria``, not copied.
+
+    Build a :class:`~StudentScore.milestones.MilestoneIndex` instead to cut
+    several views from one rubric.
     """
     section = raw_criteria.get("criteria")
     if not isinstance(section, dict):
         raise ValueError("criteria definition must be a mapping")
+    names = [name] if isinstance(name, str) else list(name)
+    return MilestoneIndex.from_raw(section).view(raw_criteria, names)
+
+
+def _apply_to_tree(
+    tree: CriteriaTree,
+    results: Iterable[Tuple[str, Any]],
+) -> Tuple[CriteriaTree, List[str], List[str]]:
+    """Merge results into a criteria tree, patching only touched subtotals."""
+    applied: List[str] = []
+    unknown: List[str] = []
+    for raw_id, payload in results:
+        cid = str(raw_id)
+        criterion = tree.find(cid)
+        if criterion is None:
+            unknown.append(cid)
+            continue
+        if not isinstance(payload, Mapping) or "awarded_points" not in payload:
+            unknown.append(cid)
+            continue
+        points = float(payload["awarded_points"])
+        clamped, note = _clamp(points, criterion.available)
+        if note is not None:
+            print(f"warning: {cid}: {note}", file=sys.stderr)
+        tree.set_points(criterion, clamped)
+        rationale = payload.get("rationale")
+        if rationale is not None:
+            criterion.rationale = rationale
+        applied.append(cid)
 
-    def prune(node: Mapping[str, Any]) -> Dict[str, Any]:
-        kept: Dict[str, Any] = {}
-        for key, value in node.items():
-            skey = str(key)
-            if skey in {"description", "$description", "$desc"}:
-                kept[key] = value
-                continue
-            if not isinstance(value, dict):
-                continue
-            if _is_raw_item(value):
-                if value.get("milestone", value.get("$milestone")) == name:
-                    kept[key] = value
-            else:
-                sub = prune(value)
-                if any(isinstance(child, dict) for child in sub.values()):
-                    kept[key] = sub
-        return kept
-
-    filtered = dict(raw_criteria)
-    filtered["criteria"] = prune(section)
-    kept = sum(1 for _ in _iter_raw_leaves(filtered["criteria"]))
-    return filtered, kept
+    return tree, applied, unknown
 
 
 def apply_results(
-    raw_criteria: Mapping[str, Any],
-    results: Mapping[str, Any],
-) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    raw_criteria: Mapping[str, Any] | CriteriaTree,
+    results: Mapping[str, Any] | Iterable[Tuple[str, Any]],
+    *,
+    index: CriteriaIndex[Dict[str, Any]] | None = None,
+) -> Tuple[Any, List[str], List[str]]:
     """Return ``(updated, applied_ids, unknown_ids)`` after merging results.
 
     ``raw_criteria`` is the full parsed YAML mapping (``criteria``, and
     optionally ``grading`` / ``schema_version``). ``results`` maps dotted
-    criterion ids to ``{"awarded_points": N, "rationale": "..."}``.
+    criterion ids to ``{"awarded_points": N, "rationale": "..."}``; an
+    iterable of ``(id, award)`` pairs is consumed lazily, in order, so a later
+    award to the same criterion replaces an earlier one.
+
+    ``raw_criteria`` is left untouched: the returned mapping copies the
+    sections and leaves on the path to each applied criterion and shares the
+    rest. A :class:`~StudentScore.model.CriteriaTree` is also accepted: it is
+    updated in place and returned, with the section subtotals kept current.
+
+    Pass the ``index`` of the raw ``criteria`` section to resolve ids without
+    indexing the rubric again. It stays valid for the returned mapping, which
+    has the same layout, so it can be passed along when applying more results.
     """
+    pairs = results.items() if isinstance(results, Mapping) else results
+    if isinstance(raw_criteria, CriteriaTree):
+        return _apply_to_tree(raw_criteria, pairs)
+
     updated = dict(raw_criteria)
     section = updated.get("criteria")
     if not isinstance(section, dict):
         raise ValueError("criteria definition must be a mapping")
 
-    by_id: Dict[str, Dict[str, Any]] = {
-        ".".join(path): item for path, item in _iter_raw_leaves(section)
-    }
+    if index is None:
+        index = CriteriaIndex.from_raw(section)
 
+    copies: Dict[Tuple[str, ...], Dict[Any, Any]] = {(): dict(section)}
+    updated["criteria"] = copies[()]
     applied: List[str] = []
     unknown: List[str] = []
-    for raw_id, payload in results.items():
+    for raw_id, payload in pairs:
         cid = str(raw_id)
-        item = by_id.get(cid)
-        if item is None:
+        if cid not in index:
             unknown.append(cid)
             continue
         if not isinstance(payload, Mapping) or "awarded_points" not in payload:
             unknown.append(cid)
             continue
+        item = copy_path(copies, index.path(cid))
         points = float(payload["awarded_points"])
-        clamped, note = _clamp(points, item)
+        clamped, note = _clamp(points, _item_total(item))
         if note is not None:
             print(f"warning: {cid}: {note}", file=sys.stderr)
         _set_award(item, clamped, payload.get("rationale"))
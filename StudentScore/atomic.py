@@ -0,0 +1,235 @@
+"""Atomic, lock-protected writes of criteria files.
+
+The objective and LLM grading tiers may rewrite the same ``criteria.yml`` at
+the same time on a shared runner. Files are therefore never written in place:
+the new content goes to a temporary file in the same directory, which then
+replaces the destination with :func:`os.replace`, so readers see either the
+old or the new file, never a truncated one. Pass ``fsync=True`` to also flush
+the file and its directory to disk before returning.
+
+Writers serialize on an advisory :mod:`fcntl` lock held on a ``.<name>.lock``
+file next to the destination, removed again when the lock is released so that
+nothing is left behind in the student repository; :func:`file_lock` gives up
+with :class:`LockTimeout` after ``timeout`` seconds, and :func:`file_locks`
+takes the locks of several files in a fixed order. Hold them around the whole
+read-modify-write, otherwise the second writer silently drops the awards of
+the first. Locking is skipped on platforms without :mod:`fcntl`.
+
+:class:`WriteBatch` writes several files and groups their fsyncs: every file
+is flushed once, then all of them are renamed into place, and each directory
+is flushed once at the end.
+"""
+
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager
+import os
+from pathlib import Path
+import secrets
+import time
+from typing import Any, Iterable, Iterator, List, Set, Tuple
+
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_LOCK_TIMEOUT = 30.0
+_POLL_INTERVAL = 0.05
+
+
+class LockTimeout(TimeoutError):
+    """Raised when another writer holds a criteria file for too long."""
+
+
+def lock_path(path: str | Path) -> Path:
+    """Return the lock file guarding ``path``."""
+    path = Path(path)
+    return path.with_name(f".{path.name}.lock")
+
+
+@contextmanager
+def file_lock(
+    path: str | Path,
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+) -> Iterator[None]:
+    """Hold the advisory write lock of ``path``; None waits forever."""
+    if fcntl is None:  # pragma: no cover - Windows
+        yield
+        return
+    lock = lock_path(path)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        descriptor = os.open(lock, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            while True:
+                try:
+                    fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise LockTimeout(
+                            f"{path} is being written by another process "
+                            f"(waited {timeout:g}s)"
+                        ) from None
+                    time.sleep(_POLL_INTERVAL)
+            # The previous holder removes the file on release: the lock only
+            # counts if it is still held on the file found at that name.
+            try:
+                current = os.path.samestat(os.fstat(descriptor), os.stat(lock))
+            except FileNotFoundError:
+                current = False
+        except BaseException:
+            os.close(descriptor)
+            raise
+        if current:
+            break
+        os.close(descriptor)
+    try:
+        yield
+    finally:
+        lock.unlink(missing_ok=True)  # still held: waiters will open a new file
+        os.close(descriptor)  # releases the lock
+
+
+@contextmanager
+def file_locks(
+    paths: Iterable[str | Path],
+    timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+) -> Iterator[None]:
+    """Hold the write locks of several files; ``timeout`` applies to each.
+
+    Locks are taken in the order of the resolved paths, so two writers
+    sharing some of the files cannot wait for each other forever.
+    """
+    with ExitStack() as stack:
+        for path in sorted({Path(path).resolve() for path in paths}):
+            stack.enter_context(file_lock(path, timeout))
+        yield
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a directory entry change to disk, where the OS supports it."""
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:  # pragma: no cover - not supported for directories
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _fsync_path(path: Path) -> None:
+    """Flush a written file to disk."""
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _write_temporary(path: Path, content: bytes, *, fsync: bool) -> Path:
+    """Write ``content`` next to ``path`` and return the temporary file."""
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666  # narrowed by the umask, as for a plain open()
+    temporary = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            if mode != 0o666:
+                os.chmod(temporary, mode)  # the umask may have narrowed it
+            handle.write(content)
+            handle.flush()
+            if fsync:
+                os.fsync(handle.fileno())
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    return temporary
+
+
+def atomic_write(path: str | Path, content: bytes, *, fsync: bool = False) -> None:
+    """Replace ``path`` with ``content`` in one step, keeping its permissions."""
+    path = Path(path)
+    temporary = _write_temporary(path, content, fsync=fsync)
+    try:
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_directory(path.parent)
+
+
+class WriteBatch:
+    """Write several files atomically, grouping their fsyncs.
+
+    Files are staged by :meth:`write` and renamed into place by
+    :meth:`commit`; used as a context manager, the batch commits on success
+    and discards the staged files on error.
+    """
+
+    def __init__(self, *, fsync: bool = False) -> None:
+        self.fsync = fsync
+        self._staged: List[Tuple[Path, Path]] = []
+
+    def write(self, path: str | Path, content: bytes) -> None:
+        """Stage ``content`` for ``path``."""
+        path = Path(path)
+        self._staged.append((_write_temporary(path, content, fsync=False), path))
+
+    def commit(self) -> List[Path]:
+        """Flush and rename every staged file; return the written paths."""
+        staged, self._staged = self._staged, []
+        try:
+            if self.fsync:
+                for temporary, _ in staged:
+                    _fsync_path(temporary)
+            for index, (temporary, path) in enumerate(staged):
+                os.replace(temporary, path)
+                staged[index] = (path, path)
+        except BaseException:
+            self._discard(staged)
+            raise
+        if self.fsync:
+            directories: Set[Path] = {path.parent for _, path in staged}
+            for directory in sorted(directories):
+                _fsync_directory(directory)
+        return [path for _, path in staged]
+
+    def abort(self) -> None:
+        """Remove the staged files without touching the destinations."""
+        staged, self._staged = self._staged, []
+        self._discard(staged)
+
+    @staticmethod
+    def _discard(staged: List[Tuple[Path, Path]]) -> None:
+        for temporary, path in staged:
+            if temporary != path:
+                temporary.unlink(missing_ok=True)
+
+    def __enter__(self) -> WriteBatch:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+__all__ = [
+    "DEFAULT_LOCK_TIMEOUT",
+    "LockTimeout",
+    "WriteBatch",
+    "atomic_write",
+    "file_lock",
+    "file_locks",
+    "lock_path",
+]
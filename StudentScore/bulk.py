@@ -0,0 +1,252 @@
+"""Apply results files to many criteria files at once.
+
+Deadline processing applies the objective and LLM results of a whole cohort,
+one cloned repository per student. Running ``score apply`` in a shell loop
+pays the interpreter startup, the imports and the rubric parsing once per
+repository. :func:`apply_many` instead takes a list of :class:`Job` (usually
+read from a CSV manifest by :func:`read_manifest`) and runs them in a pool of
+worker processes, one job at a time per worker.
+
+Each job is a ``score apply`` of its own: it holds the locks of the files it
+writes (its output, else the criteria file and its included fragments) while
+it reads, merges and writes, the output replaces the previous file
+atomically, and a failing job leaves its files untouched without stopping the
+others. Jobs writing the same file, a shared fragment for instance, therefore
+take turns. :func:`apply_many` yields one :class:`Outcome` per job, in manifest
+order.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from .apply import apply_results
+from .atomic import DEFAULT_LOCK_TIMEOUT, atomic_write
+from .cache import CriteriaCache
+from .include import locked_document, write_back
+from .incremental import revalidate
+from .index import CriteriaIndex
+from .patch import render_update
+from .results import ResultsError, load_awards
+from .schema import NormalizedCriteria
+
+
+MANIFEST_COLUMNS = ("results", "criteria", "output")
+# Several results files of one job are separated by ";" in the manifest.
+_RESULTS_SEPARATOR = ";"
+
+
+class ManifestError(ValueError):
+    """Raised when a manifest file cannot be read."""
+
+
+class UnknownCriteria(ResultsError):
+    """Raised when results name criteria missing from the criteria file."""
+
+    def __init__(self, ids: Sequence[str]) -> None:
+        super().__init__("unknown criteria in results: " + ", ".join(ids))
+        self.ids = list(ids)
+
+
+class Job:
+    """Results files to merge into one criteria file, written to ``output``."""
+
+    __slots__ = ("results", "criteria", "output")
+
+    def __init__(
+        self,
+        results: Sequence[str | Path],
+        criteria: str | Path,
+        output: str | Path | None = None,
+    ) -> None:
+        self.results = tuple(Path(path) for path in results)
+        self.criteria = Path(criteria)
+        self.output = None if output is None else Path(output)
+
+    @property
+    def destination(self) -> Path:
+        """Return the file the job writes."""
+        return self.output or self.criteria
+
+
+class Outcome:
+    """Result of one job: the applied criteria ids, or the error message."""
+
+    __slots__ = ("job", "applied", "error")
+
+    def __init__(
+        self, job: Job, applied: List[str] | None = None, error: str | None = None
+    ) -> None:
+        self.job = job
+        self.applied = applied or []
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Return True when the job was applied and written."""
+        return self.error is None
+
+
+def read_manifest(path: str | Path) -> List[Job]:
+    """Read the jobs of a CSV manifest.
+
+    Each row holds ``results,criteria[,output]``; the results cell may list
+    several files separated by ``;``, lowest precedence first. Without an
+    output, the criteria file is updated in place. Relative paths are
+    relative to the manifest, and a first row naming the columns is skipped.
+    """
+    path = Path(path)
+    base = path.parent
+    jobs: List[Job] = []
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        for number, row in enumerate(csv.reader(handle), 1):
+            cells = [cell.strip() for cell in row]
+            if not any(cells) or cells[0].startswith("#"):
+                continue
+            if number == 1 and tuple(cells) == MANIFEST_COLUMNS[: len(cells)]:
+                continue
+            names = [
+                name.strip()
+                for name in cells[0].split(_RESULTS_SEPARATOR)
+                if name.strip()
+            ]
+            if len(cells) not in (2, 3) or not names or not cells[1]:
+                raise ManifestError(
+                    f"{path}:{number}: expected results,criteria[,output]"
+                )
+            results = [base / name for name in names]
+            output = base / cells[2] if len(cells) == 3 and cells[2] else None
+            jobs.append(Job(results, base / cells[1], output))
+    return jobs
+
+
+def merge_files(
+    results: Sequence[str | Path],
+    criteria: str | Path,
+    output: str | Path | None = None,
+    *,
+    cache: CriteriaCache | None = None,
+    fsync: bool = False,
+    lock_timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+) -> Tuple[List[str], NormalizedCriteria]:
+    """Merge results files into a criteria file, as :func:`apply_files` does.
+
+    Return the applied ids and the validated merged criteria, from which the
+    mark can be computed without reading the written file back.
+    """
+    document = locked_document(criteria, cache, output=output, timeout=lock_timeout)
+    with document as (raw, normalized, source):
+        # One index serves every results file; awards go straight into it.
+        index = CriteriaIndex.from_raw(raw["criteria"])
+        updated = raw
+        applied: Dict[str, None] = {}
+        unknown: Dict[str, None] = {}
+        for path in results:
+            awards = load_awards(path, source)
+            updated, done, missing = apply_results(updated, awards, index=index)
+            applied.update(dict.fromkeys(done))
+            unknown.update(dict.fromkeys(missing))
+        if unknown:
+            raise UnknownCriteria(list(unknown))
+
+        # Only the applied leaves changed since the file was validated.
+        merged = revalidate(updated, normalized, applied, index=index)
+        if output is None:
+            write_back(updated, source, fsync=fsync)
+        else:
+            content = render_update(
+                updated, source.content, source=source.path, destination=output
+            )
+            atomic_write(output, content, fsync=fsync)
+    return list(applied), merged
+
+
+def apply_files(
+    results: Sequence[str | Path],
+    criteria: str | Path,
+    output: str | Path | None = None,
+    *,
+    cache: CriteriaCache | None = None,
+    fsync: bool = False,
+    lock_timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+) -> List[str]:
+    """Merge results files into a criteria file and return the applied ids.
+
+    Results are applied in order, so a later file sets the points of a
+    criterion, and its rationale if it has one. The merged criteria are
+    validated and written once: to ``output`` as a single file, else back
+    into the files they were read from. Nothing is written when a results
+    file is invalid (:class:`ResultsError`), names an unknown criterion
+    (:class:`UnknownCriteria`) or gives invalid awards.
+    """
+    applied, _ = merge_files(
+        results,
+        criteria,
+        output,
+        cache=cache,
+        fsync=fsync,
+        lock_timeout=lock_timeout,
+    )
+    return applied
+
+
+def apply_job(job: Job, **options: Any) -> Outcome:
+    """Run one job, turning its failure into an :class:`Outcome` error."""
+    try:
+        applied = apply_files(job.results, job.criteria, job.output, **options)
+    except Exception as exc:  # noqa: BLE001 - reported per job
+        message = str(exc) or type(exc).__name__
+        return Outcome(job, error=message)
+    return Outcome(job, applied)
+
+
+def _run(arguments: Tuple[Job, Dict[str, Any]]) -> Outcome:
+    """Worker entry point: :func:`apply_job` with bundled options."""
+    job, options = arguments
+    return apply_job(job, **options)
+
+
+def apply_many(
+    jobs: Sequence[Job],
+    *,
+    workers: int | None = None,
+    cache: CriteriaCache | None = None,
+    fsync: bool = False,
+    lock_timeout: float | None = DEFAULT_LOCK_TIMEOUT,
+) -> Iterator[Outcome]:
+    """Run jobs in ``workers`` processes and yield their outcomes in order.
+
+    ``workers`` defaults to the number of CPUs; with a single worker, or a
+    single job, the jobs run in the calling process.
+    """
+    options = {"cache": cache, "fsync": fsync, "lock_timeout": lock_timeout}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for job in jobs:
+            yield apply_job(job, **options)
+        return
+    # Hand jobs out in small chunks to amortize the inter-process round trips.
+    chunksize = max(1, min(16, len(jobs) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tasks = [(job, options) for job in jobs]
+        for job, outcome in zip(jobs, executor.map(_run, tasks, chunksize=chunksize)):
+            outcome.job = job  # the caller's object, not the worker's copy
+            yield outcome
+
+
+__all__ = [
+    "MANIFEST_COLUMNS",
+    "Job",
+    "ManifestError",
+    "Outcome",
+    "UnknownCriteria",
+    "apply_files",
+    "apply_job",
+    "apply_many",
+    "merge_files",
+    "read_manifest",
+]
@@ -0,0 +1,197 @@
+"""On-disk cache of parsed and validated criteria files.
+
+CI runners and teacher scripts run ``score`` on the same unchanged rubric many
+times. Entries are keyed by the SHA-256 of the file content, the package
+version and the kind of entry, and are stored with :mod:`pickle` under
+``$XDG_CACHE_HOME/studentscore`` (``~/.cache/studentscore`` by default, or
+``$STUDENTSCORE_CACHE_DIR``). Reading an entry refreshes its modification
+time; once the directory grows past its size bound, the least recently used
+entries are removed.
+
+The cache is best effort: any I/O problem simply counts as a miss. Entries are
+unpickled, so the directory is created private to the user and is ignored when
+somebody else owns it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import tempfile
+from typing import TYPE_CHECKING, Any, Tuple
+
+from .limits import DEFAULT_LIMITS
+from .version import __version__
+
+
+if TYPE_CHECKING:
+    from .include import Source
+    from .schema import NormalizedCriteria
+
+
+CACHE_DIR_ENV = "STUDENTSCORE_CACHE_DIR"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Bump when the layout of cached values changes within a release.
+_FORMAT = 1
+_SUFFIX = ".pickle"
+
+
+def default_cache_dir() -> Path:
+    """Return the directory used when none is given explicitly."""
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "studentscore"
+
+
+class CriteriaCache:
+    """Size-bounded LRU store of values derived from criteria file content."""
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _path(self, content: bytes, kind: str) -> Path:
+        """Return the entry file for ``kind`` data derived from ``content``."""
+        digest = hashlib.sha256()
+        # Entries only hold documents accepted under the current limits.
+        digest.update(f"{__version__}:{_FORMAT}:{kind}:{DEFAULT_LIMITS!r}\0".encode())
+        digest.update(content)
+        return self.directory / f"{digest.hexdigest()}{_SUFFIX}"
+
+    def _usable(self) -> bool:
+        """Return True when the cache directory exists and belongs to us."""
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            owner = self.directory.stat().st_uid
+        except OSError:
+            return False
+        return not hasattr(os, "getuid") or owner == os.getuid()
+
+    def get(self, content: bytes, kind: str) -> Any | None:
+        """Return the cached value for ``content``, or None on a miss."""
+        path = self._path(content, kind)
+        if not path.is_file() or not self._usable():
+            return None
+        try:
+            with path.open("rb") as handle:
+                value = pickle.load(handle)
+            os.utime(path)
+        except Exception:  # noqa: BLE001 - a corrupt entry is a miss
+            return None
+        return value
+
+    def put(self, content: bytes, kind: str, value: Any) -> None:
+        """Store ``value`` for ``content`` and evict old entries if needed."""
+        if not self._usable():
+            return
+        path = self._path(content, kind)
+        try:
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=self.directory, suffix=".tmp", delete=False
+            ) as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, path)
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the size bound holds."""
+        entries = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+
+def load_document(
+    path: str | Path,
+    cache: CriteriaCache | None = None,
+    *,
+    max_errors: int | None = None,
+) -> Tuple[Any, NormalizedCriteria, Source]:
+    """Return ``(raw, normalized, source)`` for a criteria file, using ``cache``.
+
+    ``raw`` is the parsed file with its includes resolved and ``normalized``
+    the ``Criteria`` output; both are fresh objects the caller may modify.
+    ``source`` lists the files the document was read from. Without a cache
+    the files are parsed and validated as usual. Invalid files are never
+    cached, and their errors carry ``file:line:col`` locations; validation
+    stops after ``max_errors`` of them.
+    """
+    from .include import Source, resolve_includes
+
+    content = Path(path).read_bytes()
+    if cache is not None:
+        entry = cache.get(content, "criteria")
+        if entry is not None:  # only stored for files without includes
+            return (*entry, Source(Path(path), (), content))
+
+    # The parser and the validator are only imported when the cache misses.
+    from .formats import detect_format, loads
+    from .locate import locate_errors
+    from .schema import Criteria, CriteriaValidationError
+
+    raw = loads(content, detect_format(path, content))
+    raw, source = resolve_includes(raw, path, content, cache)
+    key = b"\0".join(item.content for item in source.walk())
+    if cache is not None and source.includes:
+        entry = cache.get(key, "criteria")
+        if entry is not None:
+            return (*entry, source)
+
+    try:
+        normalized = Criteria(raw, max_errors=max_errors)
+    except CriteriaValidationError as exc:
+        raise locate_errors(exc, source) from None
+    if cache is not None:
+        cache.put(key, "criteria", (raw, normalized))
+    return raw, normalized, source
+
+
+def load_criteria(
+    path: str | Path,
+    cache: CriteriaCache | None = None,
+) -> Tuple[Any, NormalizedCriteria]:
+    """Return ``(raw, normalized)`` for a criteria file, using ``cache``."""
+    raw, normalized, _ = load_document(path, cache)
+    return raw, normalized
+
+
+__all__ = [
+    "CACHE_DIR_ENV",
+    "CriteriaCache",
+    "DEFAULT_MAX_BYTES",
+    "default_cache_dir",
+    "load_criteria",
+    "load_document",
+]
@@ -0,0 +1,744 @@
+"""The ``score`` Typer application.
+
+Every command imports the modules it needs when it runs, so that loading
+the application only costs Typer, Click and the criteria cache. Plain
+``score [FILE]`` and ``score check [FILE]`` usually do not get here at all:
+see :mod:`StudentScore.fast`.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import json as json_module
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, Any
+
+import click
+import typer
+from typer.main import TyperGroup
+
+from .atomic import DEFAULT_LOCK_TIMEOUT, atomic_write
+from .cache import CriteriaCache, load_document
+from .fast import print_score, quick_score
+
+
+if TYPE_CHECKING:
+    from .include import Source
+    from .milestones import MilestoneIndex
+    from .model import CriteriaTree, Points
+    from .schema import NormalizedCriteria
+    from .score import Score
+
+
+DEFAULT_CRITERIA_FILE = Path("criteria.yml")
+DEFAULT_COMMAND_NAME = "__default__"
+_DEBUG_ENABLED = False
+_CACHE_ENABLED = True
+_FSYNC_ENABLED = False
+_LOCK_TIMEOUT: float | None = DEFAULT_LOCK_TIMEOUT
+
+
+class _DefaultCommandGroup(TyperGroup):
+    """Typer group that forwards to a predefined command when none is provided."""
+
+    default_command_name: str | None = None
+
+    def parse_args(self, ctx: typer.Context, args: list[str]) -> list[str]:
+        # Insert the default command when the invocation does not start with a
+        # known subcommand (e.g. `score criteria.yml` or bare `score`).
+        if self.default_command_name is not None:
+            index = self._first_argument(ctx, args)
+            if index == len(args) or self.get_command(ctx, args[index]) is None:
+                # Group options stay in front of the inserted command name.
+                args = [*args[:index], self.default_command_name, *args[index:]]
+        return super().parse_args(ctx, args)
+
+    def _first_argument(self, ctx: typer.Context, args: list[str]) -> int:
+        """Return the index of the first argument after the group options."""
+        takes_value = {
+            name
+            for param in self.get_params(ctx)
+            if isinstance(param, click.Option) and not param.is_flag
+            for name in param.opts
+        }
+        index = 0
+        while index < len(args) and args[index].startswith("-"):
+            index += 2 if args[index] in takes_value else 1
+        return min(index, len(args))
+
+
+class _ScoreCommandGroup(_DefaultCommandGroup):
+    default_command_name = DEFAULT_COMMAND_NAME
+
+
+app = typer.Typer(
+    add_completion=False,
+    help="Student Score.",
+    cls=_ScoreCommandGroup,
+    pretty_exceptions_show_locals=False,
+)
+
+
+def _cache() -> CriteriaCache | None:
+    """Return the criteria cache unless ``--no-cache`` was given."""
+    return CriteriaCache() if _CACHE_ENABLED else None
+
+
+def _load_criteria(path: Path) -> tuple[Any, NormalizedCriteria, Source]:
+    """Return the raw and normalized criteria of a file and its sources."""
+    return load_document(path, _cache())
+
+
+@lru_cache(maxsize=1)
+def _load_result_schema() -> dict[str, Any]:
+    """Load the JSON schema definition stored in the package."""
+    import importlib.resources as resources
+
+    schema_path = resources.files(__package__) / "result_schema.json"
+    with schema_path.open("r", encoding="utf-8") as schema_file:
+        return json_module.load(schema_file)
+
+
+def _format_points(points: Points) -> dict[str, float]:
+    """Return a ``Points`` tuple as a JSON-friendly mapping."""
+    return {"got": points.got, "total": points.total, "bonus": points.bonus}
+
+
+def _format_payload(score: Score, *, breakdown: bool = False) -> dict[str, Any]:
+    """Return a serializable payload describing the score analysis."""
+    points = score.points
+    payload = {
+        "mark": score.mark,
+        "success": score.success,
+        "points": _format_points(points),
+        "criteria": score.data,
+    }
+    if breakdown:
+        payload["breakdown"] = {
+            group: {key: _format_points(value) for key, value in entries.items()}
+            for group, entries in score.breakdown().items()
+        }
+    return payload
+
+
+def _load_awards(path: Path, source: Source) -> dict[str, Any]:
+    """Read a results or overlay file, exiting when it does not fit the rubric."""
+    from .results import ResultsError, load_awards
+
+    try:
+        return dict(load_awards(path, source))
+    except ResultsError as exc:
+        typer.secho(str(exc), fg="red", err=True)
+        raise typer.Exit(code=1)
+
+
+def _fail_on_unknown(unknown: list[str]) -> None:
+    """Exit when results name criteria missing from the criteria file."""
+    # Fail fast on a typo/mismatch rather than silently dropping a grade.
+    for cid in unknown:
+        typer.secho(f"Unknown criterion in results: {cid}", fg="red", err=True)
+    if unknown:
+        raise typer.Exit(code=1)
+
+
+def _locked_document(path: Path, output: Path | None) -> Any:
+    """Load a criteria file under the locks of the files written to ``output``.
+
+    Without an output, the file and its included fragments are locked, as
+    :func:`_write_criteria` may rewrite each of them. ``--lock-timeout``
+    applies to every lock.
+    """
+    from .include import locked_document
+
+    return locked_document(path, _cache(), output=output, timeout=_LOCK_TIMEOUT)
+
+
+def _write_criteria(destination: Path | None, data: Any, source: Source) -> None:
+    """Write criteria data, splicing the changes into the source text if possible.
+
+    Without a destination, every included fragment receives its own part of
+    the data. Otherwise a single self-contained file is written, in the format
+    of the destination extension, else of the source. Files are replaced
+    atomically; callers hold :func:`_locked_document` around the
+    read-modify-write.
+    """
+    from .include import write_back
+    from .patch import render_update
+
+    if destination is None:
+        write_back(data, source, fsync=_FSYNC_ENABLED)
+        return
+    content = render_update(
+        data, source.content, source=source.path, destination=destination
+    )
+    atomic_write(destination, content, fsync=_FSYNC_ENABLED)
+
+
+def _milestone_index(tree: CriteriaTree, names: list[str]) -> MilestoneIndex:
+    """Return the milestone index of a tree, exiting if a name is not used."""
+    from .milestones import MilestoneIndex
+
+    index = MilestoneIndex.from_tree(tree)
+    for name in names:
+        if name not in index:
+            typer.secho(
+                f"No criteria tagged with milestone '{name}'.", fg="red", err=True
+            )
+            raise typer.Exit(code=1)
+    return index
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Display detailed points before the final mark.",
+    ),
+    debug: bool = typer.Option(
+        False,
+        "--debug",
+        help="Show full traceback for unexpected errors.",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Parse and validate criteria files without the on-disk cache.",
+    ),
+    fsync: bool = typer.Option(
+        False,
+        "--fsync",
+        help="Flush rewritten criteria files to disk before exiting.",
+    ),
+    lock_timeout: float = typer.Option(
+        DEFAULT_LOCK_TIMEOUT,
+        "--lock-timeout",
+        min=0,
+        help="Seconds to wait for another process writing the same criteria file.",
+    ),
+) -> None:
+    """Store global CLI options for later use."""
+    global _CACHE_ENABLED, _DEBUG_ENABLED, _FSYNC_ENABLED, _LOCK_TIMEOUT
+    ctx.obj = ctx.obj or {}
+    ctx.obj["verbose"] = verbose
+    ctx.obj["debug"] = debug
+    _DEBUG_ENABLED = debug
+    _CACHE_ENABLED = not no_cache
+    _FSYNC_ENABLED = fsync
+    _LOCK_TIMEOUT = lock_timeout
+
+
+def _handle_unexpected(exception: Exception) -> None:
+    """Gracefully handle unexpected exceptions."""
+    if isinstance(exception, (typer.Exit, click.ClickException)):
+        raise exception
+
+    debug = _DEBUG_ENABLED
+    if debug:
+        raise exception
+
+    message = str(exception).strip() or exception.__class__.__name__
+    typer.secho(message, fg="red", err=True)
+    raise SystemExit(1)
+
+
+def _invoke_cli() -> None:
+    """Execute the Typer application with controlled error handling."""
+    try:
+        result = app(standalone_mode=False)
+    except typer.Exit as exc:
+        raise SystemExit(exc.exit_code)
+    except click.ClickException as exc:
+        exc.show(file=sys.stderr)
+        raise SystemExit(exc.exit_code)
+    except Exception as exc:  # noqa: BLE001
+        _handle_unexpected(exc)
+    else:
+        # click's standalone_mode=False RETURNS the exit code of a
+        # typer.Exit raised inside a command instead of raising it; without
+        # this, `score check` on an invalid file exited 0 in CI.
+        if isinstance(result, int) and result != 0:
+            raise SystemExit(result)
+
+
+@app.command(name=DEFAULT_COMMAND_NAME, hidden=True)
+def _default_command(
+    ctx: typer.Context,
+    file: Path = typer.Argument(
+        DEFAULT_CRITERIA_FILE,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Path to the criteria file.",
+    ),
+    verbose_flag: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Display detailed points before the final mark.",
+    ),
+) -> None:
+    """Compute the score from a criteria file."""
+    verbose = bool((ctx.obj or {}).get("verbose"))
+    score = quick_score(file, _cache())
+    print_score(score, verbose=verbose or verbose_flag, secho=typer.secho)
+
+
+@app.command()
+def json(
+    file: Path = typer.Argument(
+        DEFAULT_CRITERIA_FILE,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Path to the criteria file.",
+    ),
+    breakdown: bool = typer.Option(
+        False,
+        "--breakdown",
+        help="Include got/total/bonus for every section and milestone tag.",
+    ),
+    results: Path | None = typer.Option(
+        None,
+        "--results",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Score as if this results file had been applied (nothing is written).",
+    ),
+) -> None:
+    """Emit the score analysis as JSON."""
+    from .score import Score
+
+    _, normalized, source = _load_criteria(file)
+    score = Score(normalized)
+    if results is not None:
+        _, unknown = score.apply_results(_load_awards(results, source))
+        _fail_on_unknown(unknown)
+    payload = _format_payload(score, breakdown=breakdown)
+    typer.echo(json_module.dumps(payload, indent=2, sort_keys=True))
+
+
+@app.command()
+def check(
+    file: Path = typer.Argument(
+        DEFAULT_CRITERIA_FILE,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Path to the criteria file to validate.",
+    ),
+    max_errors: int | None = typer.Option(
+        None,
+        "--max-errors",
+        min=1,
+        help="Stop validating after this many errors.",
+    ),
+    fail_fast: bool = typer.Option(
+        False,
+        "--fail-fast",
+        help="Stop at the first error (same as --max-errors 1).",
+    ),
+    watch_file: bool = typer.Option(
+        False,
+        "--watch",
+        help="Keep checking the file, and its includes, whenever they change.",
+    ),
+    interval: float = typer.Option(
+        1.0,
+        "--interval",
+        min=0.05,
+        help="With --watch: seconds between two looks at the files.",
+    ),
+) -> None:
+    """Validate a criteria file and report its schema version."""
+    from .schema import CriteriaValidationError
+
+    if fail_fast:
+        max_errors = 1
+    if watch_file:
+        _watch_check(file, interval, max_errors)
+        return
+    try:
+        _, normalized, _ = load_document(file, _cache(), max_errors=max_errors)
+    except CriteriaValidationError as exc:
+        typer.secho("BAD", fg="red")
+        typer.echo(str(exc).strip() or "Invalid criteria definition.")
+        raise typer.Exit(code=1)
+    except Exception as exc:  # noqa: BLE001
+        message = str(exc).strip() or "Unable to parse criteria file."
+        typer.secho("BAD", fg="red")
+        typer.echo(message)
+        raise typer.Exit(code=1)
+
+    schema_version = int(normalized.get("schema_version", 1))
+    typer.secho(f"OK, schema version {schema_version}", fg="green")
+
+
+def _watch_check(file: Path, interval: float, max_errors: int | None) -> None:
+    """Re-check ``file`` after every change until interrupted."""
+    from .incremental import IncrementalValidator, watch
+
+    validator = IncrementalValidator(max_errors=max_errors)
+    first = True
+    try:
+        for normalized, error in watch(file, interval=interval, validator=validator):
+            if error is not None:
+                typer.secho("BAD", fg="red")
+                typer.echo(str(error).strip() or "Invalid criteria definition.")
+                continue
+            schema_version = int(normalized.get("schema_version", 1))
+            typer.secho(f"OK, schema version {schema_version}", fg="green")
+            if not first and validator.changed:
+                typer.echo(
+                    f"Re-checked {len(validator.checked)} criteria after changes "
+                    f"to {', '.join(validator.changed)}"
+                )
+            first = False
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def apply(
+    paths: list[Path] = typer.Argument(
+        None,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        metavar="RESULTS... [FILE]",
+        help=(
+            "Results files (JSON objects or JSON Lines), lowest precedence "
+            "first, then the criteria file to update (default: criteria.yml)."
+        ),
+    ),
+    output: Path | None = typer.Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+        help="Destination file. Defaults to updating the criteria file in place.",
+    ),
+    manifest: Path | None = typer.Option(
+        None,
+        "--manifest",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help=(
+            "CSV file of results,criteria[,output] rows to apply in bulk, "
+            "instead of the arguments."
+        ),
+    ),
+    workers: int | None = typer.Option(
+        None,
+        "--workers",
+        "-j",
+        min=1,
+        help="With --manifest: number of worker processes (default: CPU count).",
+    ),
+    mark: bool = typer.Option(
+        False,
+        "--mark",
+        help="Print the mark of the merged criteria instead of a summary.",
+    ),
+) -> None:
+    """Merge awarded points/rationale from results files into the criteria.
+
+    Results are applied in the order given: when several files award the same
+    criterion, the last one sets its points, and its rationale if it has one.
+    The criteria file is validated and written once, after every results file
+    was applied.
+    """
+    from .bulk import UnknownCriteria, merge_files
+    from .results import ResultsError
+
+    if manifest is not None:
+        if paths or output is not None or mark:
+            raise typer.BadParameter(
+                "takes no RESULTS, --output or --mark", param_hint="'--manifest'"
+            )
+        _apply_manifest(manifest, workers)
+        return
+    if not paths:
+        raise typer.BadParameter(
+            "Missing results file.", param_hint="'RESULTS... [FILE]'"
+        )
+    if len(paths) > 1:
+        *results, file = paths
+    else:
+        results, file = paths, DEFAULT_CRITERIA_FILE.resolve()
+        if not file.is_file():
+            raise typer.BadParameter(
+                f"File '{DEFAULT_CRITERIA_FILE}' does not exist.",
+                param_hint="'RESULTS... [FILE]'",
+            )
+
+    try:
+        applied, merged = merge_files(
+            results,
+            file,
+            output,
+            cache=_cache(),
+            fsync=_FSYNC_ENABLED,
+            lock_timeout=_LOCK_TIMEOUT,
+        )
+    except UnknownCriteria as exc:
+        _fail_on_unknown(exc.ids)
+    except ResultsError as exc:
+        typer.secho(str(exc), fg="red", err=True)
+        raise typer.Exit(code=1)
+    if mark:
+        from .score import Score
+
+        print_score(Score.from_normalized(merged), verbose=False, secho=typer.secho)
+        return
+    typer.secho(
+        f"Applied {len(applied)} criteria to {output or file}", fg="green"
+    )
+
+
+def _apply_manifest(manifest: Path, workers: int | None) -> None:
+    """Run the jobs of a manifest, reporting each one, and exit 1 on failures."""
+    from .bulk import ManifestError, apply_many, read_manifest
+
+    try:
+        jobs = read_manifest(manifest)
+    except ManifestError as exc:
+        typer.secho(str(exc), fg="red", err=True)
+        raise typer.Exit(code=1)
+
+    failed = 0
+    outcomes = apply_many(
+        jobs,
+        workers=workers,
+        cache=_cache(),
+        fsync=_FSYNC_ENABLED,
+        lock_timeout=_LOCK_TIMEOUT,
+    )
+    for outcome in outcomes:
+        destination = outcome.job.destination
+        if outcome.ok:
+            typer.echo(f"OK   {destination}: applied {len(outcome.applied)} criteria")
+        else:
+            failed += 1
+            typer.secho(f"FAIL {destination}: {outcome.error}", fg="red")
+    typer.secho(
+        f"Applied results to {len(jobs) - failed} of {len(jobs)} criteria files",
+        fg="red" if failed else "green",
+    )
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def grade(
+    file: Path = typer.Argument(
+        DEFAULT_CRITERIA_FILE,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Path to the criteria file.",
+    ),
+    use_llm: bool = typer.Option(
+        False,
+        "--llm",
+        help="Call Claude to grade the submission (needs ANTHROPIC_API_KEY).",
+    ),
+    source: list[str] = typer.Option(
+        [],
+        "--source",
+        "-s",
+        help="Glob of source files to send to the model (repeatable).",
+    ),
+    output: Path | None = typer.Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+        help="With --llm: write the graded criteria file here.",
+    ),
+    model: str | None = typer.Option(
+        None,
+        "--model",
+        help="Override the grading model (default: claude-opus-4-8).",
+    ),
+    milestones: list[str] = typer.Option(
+        [],
+        "--milestone",
+        help=(
+            "Intermediate review: grade only the criteria tagged "
+            "`milestone: <name>` in the criteria file. Repeat to grade "
+            "several milestones together."
+        ),
+    ),
+) -> None:
+    """Assemble the grading prompt, or grade with Claude when --llm is set."""
+    from .grading import build_prompt
+    from .model import build_tree
+
+    raw_criteria, normalized, origin = _load_criteria(file)
+
+    tree = index = None
+    if milestones:
+        tree = build_tree(normalized)
+        index = _milestone_index(tree, milestones)
+        raw_criteria, _ = index.view(raw_criteria, milestones)
+        normalized, _ = index.view(normalized, milestones)
+
+    if not use_llm:
+        typer.echo(build_prompt(normalized))
+        return
+
+    from .apply import apply_results
+    from .incremental import revalidate
+    from .index import CriteriaIndex
+    from .llm import DEFAULT_MODEL, collect_sources, grade_with_llm
+
+    patterns = list(source)
+    grading = normalized.get("grading") or {}
+    patterns.extend(grading.get("sources", []))
+    sources = collect_sources(patterns) if patterns else {}
+
+    results = grade_with_llm(
+        normalized, sources, model=model or DEFAULT_MODEL
+    )
+
+    destination = output or file
+    with _locked_document(file, output) as document:
+        if output is None:
+            # Another grading tier may have updated the file during the call.
+            raw_criteria, normalized, origin = document
+            if milestones:
+                tree = build_tree(normalized)
+                index = _milestone_index(tree, milestones)
+                raw_criteria, _ = index.view(raw_criteria, milestones)
+                normalized, _ = index.view(normalized, milestones)
+        ids = CriteriaIndex.from_raw(raw_criteria["criteria"])
+        updated, applied, _ = apply_results(raw_criteria, results, index=ids)
+        revalidate(updated, normalized, applied, index=ids)
+
+        # A milestone subset cannot be split back into the included fragments.
+        _write_criteria(output or (file if milestones else None), updated, origin)
+    typer.secho(
+        f"Graded {len(applied)} criteria with {model or DEFAULT_MODEL} "
+        f"-> {destination}",
+        fg="green",
+    )
+    if tree is not None and index is not None:
+        # The index shares the tree's subtotals, which follow the new awards.
+        apply_results(tree, {cid: results[cid] for cid in applied})
+        for name, points in index.points(milestones).items():
+            typer.echo(f"Milestone {name}: {points.got:g}/{points.total:g}")
+
+
+@app.command()
+def overlay(
+    file: Path = typer.Argument(
+        DEFAULT_CRITERIA_FILE,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Student criteria file with the awards inlined.",
+    ),
+    rubric: Path = typer.Option(
+        ...,
+        "--rubric",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Base rubric the student file is a copy of.",
+    ),
+    output: Path | None = typer.Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+        help="Destination file. Defaults to standard output.",
+    ),
+) -> None:
+    """Extract the awards differing from a base rubric into an overlay file."""
+    from .overlay import Rubric, extract_overlay
+    from .score import Score
+
+    base = Rubric.load(rubric, _cache())
+    _, normalized, _ = _load_criteria(file)
+    extracted = extract_overlay(
+        Score(base.data).tree, Score(normalized).tree, base.id
+    )
+    text = json_module.dumps(extracted.to_dict(), indent=2, ensure_ascii=False)
+    if output is None:
+        typer.echo(text)
+        return
+    atomic_write(output, (text + "\n").encode("utf-8"), fsync=_FSYNC_ENABLED)
+    typer.secho(
+        f"Wrote {len(extracted.awards)} awards to {output}", fg="green"
+    )
+
+
+@app.command()
+def schema() -> None:
+    """Display the JSON schema for the analysis payload."""
+    typer.echo(json_module.dumps(_load_result_schema(), indent=2, sort_keys=True))
+
+
+@app.command()
+def update(
+    file: Path = typer.Argument(
+        DEFAULT_CRITERIA_FILE,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Path to the criteria file to migrate.",
+    ),
+    output: Path | None = typer.Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+        help="Optional destination file. Defaults to in-place upgrade.",
+    ),
+) -> None:
+    """Migrate a criteria file from schema version 1 to version 2."""
+    from .conversion import upgrade_to_v2
+
+    destination = output or file
+    with _locked_document(file, output) as (_, normalized, source):
+        schema_version = normalized.get("schema_version", 1)
+
+        if schema_version == 2 and output is None:
+            typer.secho(
+                "Criteria already use schema version 2; no changes written.",
+                fg="yellow",
+            )
+            return
+
+        converted = upgrade_to_v2(normalized)
+        _write_criteria(output, converted, source)
+
+    typer.secho(
+        f"Criteria upgraded to schema version 2 and written to {destination}",
+        fg="green",
+    )
+
@@ -2,92 +2,89 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Mapping
+from typing import Any, Dict, List, Mapping, Tuple
 
-
-def _is_v1_item(entry: Any) -> bool:
-    """Return True when the provided entry represents a V1 leaf criterion."""
-    if not isinstance(entry, Mapping):
-        return False
-    keys = {str(key) for key in entry.keys()}
-    return bool(keys) and all(key.startswith("$") for key in keys)
+from .model import (
+    CriteriaTree,
+    Criterion,
+    Section,
+    _export_number,
+    build_tree,
+    walk_nodes,
+)
+from .traversal import Visitor
 
 
 def _normalize_text(value: Any) -> Any:
     """Convert multi-line list content into a single string."""
-    if isinstance(value, list):
+    if isinstance(value, (list, tuple)):
         return "\n".join(str(item) for item in value)
     return value
 
 
-def _normalize_points(value: float | int) -> float | int:
-    """Return integers when the provided numeric value is integral."""
-    if isinstance(value, float) and value.is_integer():
-        return int(value)
-    return value
+def _convert_item_v1_to_v2(item: Criterion) -> Dict[str, Any]:
+    """Convert a criterion node to the v2 item structure."""
+    result: Dict[str, Any] = {}
+    if item.description is not None:
+        result["description"] = _normalize_text(item.description)
 
+    result["awarded_points"] = _export_number(item.awarded)
+    if item.is_bonus:
+        result["bonus_points"] = int(item.available)
+    else:
+        result["max_points"] = int(item.available)
 
-def _convert_item_v1_to_v2(item: Mapping[str, Any]) -> Dict[str, Any]:
-    """Convert a v1 item definition to the v2 structure."""
-    result: Dict[str, Any] = {}
-    description = item.get("$description", item.get("$desc"))
-    if description is not None:
-        result["description"] = _normalize_text(description)
-
-    points = item.get("$points")
-    bonus = item.get("$bonus")
-    if points is not None:
-        obtained, total = points
-        result["awarded_points"] = _normalize_points(obtained)
-        result["max_points"] = int(total)
-    elif bonus is not None:
-        obtained, total = bonus
-        result["awarded_points"] = _normalize_points(obtained)
-        result["bonus_points"] = int(total)
-
-    rationale = item.get("$rationale")
-    if rationale is not None:
-        result["rationale"] = _normalize_text(rationale)
-
-    prompt = item.get("$test")
-    if prompt is not None:
-        result["prompt"] = prompt
-
-    milestone = item.get("$milestone")
-    if milestone is not None:
-        result["milestone"] = milestone
+    if item.rationale is not None:
+        result["rationale"] = _normalize_text(item.rationale)
+
+    if item.prompt is not None:
+        result["prompt"] = item.prompt
+
+    if item.milestone is not None:
+        result["milestone"] = item.milestone
 
     return result
 
 
-def _convert_section_v1_to_v2(section: Mapping[str, Any]) -> Dict[str, Any]:
-    """Recursively convert a v1 criteria section into the v2 structure."""
-    if not isinstance(section, Mapping):
-        raise ValueError("criteria sections must be mappings")
+class _V2Renderer(Visitor):
+    """Render model nodes as version 2 sections and items."""
 
-    result: Dict[str, Any] = {}
-    description = section.get("$description", section.get("$desc"))
-    if description is not None:
-        result["description"] = _normalize_text(description)
-
-    for raw_key, raw_value in section.items():
-        key = str(raw_key)
-        if key in {"$description", "$desc"}:
-            continue
-        if _is_v1_item(raw_value):
-            result[key] = _convert_item_v1_to_v2(raw_value)
+    def __init__(self) -> None:
+        self.result: Dict[str, Any] = {}
+        self._stack: List[Dict[str, Any]] = []
+
+    def enter_section(self, path: Tuple[str, ...], key: Any, node: Section) -> None:
+        result: Dict[str, Any] = {}
+        if node.description is not None:
+            result["description"] = _normalize_text(node.description)
+        if self._stack:
+            self._stack[-1][key] = result
         else:
-            result[key] = _convert_section_v1_to_v2(raw_value)
-    return result
+            self.result = result
+        self._stack.append(result)
+
+    def leave_section(self, path: Tuple[str, ...], key: Any, node: Section) -> None:
+        self._stack.pop()
+
+    def visit_leaf(self, path: Tuple[str, ...], key: Any, node: Criterion) -> None:
+        self._stack[-1][key] = _convert_item_v1_to_v2(node)
+
+
+def _convert_section_v1_to_v2(section: Section) -> Dict[str, Any]:
+    """Convert a section node and everything below it into the v2 structure."""
+    renderer = _V2Renderer()
+    walk_nodes(section, renderer)
+    return renderer.result
 
 
-def upgrade_to_v2(data: Mapping[str, Any]) -> Dict[str, Any]:
+def upgrade_to_v2(data: Mapping[str, Any] | CriteriaTree) -> Dict[str, Any]:
     """Return a criteria definition converted to schema version 2."""
-    criteria = data.get("criteria")
-    if not isinstance(criteria, Mapping):
-        raise ValueError("criteria definition must be a mapping")
+    if not isinstance(data, CriteriaTree):
+        if not isinstance(data.get("criteria"), Mapping):
+            raise ValueError("criteria definition must be a mapping")
+        data = build_tree(data)
 
-    converted = _convert_section_v1_to_v2(criteria)
+    converted = _convert_section_v1_to_v2(data.root)
     return {
         "schema_version": 2,
         "criteria": converted,
@@ -0,0 +1,139 @@
+"""Fast start of the ``score`` command line.
+
+CI jobs and pre-commit hooks mostly run ``score`` or ``score check`` on a
+single criteria file, and importing the full application (Typer, Click and
+every command) took longer than scoring a cached rubric. :func:`run` handles
+these two command lines before anything else is imported, loading only what
+they need: a cached score does not even import the YAML parser. Any other
+command line, and any failure, is left to :mod:`StudentScore.commands`,
+which reports it as usual.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, Callable, List
+
+
+if TYPE_CHECKING:
+    from .cache import CriteriaCache
+    from .model import ScoreSummary
+
+# Subcommands of the application; the test suite keeps the two in sync.
+COMMANDS = frozenset({"apply", "check", "grade", "json", "overlay", "schema", "update"})
+DEFAULT_CRITERIA_FILE = "criteria.yml"
+
+_VERBOSE = ("-v", "--verbose")
+_NO_CACHE = "--no-cache"
+_ANSI_COLORS = {"green": 32, "red": 31}
+
+
+def _secho(message: str, fg: str | None = None) -> None:
+    """Print a line, colored as :func:`click.secho` does on a terminal."""
+    if fg is not None and sys.stdout.isatty():
+        message = f"\x1b[{_ANSI_COLORS[fg]}m{message}\x1b[0m"
+    sys.stdout.write(f"{message}\n")
+
+
+def print_score(
+    score: ScoreSummary,
+    *,
+    verbose: bool,
+    secho: Callable[..., None] = _secho,
+) -> None:
+    """Render the score information on stdout."""
+    if verbose:
+        secho(
+            f"Got {score.got:g} points + {score.bonus:g} "
+            f"points out of {score.total:g} points"
+        )
+    secho(f"{score.mark:g}", fg="green" if score.success else "red")
+
+
+def quick_score(path: Path, cache: CriteriaCache | None) -> ScoreSummary:
+    """Score a file from the cache or its parse events, else fully load it."""
+    from .model import ScoreSummary
+
+    content = path.read_bytes()
+    if cache is not None:
+        points = cache.get(content, "points")
+        if points is not None:
+            return ScoreSummary(points)
+
+    from .cache import load_document
+    from .formats import YAML, detect_format
+    from .score import Score
+    from .stream import StreamFallback, stream_score
+
+    try:
+        if detect_format(path, content) != YAML:
+            raise StreamFallback("only YAML is read from parse events")
+        score = stream_score(str(path))
+    except StreamFallback:
+        # Included fragments make the stream fall back: the points of such a
+        # file cannot be keyed by its own content.
+        _, normalized, _ = load_document(path, cache)
+        return Score(normalized)
+    if cache is not None:
+        cache.put(content, "points", score.points)
+    return score
+
+
+def _criteria_file(args: List[str]) -> Path | None:
+    """Return the readable criteria file named by ``args``, else None."""
+    if len(args) > 1 or any(arg.startswith("-") for arg in args):
+        return None
+    path = Path(args[0] if args else DEFAULT_CRITERIA_FILE)
+    if not path.is_file() or not os.access(path, os.R_OK):
+        return None
+    return path.resolve()
+
+
+def run(argv: List[str]) -> bool:
+    """Run ``score [-v] [FILE]`` or ``score check [FILE]`` if ``argv`` is one.
+
+    Global ``-v``/``--verbose`` and ``--no-cache`` options are accepted in
+    front. Returns False, with nothing printed, when ``argv`` is any other
+    command line or the command fails; the full application then runs it.
+    """
+    if sys.platform == "win32":
+        return False  # Click sets up the console colors there
+    index = 0
+    while index < len(argv) and argv[index] in (*_VERBOSE, _NO_CACHE):
+        index += 1
+    options, args = argv[:index], argv[index:]
+    verbose = any(option in _VERBOSE for option in options)
+    check = args[:1] == ["check"]
+    if check:
+        args = args[1:]
+    elif args[:1] and args[0] in COMMANDS:
+        return False
+    else:
+        verbose = verbose or any(arg in _VERBOSE for arg in args)
+        args = [arg for arg in args if arg not in _VERBOSE]
+    path = _criteria_file(args)
+    if path is None:
+        return False
+
+    from .cache import CriteriaCache, load_document
+
+    cache = None if _NO_CACHE in options else CriteriaCache()
+    try:
+        if check:
+            _, normalized, _ = load_document(path, cache)
+            version = int(normalized.get("schema_version", 1))
+        else:
+            score = quick_score(path, cache)
+            score.mark  # raises on a rubric without points
+    except Exception:  # noqa: BLE001 - reported by the full application
+        return False
+    if check:
+        _secho(f"OK, schema version {version}", fg="green")
+    else:
+        print_score(score, verbose=verbose)
+    return True
+
+
+__all__ = ["COMMANDS", "print_score", "quick_score", "run"]
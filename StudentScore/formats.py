@@ -0,0 +1,145 @@
+"""Criteria file formats: YAML, JSON and MessagePack.
+
+Criteria written by hand are YAML, but platforms generating them can hand over
+``criteria.json`` or a MessagePack blob and skip YAML parsing entirely. The
+format is taken from the file extension, else sniffed from the first bytes:
+a MessagePack document starts with a map header byte, a JSON one with ``{``.
+Everything else is read as YAML. All formats go through the same ``Criteria``
+validation afterwards.
+
+Content larger than ``max_bytes`` of the :mod:`~StudentScore.limits` is
+rejected before any parser sees it. A JSON document nested too deeply for
+:func:`json.loads` is rejected with the same limit error as a YAML one.
+
+MessagePack support is optional: ``msgpack`` is imported lazily. Install the
+extra with ``pip install StudentScore[msgpack]``.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, List
+
+from . import yaml
+from .limits import DEFAULT_LIMITS, Limits
+from .schema import CriteriaValidationError, _add_error, _format_validation_errors
+
+
+YAML = "yaml"
+JSON = "json"
+MSGPACK = "msgpack"
+
+_EXTENSIONS: Dict[str, str] = {
+    ".yml": YAML,
+    ".yaml": YAML,
+    ".json": JSON,
+    ".msgpack": MSGPACK,
+    ".mpk": MSGPACK,
+}
+
+
+def _is_msgpack_map(first: int) -> bool:
+    """Return True for a fixmap, map16 or map32 header byte."""
+    return 0x80 <= first <= 0x8F or first in {0xDE, 0xDF}
+
+
+def detect_format(path: str | Path | None, content: bytes | str) -> str:
+    """Return the format of criteria ``content`` read from ``path``."""
+    if path is not None:
+        known = _EXTENSIONS.get(Path(path).suffix.lower())
+        if known is not None:
+            return known
+    if isinstance(content, bytes):
+        if content and _is_msgpack_map(content[0]):
+            return MSGPACK
+        head = content.lstrip()[:1]
+        return JSON if head == b"{" else YAML
+    return JSON if content.lstrip()[:1] == "{" else YAML
+
+
+def _msgpack() -> Any:
+    """Import the optional ``msgpack`` module."""
+    try:
+        import msgpack
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "MessagePack criteria require the 'msgpack' package. "
+            "Install it with: pip install 'StudentScore[msgpack]'"
+        ) from exc
+    return msgpack
+
+
+def _limit_exceeded(message: str) -> None:
+    """Raise the validation error of a document going past a limit."""
+    errors: List[Dict[str, Any]] = []
+    _add_error(errors, (), message)
+    raise CriteriaValidationError(_format_validation_errors(errors), errors=errors)
+
+
+def _check_size(content: bytes | str, limits: Limits) -> None:
+    """Raise a validation error when ``content`` exceeds ``max_bytes``."""
+    maximum = limits.max_bytes
+    if maximum is None or len(content) <= maximum:
+        return
+    _limit_exceeded(f"file is larger than {maximum} bytes ({len(content)} bytes)")
+
+
+def _loads_json(text: str, limits: Limits) -> Any:
+    """Parse JSON ``text``, reporting a too deep document as a limit error."""
+    try:
+        return json.loads(text)
+    except RecursionError:
+        # The parser recurses once per level and stops at the interpreter's
+        # recursion limit, far past the default depth limit. Shallower
+        # documents are held to ``max_depth`` by ``Criteria``.
+        maximum = limits.max_depth
+        if maximum is not None and maximum < sys.getrecursionlimit():
+            _limit_exceeded(f"nesting is deeper than {maximum} levels")
+        _limit_exceeded("nesting is deeper than the JSON parser supports")
+
+
+def loads(content: bytes | str, fmt: str, *, limits: Limits | None = None) -> Any:
+    """Parse criteria ``content`` in the given format, within ``limits``."""
+    limits = limits or DEFAULT_LIMITS
+    _check_size(content, limits)
+    if fmt == MSGPACK:
+        if isinstance(content, str):
+            raise ValueError("MessagePack criteria must be read as bytes.")
+        return _msgpack().unpackb(content, strict_map_key=False)
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    if fmt == JSON:
+        return _loads_json(content, limits)
+    return yaml.load(content, limits=limits)
+
+
+def dumps(data: Any, fmt: str) -> bytes:
+    """Serialize criteria ``data`` in the given format."""
+    if fmt == MSGPACK:
+        return _msgpack().packb(data)
+    if fmt == JSON:
+        text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    else:
+        text = yaml.dump(
+            data, sort_keys=False, allow_unicode=True, default_flow_style=False
+        )
+    return text.encode("utf-8")
+
+
+def load_file(path: str | Path) -> Any:
+    """Read and parse a criteria file, detecting its format."""
+    content = Path(path).read_bytes()
+    return loads(content, detect_format(path, content))
+
+
+__all__ = [
+    "JSON",
+    "MSGPACK",
+    "YAML",
+    "detect_format",
+    "dumps",
+    "load_file",
+    "loads",
+]
@@ -9,33 +9,18 @@ No LLM call happens here; :func:`build_prompt` only renders the text.
 
 from __future__ import annotations
 
-from typing import Any, Iterator, List, Mapping, Tuple
+from typing import Any, List, Mapping, Tuple
+
+from .model import CriteriaTree, Criterion, _export_number, build_tree
 
 
 def _as_text(value: Any) -> str:
     """Render a string or list-of-strings value as a single block of text."""
-    if isinstance(value, list):
+    if isinstance(value, (list, tuple)):
         return "\n".join(str(item) for item in value)
     return str(value)
 
 
-def _iter_leaves(
-    node: Mapping[str, Any],
-    prefix: Tuple[str, ...] = (),
-) -> Iterator[Tuple[Tuple[str, ...], Mapping[str, Any]]]:
-    """Yield ``(path, item)`` pairs for every leaf criterion in the tree."""
-    for key, value in node.items():
-        if not isinstance(key, str) or key.startswith("$"):
-            continue
-        if not isinstance(value, Mapping):
-            continue
-        child_keys = {str(k) for k in value.keys()}
-        if "$points" in child_keys or "$bonus" in child_keys:
-            yield prefix + (key,), value
-        else:
-            yield from _iter_leaves(value, prefix + (key,))
-
-
 def _student_block(student: Mapping[str, Any]) -> str:
     """Render the student profile section from its structured fields."""
     lines: List[str] = ["# Profil de l'étudiant"]
@@ -53,26 +38,23 @@ def _student_block(student: Mapping[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def _criterion_block(path: Tuple[str, ...], item: Mapping[str, Any]) -> str:
+def _criterion_block(path: Tuple[str, ...], item: Criterion) -> str:
     """Render a single criterion, its scale, and its analysis instructions."""
     lines: List[str] = [f"## {'.'.join(path)}"]
-    description = _as_text(item.get("$description", "")).strip()
+    description = _as_text(item.description or "").strip()
     if description:
         lines.append(description)
 
-    if "$points" in item:
-        _, total = item["$points"]
-        if total >= 0:
-            lines.append(f"Barème : 0 à {total} point(s).")
-        else:
-            lines.append(f"Pénalité : {total} à 0 point(s).")
-    elif "$bonus" in item:
-        _, total = item["$bonus"]
+    total = _export_number(item.available)
+    if item.is_bonus:
         lines.append(f"Bonus : 0 à {total} point(s).")
+    elif total >= 0:
+        lines.append(f"Barème : 0 à {total} point(s).")
+    else:
+        lines.append(f"Pénalité : {total} à 0 point(s).")
 
-    test = item.get("$test")
-    if test:
-        lines.append("Instructions : " + _as_text(test))
+    if item.prompt:
+        lines.append("Instructions : " + _as_text(item.prompt))
     else:
         lines.append(
             "Instructions : (aucune consigne spécifique — juge selon la description.)"
@@ -80,10 +62,10 @@ def _criterion_block(path: Tuple[str, ...], item: Mapping[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def build_prompt(data: Mapping[str, Any]) -> str:
+def build_prompt(data: Mapping[str, Any] | CriteriaTree) -> str:
     """Return the full grading prompt rendered from normalized criteria data."""
-    grading = data.get("grading") or {}
-    criteria = data.get("criteria") or {}
+    tree = data if isinstance(data, CriteriaTree) else build_tree(data)
+    grading = tree.grading or {}
     blocks: List[str] = []
 
     context = grading.get("context")
@@ -94,7 +76,7 @@ def build_prompt(data: Mapping[str, Any]) -> str:
     if student:
         blocks.append(_student_block(student))
 
-    leaves = list(_iter_leaves(criteria))
+    leaves = list(tree.leaves())
     criterion_texts = [_criterion_block(path, item) for path, item in leaves]
     blocks.append("# Critères à évaluer\n\n" + "\n\n".join(criterion_texts))
 
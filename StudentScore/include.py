@@ -0,0 +1,267 @@
+"""Criteria sections included from other files.
+
+A section written as ``{include: shared/code-quality.yml}`` (``$include`` in
+version 1 files) is replaced by the section stored in that file, so several
+labs can share one "code quality" block. Paths are resolved relative to the
+directory of the root criteria file, for nested includes too, and must stay
+inside that directory: criteria files come from student repositories, so an
+absolute path or one leaving the directory is refused. A file including
+itself, directly or not, is an error.
+
+Each file taking part in a document is a :class:`Source` that remembers where
+its content is mounted. Parsed fragments are cached by content hash, so
+editing one fragment only re-parses that fragment, and :func:`write_back`
+stores updated awards in the file they came from; :func:`locked_document`
+holds the write locks of all those files around a read-modify-write.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .schema import CriteriaValidationError, _add_error, _format_validation_errors
+from .traversal import is_raw_leaf
+
+
+INCLUDE_KEYS = ("include", "$include")
+_TEXT_KEYS = {"description", "schema_version", "$description", "$desc"}
+
+Mount = Tuple[Any, ...]
+
+
+class Source:
+    """One file of a criteria document and the fragments it includes."""
+
+    __slots__ = ("path", "mount", "content", "directive", "includes")
+
+    def __init__(
+        self,
+        path: Path,
+        mount: Mount,
+        content: bytes,
+        directive: str | None = None,
+    ) -> None:
+        self.path = path
+        self.mount = mount  # raw keys from the document root, () for the root
+        self.content = content
+        self.directive = directive  # the include path as written
+        self.includes: List[Source] = []
+
+    def walk(self) -> List[Source]:
+        """Return this source and every fragment below it, parents first."""
+        result: List[Source] = []
+        stack: List[Source] = [self]
+        while stack:
+            source = stack.pop()
+            result.append(source)
+            stack.extend(reversed(source.includes))
+        return result
+
+
+def _include_target(node: Any) -> str | None:
+    """Return the path of an include directive mapping, else None."""
+    if isinstance(node, dict) and len(node) == 1:
+        key, value = next(iter(node.items()))
+        if key in INCLUDE_KEYS and isinstance(value, str):
+            return value
+    return None
+
+
+def _include_sites(
+    section: Dict[Any, Any], mount: Mount
+) -> List[Tuple[Dict[Any, Any], Any, Mount, str]]:
+    """Return ``(parent, key, mount, target)`` for the includes of a section."""
+    sites = []
+    stack = [(section, mount)]
+    while stack:
+        node, path = stack.pop()
+        for key, value in node.items():
+            if str(key) in _TEXT_KEYS or not isinstance(value, dict):
+                continue
+            target = _include_target(value)
+            if target is not None:
+                sites.append((node, key, path + (key,), target))
+            elif not is_raw_leaf(value):
+                stack.append((value, path + (key,)))
+    return sites
+
+
+def _parse(path: Path, content: bytes, cache: Any) -> Any:
+    """Parse one file, through the per-content cache when given."""
+    from .formats import detect_format, loads
+
+    if cache is not None:
+        data = cache.get(content, "fragment")
+        if data is not None:
+            return data
+    data = loads(content, detect_format(path, content))
+    if cache is not None:
+        cache.put(content, "fragment", data)
+    return data
+
+
+def _fail(path: Mount, message: str) -> None:
+    """Raise a validation error located at ``path``."""
+    errors: List[Dict[str, Any]] = []
+    _add_error(errors, path, message)
+    raise CriteriaValidationError(_format_validation_errors(errors), errors=errors)
+
+
+def resolve_includes(
+    raw: Any,
+    path: str | Path,
+    content: bytes,
+    cache: Any = None,
+) -> Tuple[Any, Source]:
+    """Replace include directives in ``raw`` and return ``(raw, root source)``.
+
+    ``raw`` is the parsed root file and is modified in place. ``cache`` is an
+    optional :class:`~StudentScore.cache.CriteriaCache` used for fragments.
+    """
+    path = Path(path)
+    base = path.resolve().parent
+    root = Source(path, (), content)
+    criteria = raw.get("criteria") if isinstance(raw, dict) else None
+    if not isinstance(criteria, dict):
+        return raw, root
+
+    pending = [
+        (site, root, (path.resolve(),))
+        for site in _include_sites(criteria, ("criteria",))
+    ]
+    while pending:
+        (parent, key, mount, target), owner, chain = pending.pop()
+        fragment_path = (base / target).resolve()
+        if not fragment_path.is_relative_to(base):
+            _fail(mount, f"cannot include {target}: outside {base}")
+        if fragment_path in chain:
+            cycle = " -> ".join(str(item.name) for item in (*chain, fragment_path))
+            _fail(mount, f"include cycle: {cycle}")
+        try:
+            fragment_content = fragment_path.read_bytes()
+        except OSError as exc:
+            _fail(mount, f"cannot include {target}: {exc.strerror or exc}")
+        fragment = _parse(fragment_path, fragment_content, cache)
+        if not isinstance(fragment, dict):
+            _fail(mount, f"included file {target} must hold a section mapping")
+
+        source = Source(fragment_path, mount, fragment_content, target)
+        owner.includes.append(source)
+        parent[key] = fragment
+        pending.extend(
+            (site, source, (*chain, fragment_path))
+            for site in _include_sites(fragment, mount)
+        )
+    return raw, root
+
+
+def _subtree(data: Any, mount: Mount) -> Any:
+    """Return the node of ``data`` found at ``mount``."""
+    for key in mount:
+        data = data[key]
+    return data
+
+
+def _replace_at(node: Dict[Any, Any], path: Mount, value: Any) -> Dict[Any, Any]:
+    """Return a copy of ``node`` with ``value`` at ``path``, copying the spine."""
+    result = dict(node)
+    current = result
+    for key in path[:-1]:
+        current[key] = dict(current[key])
+        current = current[key]
+    current[path[-1]] = value
+    return result
+
+
+def source_data(data: Any, source: Source) -> Any:
+    """Return the part of ``data`` stored in ``source``'s own file.
+
+    Sections mounted from fragments are put back as include directives, with
+    the directive key matching the document's schema version.
+    """
+    version = data.get("schema_version", 1) if isinstance(data, dict) else 1
+    directive_key = "include" if str(version) == "2" else "$include"
+    result = _subtree(data, source.mount)
+    for child in source.includes:
+        relative = child.mount[len(source.mount) :]
+        result = _replace_at(result, relative, {directive_key: child.directive})
+    return result
+
+
+def write_back(data: Any, root: Source, *, fsync: bool = False) -> List[Path]:
+    """Write updated document data into each file it came from.
+
+    Only files whose content changes are rewritten, atomically and in one
+    :class:`~StudentScore.atomic.WriteBatch`; the list of written paths is
+    returned. A fragment included twice must end up with the same content.
+    """
+    from .atomic import WriteBatch
+    from .patch import render_update
+
+    rendered: Dict[Path, bytes] = {}
+    originals: Dict[Path, bytes] = {}
+    for source in root.walk():
+        content = render_update(
+            source_data(data, source),
+            source.content,
+            source=source.path,
+            destination=source.path,
+        )
+        if rendered.get(source.path, content) != content:
+            raise ValueError(
+                f"{source.path} is included several times with different content"
+            )
+        rendered[source.path] = content
+        originals[source.path] = source.content
+
+    with WriteBatch(fsync=fsync) as batch:
+        for path, content in rendered.items():
+            if content != originals[path]:
+                batch.write(path, content)
+    return [path for path, content in rendered.items() if content != originals[path]]
+
+
+@contextmanager
+def locked_document(
+    path: str | Path,
+    cache: Any = None,
+    *,
+    output: str | Path | None = None,
+    timeout: float | None,
+) -> Iterator[Tuple[Any, Any, Source]]:
+    """Load a document while holding the locks of the files it is written to.
+
+    Yields :func:`~StudentScore.cache.load_document`'s ``(raw, normalized,
+    source)``. With an ``output``, only that file is locked; otherwise the
+    root file and every fragment :func:`write_back` may rewrite are. The
+    fragments are only known once the document is read, so it is read again
+    when they were not all locked yet.
+    """
+    from .atomic import file_locks
+    from .cache import load_document
+
+    if output is not None:
+        with file_locks([output], timeout):
+            yield load_document(path, cache)
+        return
+    locked = {Path(path).resolve()}
+    while True:
+        with file_locks(locked, timeout):
+            document = load_document(path, cache)
+            paths = {source.path.resolve() for source in document[2].walk()}
+            if paths <= locked:
+                yield document
+                return
+        locked |= paths
+
+
+__all__ = [
+    "INCLUDE_KEYS",
+    "Source",
+    "locked_document",
+    "resolve_includes",
+    "source_data",
+    "write_back",
+]
@@ -0,0 +1,344 @@
+"""Re-validation that only re-checks the criteria which changed.
+
+``score apply`` and ``score grade`` change a handful of awards in a rubric
+that was validated when it was loaded. :func:`revalidate` checks those leaves
+again and patches them into the normalized document, copying the sections on
+their path and sharing everything else, so its cost follows the size of the
+edit rather than the size of the rubric.
+
+When the edits are not known, for instance while a teacher edits a rubric
+under ``score check --watch``, :class:`IncrementalValidator` keeps a
+structural digest of every section and leaf from its previous run. A section
+whose digest is unchanged is not walked again: its earlier normalized result
+is reused, so only the edited subtrees are validated, and the digests tell
+which subtrees those were. The section digests are computed once per run,
+bottom-up: a section hashes the ``repr`` of its values and leaves and folds in
+the digests of its child sections, so each node is read once however deep it
+is nested. :func:`watch` polls the files of a document and re-validates it this
+way whenever one of them changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+from .formats import detect_format, loads
+from .include import resolve_includes
+from .index import CriteriaIndex
+from .limits import Limits
+from .locate import locate_errors
+from .schema import (
+    CriteriaValidationError,
+    NormalizedCriteria,
+    _format_location,
+    _format_validation_errors,
+    _SectionValidator,
+    _validate,
+    _validate_leaf,
+)
+from .traversal import copy_path, get_path, is_v1_leaf, is_v2_leaf
+
+
+Key = Tuple[str, ...]
+
+
+def _digest(node: Any) -> bytes:
+    """Return a structural digest of a raw leaf.
+
+    ``repr`` of plain mappings, lists and scalars runs without calling back
+    into Python, which makes this much cheaper than walking the leaf.
+    """
+    return hashlib.blake2b(repr(node).encode(), digest_size=16).digest()
+
+
+def _digests(
+    root: Mapping[Any, Any], prefix: Key, is_leaf: Callable[[Any], bool]
+) -> Dict[Key, bytes]:
+    """Return the digest of every section below ``root``, by path.
+
+    A section's digest folds its values and leaves and the keys and digests
+    of its child sections, so each node is read once.
+    """
+    digests: Dict[Key, bytes] = {}
+    stack = [(prefix, iter(root.items()), hashlib.blake2b(digest_size=16))]
+    while stack:
+        path, items, digest = stack[-1]
+        for key, value in items:
+            text = str(key)
+            if not isinstance(value, Mapping) or is_leaf(value):
+                digest.update(repr((text, value)).encode())
+                continue
+            section = hashlib.blake2b(digest_size=16)
+            stack.append(((*path, text), iter(value.items()), section))
+            break
+        else:
+            stack.pop()
+            digests[path] = digest.digest()
+            if stack:
+                digest = stack[-1][2]
+                digest.update(repr(path[-1]).encode())
+                digest.update(digests[path])
+    return digests
+
+
+class _Entry:
+    """Digest and normalized result of one section or leaf of the last run."""
+
+    __slots__ = ("digest", "item", "children", "leaves")
+
+    def __init__(self, digest: bytes) -> None:
+        self.digest = digest
+        self.item: Any = None  # None when the subtree had errors
+        self.children: Dict[str, _Entry] = {}
+        self.leaves = 0
+
+
+class _DigestingValidator(_SectionValidator):
+    """Section validator that reuses the subtrees whose digest did not change.
+
+    Unchanged sections are pruned from the walk: their normalized result, and
+    the digests below them, are taken over from ``previous`` as they are.
+    """
+
+    def __init__(self, *args: Any, previous: _Entry | None) -> None:
+        super().__init__(*args)
+        self.previous = previous
+        self.root: _Entry | None = None
+        self.checked: List[str] = []
+        self.changed: List[str] = []
+        self._is_leaf = is_v2_leaf if self.schema_version == 2 else is_v1_leaf
+        self._digests: Dict[Key, bytes] = {}
+        self._reused: Dict[Key, _Entry] = {}
+        self._previous: List[_Entry | None] = []
+        self._entries: List[_Entry] = []
+        self._marks: List[Tuple[int, int]] = []
+        self._dirty: List[bool] = []
+
+    def _before(self, key: Any) -> _Entry | None:
+        """Return the previous entry of a child of the current section."""
+        parent = self._previous[-1] if self._previous else None
+        return None if parent is None else parent.children.get(str(key))
+
+    def prune(self, path: Key, key: Any, node: Any) -> bool:
+        if super().prune(path, key, node):
+            return True
+        if not isinstance(node, Mapping) or self._is_leaf(node):
+            return False
+        previous = self._before(key)
+        digest = self._digests[path]
+        if previous is None or previous.item is None or previous.digest != digest:
+            return False
+        self._reused[path] = previous
+        return True
+
+    def enter_section(self, path: Key, key: Any, node: Any) -> None:
+        # Taken first: the section's own fields are checked on entering it.
+        mark = (len(self.errors), self.leaves)
+        super().enter_section(path, key, node)
+        if not self._entries:
+            self._digests = _digests(node, path, self._is_leaf)
+        entry = _Entry(self._digests[path])
+        if self._entries:
+            self._entries[-1].children[str(key)] = entry
+        else:
+            self.root = entry
+        self._previous.append(self._before(key) if self._previous else self.previous)
+        self._entries.append(entry)
+        self._marks.append(mark)
+        self._dirty.append(False)
+
+    def leave_section(self, path: Key, key: Any, node: Any) -> None:
+        result = self._stack[-1]
+        super().leave_section(path, key, node)
+        entry = self._entries.pop()
+        previous = self._previous.pop()
+        errors, leaves = self._marks.pop()
+        dirty = self._dirty.pop()
+        entry.leaves = self.leaves - leaves
+        if len(self.errors) == errors:
+            entry.item = result
+        if previous is None or previous.digest != entry.digest:
+            # Report the deepest edited subtrees: a section only when no
+            # child of it was edited, e.g. when its description changed.
+            if not dirty:
+                self.changed.append(_format_location(path))
+            if self._dirty:
+                self._dirty[-1] = True
+
+    def visit_value(self, path: Key, key: Any, value: Any) -> None:
+        reused = self._reused.pop(path, None)
+        if reused is None:
+            super().visit_value(path, key, value)
+            return
+        self.leaves += reused.leaves
+        maximum = self.limits.max_leaves
+        if maximum is not None and self.leaves > maximum:
+            self._limit_exceeded(path, f"more than {maximum} criteria")
+        self._stack[-1][str(key)] = reused.item
+        self._entries[-1].children[str(key)] = reused
+
+    def _validate_leaf(self, path: Sequence[Any], node: Any) -> Dict[str, Any]:
+        entry = self._entries[-1].children[str(path[-1])] = _Entry(_digest(node))
+        entry.leaves = 1
+        previous = self._before(path[-1])
+        if previous is not None and previous.digest == entry.digest:
+            if previous.item is not None:
+                entry.item = previous.item
+                return entry.item
+        else:
+            self.changed.append(_format_location(path))
+            self._dirty[-1] = True
+        errors = len(self.errors)
+        item = super()._validate_leaf(path, node)
+        self.checked.append(_format_location(path))
+        if len(self.errors) == errors:
+            entry.item = item
+        return item
+
+
+class IncrementalValidator:
+    """Validate successive versions of one document, re-checking what changed.
+
+    After each :meth:`validate`, ``checked`` lists the leaves that had to be
+    validated and ``changed`` the deepest subtrees whose digest differs from
+    the previous run. Unchanged subtrees are shared with the previous result,
+    so results should be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: Limits | None = None,
+        max_errors: int | None = None,
+    ) -> None:
+        self.limits = limits
+        self.max_errors = max_errors
+        self.checked: List[str] = []
+        self.changed: List[str] = []
+        self._root: _Entry | None = None
+        self._version: Any = None
+
+    def validate(self, data: Any) -> NormalizedCriteria:
+        """Validate ``data``, reusing the subtrees unchanged since the last call."""
+        version = data.get("schema_version") if isinstance(data, dict) else None
+        # Leaves normalize differently under another schema version.
+        previous = self._root if version == self._version else None
+        validators: List[_DigestingValidator] = []
+
+        def factory(*args: Any) -> _DigestingValidator:
+            validators.append(_DigestingValidator(*args, previous=previous))
+            return validators[-1]
+
+        try:
+            return _validate(data, (), self.limits, self.max_errors, factory)
+        finally:
+            if validators:
+                validator = validators[0]
+                self._root = validator.root
+                self._version = version
+                self.checked = validator.checked
+                self.changed = validator.changed
+
+
+def revalidate(
+    data: Any,
+    normalized: NormalizedCriteria,
+    changed: Iterable[str],
+    *,
+    index: CriteriaIndex[Dict[str, Any]] | None = None,
+) -> NormalizedCriteria:
+    """Return ``normalized`` updated for edits to the ``changed`` leaves of ``data``.
+
+    ``normalized`` is the validated form of ``data`` before the edits, which
+    touched only the leaves with the given dotted ids. Pass the ``index`` of
+    the raw ``criteria`` section, or of the section ``data`` was copied from
+    by :func:`~StudentScore.apply.apply_results`, to avoid indexing it again.
+    ``normalized`` itself is not modified; the result shares its unchanged
+    sections.
+    """
+    section = data.get("criteria") if isinstance(data, dict) else None
+    if not isinstance(section, dict):
+        raise ValueError("criteria definition must be a mapping")
+    if index is None:
+        index = CriteriaIndex.from_raw(section)
+
+    version = int(normalized.get("schema_version", 1))
+    errors: List[Dict[str, Any]] = []
+    result = NormalizedCriteria(normalized)
+    copies: Dict[Key, Dict[str, Any]] = {(): dict(normalized["criteria"])}
+    result["criteria"] = copies[()]
+    for cid in changed:
+        path = index.path(cid)
+        node = get_path(section, path)
+        item = _validate_leaf(node, errors, ("criteria", *path), version)
+        copy_path(copies, path[:-1])[path[-1]] = item
+
+    if errors:
+        message = _format_validation_errors(errors)
+        raise CriteriaValidationError(message, errors=errors)
+    return result
+
+
+def _stamp(paths: Sequence[Path]) -> List[Tuple[int, int] | None]:
+    """Return the modification time and size of each file, None if missing."""
+    stamps: List[Tuple[int, int] | None] = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            stamps.append(None)
+        else:
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def watch(
+    path: str | Path,
+    *,
+    interval: float = 1.0,
+    validator: IncrementalValidator | None = None,
+) -> Iterator[Tuple[NormalizedCriteria | None, Exception | None]]:
+    """Yield ``(normalized, error)`` for a criteria file, then after each change.
+
+    The file and the fragments it includes are polled every ``interval``
+    seconds. A file that cannot be loaded yields its error and is watched
+    until it is fixed. ``validator`` keeps the digests between versions.
+    """
+    path = Path(path)
+    validator = validator or IncrementalValidator()
+    paths = [path]
+    while True:
+        stamp = _stamp(paths)
+        try:
+            content = path.read_bytes()
+            raw = loads(content, detect_format(path, content), limits=validator.limits)
+            raw, source = resolve_includes(raw, path, content)
+            sources = [item.path for item in source.walk()]
+            if sources != paths:
+                paths, stamp = sources, _stamp(sources)
+            try:
+                normalized = validator.validate(raw)
+            except CriteriaValidationError as exc:
+                raise locate_errors(exc, source) from None
+        except Exception as exc:  # noqa: BLE001 - reported, then watched again
+            yield None, exc
+        else:
+            yield normalized, None
+        while _stamp(paths) == stamp:
+            time.sleep(interval)
+
+
+__all__ = ["IncrementalValidator", "revalidate", "watch"]
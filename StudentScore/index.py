@@ -0,0 +1,153 @@
+"""Dotted criterion-id index shared by every module resolving ids.
+
+Results files, the LLM grader and the objective CI step all address leaf
+criteria by dotted id (``"code.overall.naming"``). :class:`CriteriaIndex` is
+built once per rubric and answers those lookups without walking the tree
+again: exact ids resolve through a flat mapping, and a trie of the id parts
+selects whole subtrees (``"code"`` or ``"code.*"``).
+
+Leaves are numbered in document order. Because a subtree's leaves are
+contiguous in that order, every trie node only stores the range of ordinals
+below it, so a prefix query is a slice of the leaf list.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Mapping, Tuple, TypeVar
+
+from .traversal import is_raw_leaf, iter_leaves
+
+
+T = TypeVar("T")
+
+_TEXT_KEYS = {"description", "schema_version", "$description", "$desc"}
+
+
+def _is_text_key(path: Tuple[str, ...], key: Any, node: Any) -> bool:
+    """Prune description entries: they never hold criteria."""
+    return str(key) in _TEXT_KEYS
+
+
+class _TrieNode:
+    """One id part, with the ordinal range of the leaves below it."""
+
+    __slots__ = ("children", "start", "stop")
+
+    def __init__(self, start: int) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.start = start
+        self.stop = start
+
+
+class CriteriaIndex(Generic[T]):
+    """Immutable id index over the leaves of one criteria tree.
+
+    ``T`` is whatever the leaves are: raw YAML mappings for
+    :meth:`from_raw`, :class:`~StudentScore.model.Criterion` nodes for
+    :meth:`from_tree`. Ordinals are stable for a given rubric layout.
+    """
+
+    __slots__ = ("_ids", "_items", "_ordinals", "_paths", "_root")
+
+    def __init__(self, leaves: Iterable[Tuple[Tuple[str, ...], T]]) -> None:
+        self._ids: List[str] = []
+        self._items: List[T] = []
+        self._paths: List[Tuple[str, ...]] = []
+        self._ordinals: Dict[str, int] = {}
+        self._root = _TrieNode(0)
+
+        stack: List[_TrieNode] = [self._root]
+        previous: Tuple[str, ...] = ()
+        for path, item in leaves:
+            ordinal = len(self._ids)
+            # Close the trie nodes the previous leaf does not share.
+            shared = 0
+            for left, right in zip(previous[:-1], path[:-1]):
+                if left != right:
+                    break
+                shared += 1
+            del stack[shared + 1 :]
+
+            for part in path[shared:]:
+                node = stack[-1].children.get(part)
+                if node is None:
+                    node = stack[-1].children[part] = _TrieNode(ordinal)
+                stack.append(node)
+            for node in stack:
+                node.stop = ordinal + 1
+            stack.pop()  # the leaf's own node is never a parent
+
+            cid = ".".join(path)
+            self._ordinals[cid] = ordinal
+            self._ids.append(cid)
+            self._items.append(item)
+            self._paths.append(path)
+            previous = path
+
+    @classmethod
+    def from_raw(
+        cls, section: Mapping[str, Any]
+    ) -> CriteriaIndex[Dict[str, Any]]:
+        """Index the leaves of a raw ``criteria`` section (version 1 or 2)."""
+        return cls(iter_leaves(section, is_leaf=is_raw_leaf, prune=_is_text_key))
+
+    @classmethod
+    def from_tree(cls, tree: Any) -> CriteriaIndex[Any]:
+        """Index the :class:`~StudentScore.model.Criterion` leaves of a tree."""
+        return cls(tree.leaves())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, criterion_id: object) -> bool:
+        return criterion_id in self._ordinals
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __getitem__(self, criterion_id: str) -> T:
+        return self._items[self._ordinals[criterion_id]]
+
+    def get(self, criterion_id: str, default: Any = None) -> T | Any:
+        """Return the leaf for an exact dotted id, or ``default``."""
+        ordinal = self._ordinals.get(criterion_id)
+        return default if ordinal is None else self._items[ordinal]
+
+    def ordinal(self, criterion_id: str) -> int:
+        """Return the document-order position of a leaf id."""
+        return self._ordinals[criterion_id]
+
+    def path(self, criterion_id: str) -> Tuple[str, ...]:
+        """Return the keys leading to a leaf, for ids whose keys contain dots."""
+        return self._paths[self._ordinals[criterion_id]]
+
+    def ids(self) -> List[str]:
+        """Return every leaf id in document order."""
+        return list(self._ids)
+
+    def items(self) -> Iterator[Tuple[str, T]]:
+        """Yield ``(id, leaf)`` pairs in document order."""
+        return zip(self._ids, self._items)
+
+    def select(self, pattern: str) -> List[Tuple[str, T]]:
+        """Return ``(id, leaf)`` pairs for an exact id or a subtree prefix.
+
+        ``"code"`` and ``"code.*"`` both select every leaf below the ``code``
+        section; ``"*"`` selects everything. Unknown prefixes select nothing.
+        """
+        if pattern in {"", "*"}:
+            return list(self.items())
+        if pattern.endswith(".*"):
+            pattern = pattern[:-2]
+        node = self._root
+        for part in pattern.split("."):
+            child = node.children.get(part)
+            if child is None:
+                return []
+            node = child
+        return list(
+            zip(self._ids[node.start : node.stop], self._items[node.start : node.stop])
+        )
+
+
+__all__ = ["CriteriaIndex"]
@@ -0,0 +1,96 @@
+"""Resource limits applied while loading criteria files.
+
+Students can push anything to ``criteria.yml``: a YAML alias bomb ("billion
+laughs") or a file nested thousands of levels deep would stall or exhaust a
+grading runner. Every load is therefore bounded by four limits:
+
+``max_bytes``
+    size of the file content, checked before parsing;
+``max_aliases``
+    number of nodes reached through YAML aliases, counted as the composer
+    expands them;
+``max_depth``
+    nesting depth of mappings and lists, the document root being level 1;
+``max_leaves``
+    number of leaf criteria, counted by ``Criteria``.
+
+A document going past a limit is rejected with a
+:class:`~StudentScore.schema.CriteriaValidationError` as soon as the limit is
+reached. The defaults are far above any real rubric; set
+``STUDENTSCORE_LIMITS`` (e.g. ``max_bytes=1000000,max_depth=32``) to change
+them, ``none`` disabling a limit.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+
+LIMITS_ENV = "STUDENTSCORE_LIMITS"
+
+_FIELDS = ("max_bytes", "max_aliases", "max_depth", "max_leaves")
+
+
+class Limits:
+    """Upper bounds for one criteria document; None disables a bound."""
+
+    __slots__ = _FIELDS
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int | None = 8 * 1024 * 1024,
+        max_aliases: int | None = 10_000,
+        max_depth: int | None = 64,
+        max_leaves: int | None = 100_000,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_aliases = max_aliases
+        self.max_depth = max_depth
+        self.max_leaves = max_leaves
+
+    @classmethod
+    def from_env(cls, value: str | None) -> Limits:
+        """Return the defaults overridden by a ``name=value,...`` string."""
+        overrides: Dict[str, Any] = {}
+        for entry in (value or "").split(","):
+            if not entry.strip():
+                continue
+            name, _, number = entry.partition("=")
+            name = name.strip()
+            if name not in _FIELDS:
+                raise ValueError(
+                    f"{LIMITS_ENV}: unknown limit {name!r}, "
+                    f"expected one of {', '.join(_FIELDS)}."
+                )
+            number = number.strip().lower()
+            try:
+                overrides[name] = None if number == "none" else int(number)
+            except ValueError:
+                raise ValueError(
+                    f"{LIMITS_ENV}: {name} must be an integer or 'none'."
+                ) from None
+        return cls(**overrides)
+
+    def replace(self, **changes: int | None) -> Limits:
+        """Return a copy with some limits changed."""
+        values = {name: getattr(self, name) for name in _FIELDS}
+        values.update(changes)
+        return Limits(**values)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Limits):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _FIELDS)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in _FIELDS)
+        return f"Limits({values})"
+
+
+UNLIMITED = Limits(max_bytes=None, max_aliases=None, max_depth=None, max_leaves=None)
+DEFAULT_LIMITS = Limits.from_env(os.environ.get(LIMITS_ENV))
+
+
+__all__ = ["DEFAULT_LIMITS", "LIMITS_ENV", "Limits", "UNLIMITED"]
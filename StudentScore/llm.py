@@ -12,7 +12,8 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, List, Mapping
 
-from .grading import _iter_leaves, build_prompt
+from .grading import build_prompt
+from .model import CriteriaTree, build_tree
 
 
 DEFAULT_MODEL = "claude-opus-4-8"
@@ -23,10 +24,9 @@ _DEFAULT_CONTEXT = (
 )
 
 
-def _criteria_ids(data: Mapping[str, Any]) -> List[str]:
+def _criteria_ids(tree: CriteriaTree) -> List[str]:
     """Return the dotted ids of every leaf criterion, in document order."""
-    criteria = data.get("criteria") or {}
-    return [".".join(path) for path, _ in _iter_leaves(criteria)]
+    return tree.index.ids()
 
 
 def _results_schema(ids: List[str]) -> Dict[str, Any]:
@@ -62,7 +62,7 @@ def _render_sources(sources: Mapping[str, str]) -> str:
 
 
 def grade_with_llm(
-    data: Mapping[str, Any],
+    data: Mapping[str, Any] | CriteriaTree,
     sources: Mapping[str, str],
     *,
     model: str = DEFAULT_MODEL,
@@ -81,16 +81,17 @@ def grade_with_llm(
             "Install it with: pip install 'StudentScore[llm]'"
         ) from exc
 
-    ids = _criteria_ids(data)
+    tree = data if isinstance(data, CriteriaTree) else build_tree(data)
+    ids = _criteria_ids(tree)
     if not ids:
         return {}
 
-    grading = data.get("grading") or {}
+    grading = tree.grading or {}
     context = grading.get("context") or _DEFAULT_CONTEXT
     if isinstance(context, list):
         context = "\n".join(str(item) for item in context)
 
-    prompt = build_prompt(data)
+    prompt = build_prompt(tree)
     user_content = (
         f"{prompt}\n\n"
         "# Submitted files\n\n"
@@ -0,0 +1,106 @@
+"""Source locations for validation errors, computed only when they occur.
+
+Criteria files are loaded into plain Python objects, without the YAML marks
+telling where each node came from: keeping them would slow down every valid
+run. When validation fails, :func:`locate_errors` composes the offending file
+again, this time as a node graph with marks, and follows each error's path to
+add ``file:line:col`` to it. Errors inside an included fragment point into that
+fragment. JSON files are composed with the YAML parser as well; MessagePack
+has no text positions and only gets the file name.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from . import yaml
+from .formats import MSGPACK, detect_format
+from .include import Source
+from .schema import CriteriaValidationError, _format_validation_errors
+
+
+def _display(path: Path) -> str:
+    """Return ``path`` relative to the working directory when it is below it."""
+    try:
+        return str(path.relative_to(Path.cwd()))
+    except ValueError:
+        return str(path)
+
+
+def _compose(source: Source) -> Any:
+    """Return the marked node graph of a source, or None when unavailable."""
+    if detect_format(source.path, source.content) == MSGPACK:
+        return None
+    try:
+        return yaml.compose(source.content.decode("utf-8"))
+    except (UnicodeDecodeError, yaml.YAMLError):
+        return None
+
+
+def _owner(sources: Sequence[Source], loc: Sequence[Any]) -> Source:
+    """Return the source holding the deepest mount that prefixes ``loc``."""
+    best = sources[0]
+    for source in sources:
+        mount = source.mount
+        if len(mount) > len(best.mount) and tuple(loc[: len(mount)]) == mount:
+            best = source
+    return best
+
+
+def find_mark(node: Any, path: Sequence[Any]) -> Any:
+    """Return the mark of the deepest node of ``path`` found below ``node``.
+
+    Mapping entries point at their key, so a bad value is reported on the line
+    naming it; a missing key points at the enclosing mapping.
+    """
+    mark = node.start_mark
+    for part in path:
+        if isinstance(node, yaml.MappingNode):
+            for key_node, value_node in node.value:
+                scalar = isinstance(key_node, yaml.ScalarNode)
+                if scalar and key_node.value == str(part):
+                    mark, node = key_node.start_mark, value_node
+                    break
+            else:
+                break
+        elif (
+            isinstance(node, yaml.SequenceNode)
+            and isinstance(part, int)
+            and 0 <= part < len(node.value)
+        ):
+            node = node.value[part]
+            mark = node.start_mark
+        else:
+            break
+    return mark
+
+
+def locate_errors(
+    error: CriteriaValidationError, root: Source
+) -> CriteriaValidationError:
+    """Return ``error`` with ``file``, ``line`` and ``column`` on each entry."""
+    sources = root.walk()
+    documents: Dict[int, Any] = {}
+    located: List[Dict[str, Any]] = []
+    for entry in error.errors:
+        entry = dict(entry)
+        loc = tuple(entry.get("loc", ()))
+        source = _owner(sources, loc)
+        if id(source) not in documents:
+            documents[id(source)] = _compose(source)
+        entry["file"] = _display(source.path)
+        document = documents[id(source)]
+        if document is not None:
+            mark = find_mark(document, loc[len(source.mount) :])
+            entry["line"] = mark.line + 1
+            entry["column"] = mark.column + 1
+        located.append(entry)
+    return CriteriaValidationError(
+        _format_validation_errors(located, truncated=error.truncated),
+        errors=located,
+        truncated=error.truncated,
+    )
+
+
+__all__ = ["find_mark", "locate_errors"]
@@ -0,0 +1,186 @@
+"""Milestone index: the leaves of a rubric grouped by ``milestone`` tag.
+
+Intermediate reviews (``score grade --milestone mid-review``) only look at
+the criteria carrying a tag. :class:`MilestoneIndex` is built in one walk of
+a rubric and records, for every tag, the paths of its leaves in document
+order, along with the number of leaves below every section. Filtered views
+for any set of tags are then assembled from those paths alone, in time
+proportional to the view: only the sections on the way to a kept leaf are
+copied, with their descriptions, and a section keeping all of its leaves is
+shared as is, unless it holds something a view leaves out (a section without
+leaves, or a stray value).
+
+Built from a :class:`~StudentScore.model.CriteriaTree`, the index also holds
+the per-tag subtotals the tree computed while it was built; they follow the
+awards later set on that tree.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .index import _is_text_key
+from .model import CriteriaTree, Points, Subtotal, iter_nodes
+from .traversal import (
+    ENTER,
+    LEAF,
+    LEAVE,
+    VALUE,
+    Event,
+    _raw_key,
+    is_raw_leaf,
+    iter_tree,
+)
+
+
+Path = Tuple[str, ...]
+
+_TEXT_KEYS = ("description", "$description", "$desc")
+_SHARED = object()
+
+
+def _raw_tag(item: Mapping[str, Any]) -> str | None:
+    """Return the milestone tag of a raw leaf (version 1 or 2)."""
+    name = item.get("milestone", item.get("$milestone"))
+    return name if isinstance(name, str) else None
+
+
+def _section_text(section: Mapping[Any, Any]) -> Dict[Any, Any]:
+    """Return a new section holding only the description of ``section``."""
+    return {key: section[key] for key in _TEXT_KEYS if key in section}
+
+
+class MilestoneIndex:
+    """Leaf paths, section sizes and subtotals of a rubric, per milestone tag."""
+
+    __slots__ = ("_leaves", "_sizes", "_trimmed", "subtotals")
+
+    def __init__(
+        self,
+        events: Iterable[Event],
+        tag: Callable[[Any], str | None],
+        subtotals: Mapping[str, Subtotal] | None = None,
+    ) -> None:
+        self._leaves: Dict[str, List[Tuple[int, Path]]] = {}
+        self._sizes: Dict[Path, int] = {}
+        # Sections a view cannot share even when all their leaves are kept.
+        self._trimmed: Set[Path] = set()
+        self.subtotals: Mapping[str, Subtotal] = subtotals or {}
+
+        starts: List[int] = []
+        ordinal = 0
+        for event, path, key, node in events:
+            if event == ENTER:
+                starts.append(ordinal)
+            elif event == LEAVE:
+                size = self._sizes[path] = ordinal - starts.pop()
+                if path and (size == 0 or path in self._trimmed):
+                    self._trimmed.add(path[:-1])
+            elif event == VALUE:
+                if str(key) not in _TEXT_KEYS:
+                    self._trimmed.add(path[:-1])
+            elif event == LEAF:
+                name = tag(node)
+                if name is not None:
+                    self._leaves.setdefault(name, []).append((ordinal, path))
+                ordinal += 1
+
+    @classmethod
+    def from_raw(cls, section: Mapping[str, Any]) -> MilestoneIndex:
+        """Index the leaves of a raw ``criteria`` section (version 1 or 2)."""
+        events = iter_tree(section, is_leaf=is_raw_leaf, prune=_is_text_key)
+        return cls(events, _raw_tag)
+
+    @classmethod
+    def from_tree(cls, tree: CriteriaTree) -> MilestoneIndex:
+        """Index a criteria tree, sharing its live per-tag subtotals."""
+        events = iter_nodes(tree.root)
+        return cls(events, lambda criterion: criterion.milestone, tree.milestones)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._leaves
+
+    def names(self) -> List[str]:
+        """Return the tags in order of first appearance."""
+        return list(self._leaves)
+
+    def _select(self, names: Sequence[str]) -> List[Path]:
+        """Return the leaf paths of every tag in ``names``, in document order."""
+        groups = [self._leaves.get(name, []) for name in dict.fromkeys(names)]
+        return [path for _, path in heapq.merge(*groups)]
+
+    def ids(self, names: Sequence[str]) -> List[str]:
+        """Return the dotted ids of the leaves tagged with any of ``names``."""
+        return [".".join(path) for path in self._select(names)]
+
+    def points(self, names: Sequence[str]) -> Dict[str, Points]:
+        """Return the got/total/bonus subtotals of the given tags."""
+        return {
+            name: self.subtotals[name].as_points()
+            for name in names
+            if name in self.subtotals
+        }
+
+    def _whole(self, path: Path, kept: int) -> bool:
+        """Return True when a view keeps the section at ``path`` as it is."""
+        return kept == self._sizes.get(path, 0) and path not in self._trimmed
+
+    def view(
+        self, document: Mapping[str, Any], names: Sequence[str]
+    ) -> Tuple[Dict[str, Any], int]:
+        """Return ``(view, kept)``: ``document`` reduced to the tagged leaves.
+
+        ``document`` is the raw or normalized mapping the index was built
+        from, or a copy with the same layout. Its ``criteria`` section keeps
+        the leaves tagged with any of ``names`` and the sections leading to
+        them; the other top-level keys (``grading``, ...) are kept as is.
+        Sections left without leaves and values other than descriptions are
+        dropped, as ``filter_milestone`` does.
+        """
+        section = document.get("criteria")
+        if not isinstance(section, dict):
+            raise ValueError("criteria definition must be a mapping")
+
+        selected = self._select(names)
+        counts: Dict[Path, int] = {}
+        for path in selected:
+            for depth in range(1, len(path)):
+                counts[path[:depth]] = counts.get(path[:depth], 0) + 1
+
+        view = type(document)(document)
+        if self._whole((), len(selected)) and selected:
+            return view, len(selected)
+
+        root = view["criteria"] = _section_text(section)
+        copies: Dict[Path, Any] = {(): root}
+        for path in selected:
+            source, target = section, root
+            for depth in range(1, len(path) + 1):
+                key = _raw_key(source, path[depth - 1])
+                source = source[key]
+                prefix = path[:depth]
+                copy = copies.get(prefix)
+                if copy is _SHARED:
+                    break
+                if depth == len(path) or self._whole(prefix, counts[prefix]):
+                    target[key] = source  # a leaf, or a section kept whole
+                    copies[prefix] = _SHARED
+                    break
+                if copy is None:
+                    copy = copies[prefix] = target[key] = _section_text(source)
+                target = copy
+        return view, len(selected)
+
+
+__all__ = ["MilestoneIndex"]
@@ -0,0 +1,486 @@
+"""Compact typed model of a normalized criteria tree.
+
+``Criteria`` returns nested dictionaries keyed by ``$``-prefixed fields, with
+two-item lists for points. :func:`build_tree` turns that mapping into slotted
+:class:`Section` and :class:`Criterion` nodes: points become plain floats, and
+keys and descriptions are interned so that a rubric loaded for hundreds of
+students keeps a single copy of its text. Sections carry the got/total/bonus
+subtotals of their subtree, so changing one award only touches its ancestors.
+"""
+
+from __future__ import annotations
+
+from collections import namedtuple
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from .index import CriteriaIndex
+from .traversal import (
+    ENTER,
+    LEAF,
+    Event,
+    Visitor,
+    is_normalized_leaf,
+    iter_tree,
+    walk,
+)
+
+
+Points = namedtuple("Points", ["got", "total", "bonus"])
+
+Text = str | Tuple[str, ...]
+
+# Version 1 files may spell the description key either way; it is kept as is.
+_DESCRIPTION = "$description"
+_DESC = "$desc"
+
+
+def _intern_text(value: Any) -> Text | None:
+    """Intern a description (string or list of strings) for sharing."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return sys.intern(value)
+    return tuple(sys.intern(str(item)) for item in value)
+
+
+def _export_text(value: Text | None) -> str | List[str] | None:
+    """Return a stored description in the normalized mapping layout."""
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _description(node: Mapping[str, Any]) -> Tuple[Any, str]:
+    """Return a normalized node's description and the key it is stored under."""
+    if "$desc" in node and "$description" not in node:
+        return node["$desc"], _DESC
+    return node.get("$description"), _DESCRIPTION
+
+
+def _export_number(value: float) -> float | int:
+    """Return an int when the numeric value is integral, else the float."""
+    return int(value) if float(value).is_integer() else value
+
+
+class ScoreSummary:
+    """Grade statistics derived from already aggregated points."""
+
+    def __init__(self, points: Points) -> None:
+        self._points = points
+
+    @property
+    def points(self) -> Points:
+        """Return the aggregated points, bonus, and total values."""
+        return self._points
+
+    @property
+    def mark(self) -> float:
+        """Return the final mark on a 1.0 to 6.0 grading scale."""
+        if self.total == 0:
+            raise ValueError("Total is zero points")
+        return max(1.0, min(6.0, round(5.0 * self.got / self.total + 1.0, 1)))
+
+    @property
+    def total(self) -> float:
+        """Return the total number of available points."""
+        return self.points.total
+
+    @property
+    def bonus(self) -> float:
+        """Return the total bonus collected for the criteria tree."""
+        return self.points.bonus
+
+    @property
+    def got(self) -> float:
+        """Return the number of points obtained, including bonus."""
+        return self.points.got
+
+    @property
+    def success(self) -> bool:
+        """Return True when the final mark reaches the passing threshold."""
+        return self.mark >= 4.0
+
+
+class Subtotal:
+    """Running got/total/bonus sums for a section or a milestone tag."""
+
+    __slots__ = ("got", "total", "bonus")
+
+    def __init__(self) -> None:
+        self.got = 0.0
+        self.total = 0.0
+        self.bonus = 0.0
+
+    def add(self, got: float, total: float, bonus: float) -> None:
+        """Accumulate one contribution into the subtotal."""
+        self.got += got
+        self.total += total
+        self.bonus += bonus
+
+    def as_points(self) -> Points:
+        """Return the accumulated values as an immutable ``Points`` tuple."""
+        return Points(got=self.got, total=self.total, bonus=self.bonus)
+
+
+class Criterion:
+    """Leaf criterion holding its awarded and available points.
+
+    A version 1 leaf may carry both ``$points`` and ``$bonus``: ``awarded``
+    and ``available`` then hold the ``$points`` pair and ``bonus`` the
+    ``(awarded, available)`` pair of ``$bonus``.
+    """
+
+    __slots__ = (
+        "key",
+        "parent",
+        "description",
+        "description_key",
+        "awarded",
+        "available",
+        "is_bonus",
+        "bonus",
+        "rationale",
+        "prompt",
+        "milestone",
+    )
+
+    def __init__(
+        self,
+        key: str,
+        parent: Section | None,
+        awarded: float,
+        available: float,
+        *,
+        is_bonus: bool = False,
+        bonus: Tuple[float, float] | None = None,
+        description: Text | None = None,
+        description_key: str = _DESCRIPTION,
+        rationale: Text | None = None,
+        prompt: str | None = None,
+        milestone: str | None = None,
+    ) -> None:
+        self.key = sys.intern(key)
+        self.parent = parent
+        self.awarded = float(awarded)
+        self.available = float(available)
+        self.is_bonus = is_bonus
+        self.bonus = None if bonus is None else (float(bonus[0]), float(bonus[1]))
+        self.description = _intern_text(description)
+        self.description_key = description_key
+        self.rationale = rationale
+        self.prompt = _intern_text(prompt)
+        self.milestone = sys.intern(milestone) if milestone is not None else None
+
+    @property
+    def path(self) -> Tuple[str, ...]:
+        """Return the keys leading from the criteria root to this leaf."""
+        keys: List[str] = [self.key]
+        node = self.parent
+        while node is not None and node.parent is not None:
+            keys.append(node.key)
+            node = node.parent
+        return tuple(reversed(keys))
+
+    @property
+    def id(self) -> str:
+        """Return the dotted criterion id used by results mappings."""
+        return ".".join(self.path)
+
+    def contribution(self) -> Tuple[float, float, float]:
+        """Return this leaf's ``(got, total, bonus)`` share of the score."""
+        if self.is_bonus:
+            return self.awarded, 0.0, self.awarded
+        if self.bonus is not None:
+            extra = self.bonus[0]
+            return self.awarded + extra, max(self.available, 0.0), extra
+        return self.awarded, max(self.available, 0.0), 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the leaf in the normalized ``Criteria`` mapping layout."""
+        result: Dict[str, Any] = {}
+        if self.description is not None:
+            result[self.description_key] = _export_text(self.description)
+        pair = [self.awarded, _export_number(self.available)]
+        result["$bonus" if self.is_bonus else "$points"] = pair
+        if self.bonus is not None:
+            result["$bonus"] = [self.bonus[0], _export_number(self.bonus[1])]
+        if self.rationale is not None:
+            result["$rationale"] = _export_text(self.rationale)
+        if self.prompt is not None:
+            result["$test"] = self.prompt
+        if self.milestone is not None:
+            result["$milestone"] = self.milestone
+        return result
+
+
+class Section(Subtotal):
+    """Group of criteria with the subtotals of everything below it."""
+
+    __slots__ = ("key", "parent", "description", "description_key", "children")
+
+    def __init__(
+        self,
+        key: str,
+        parent: Section | None,
+        description: Text | None = None,
+        description_key: str = _DESCRIPTION,
+    ) -> None:
+        super().__init__()
+        self.key = sys.intern(key)
+        self.parent = parent
+        self.description = _intern_text(description)
+        self.description_key = description_key
+        self.children: Dict[str, Section | Criterion] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the section in the normalized ``Criteria`` mapping layout."""
+        renderer = _DictRenderer()
+        walk_nodes(self, renderer)
+        return renderer.result
+
+
+class CriteriaTree:
+    """Typed view of a normalized criteria definition."""
+
+    __slots__ = ("root", "schema_version", "grading", "milestones", "_index")
+
+    def __init__(
+        self,
+        root: Section,
+        *,
+        schema_version: int | None = None,
+        grading: Mapping[str, Any] | None = None,
+    ) -> None:
+        self.root = root
+        self.schema_version = schema_version
+        self.grading = grading
+        self.milestones: Dict[str, Subtotal] = {}
+        self._index: CriteriaIndex[Criterion] | None = None
+
+    @property
+    def index(self) -> CriteriaIndex[Criterion]:
+        """Return the id index of the leaves, built on first use."""
+        if self._index is None:
+            self._index = CriteriaIndex.from_tree(self)
+        return self._index
+
+    @property
+    def points(self) -> Points:
+        """Return the aggregated points of the whole tree."""
+        return self.root.as_points()
+
+    def leaves(self) -> Iterator[Tuple[Tuple[str, ...], Criterion]]:
+        """Yield ``(path, criterion)`` for every leaf, in document order."""
+        for event, path, _, node in iter_nodes(self.root):
+            if event == LEAF:
+                yield path, node
+
+    def sections(self) -> Iterator[Tuple[Tuple[str, ...], Section]]:
+        """Yield ``(path, section)`` for every section below the root."""
+        for event, path, _, node in iter_nodes(self.root):
+            if event == ENTER and path:
+                yield path, node
+
+    def find(self, criterion_id: str) -> Criterion | None:
+        """Return the leaf matching a dotted id, or None."""
+        return self.index.get(criterion_id)
+
+    def set_points(
+        self, criterion: Criterion, awarded: float, *, bonus: bool = False
+    ) -> None:
+        """Change a leaf's awarded points and patch its ancestors' subtotals.
+
+        With ``bonus``, the awarded part of the ``$bonus`` pair of a leaf that
+        also has ``$points`` is changed instead.
+        """
+        got, total, extra = criterion.contribution()
+        if bonus:
+            if criterion.bonus is None:
+                raise ValueError("criterion has no separate $bonus pair")
+            criterion.bonus = (float(awarded), criterion.bonus[1])
+        else:
+            criterion.awarded = float(awarded)
+        new_got, new_total, new_bonus = criterion.contribution()
+        delta = (new_got - got, new_total - total, new_bonus - extra)
+
+        node = criterion.parent
+        while node is not None:
+            node.add(*delta)
+            node = node.parent
+        if criterion.milestone is not None:
+            self.milestones[criterion.milestone].add(*delta)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the tree in the normalized ``Criteria`` mapping layout."""
+        result: Dict[str, Any] = {"criteria": self.root.to_dict()}
+        if self.schema_version is not None:
+            result["schema_version"] = self.schema_version
+        if self.grading is not None:
+            result["grading"] = self.grading
+        return result
+
+
+def _is_model_node(node: Any) -> bool:
+    """Return True for a section or criterion node."""
+    return isinstance(node, (Section, Criterion))
+
+
+def _is_criterion(node: Any) -> bool:
+    """Return True for a leaf criterion node."""
+    return isinstance(node, Criterion)
+
+
+def _section_children(node: Section) -> Iterable[Tuple[str, Section | Criterion]]:
+    """Return the children of a section node."""
+    return node.children.items()
+
+
+def iter_nodes(section: Section) -> Iterator[Event]:
+    """Yield :func:`~StudentScore.traversal.iter_tree` events for model nodes."""
+    return iter_tree(
+        section,
+        is_node=_is_model_node,
+        is_leaf=_is_criterion,
+        children=_section_children,
+    )
+
+
+def walk_nodes(section: Section, *visitors: Visitor) -> None:
+    """Dispatch the events of :func:`iter_nodes` to several visitors."""
+    walk(
+        section,
+        *visitors,
+        is_node=_is_model_node,
+        is_leaf=_is_criterion,
+        children=_section_children,
+    )
+
+
+class _DictRenderer(Visitor):
+    """Render model nodes back into the normalized mapping layout."""
+
+    def __init__(self) -> None:
+        self.result: Dict[str, Any] = {}
+        self._stack: List[Dict[str, Any]] = []
+
+    def enter_section(self, path: Tuple[str, ...], key: Any, node: Section) -> None:
+        result: Dict[str, Any] = {}
+        if node.description is not None:
+            result[node.description_key] = _export_text(node.description)
+        if self._stack:
+            self._stack[-1][key] = result
+        else:
+            self.result = result
+        self._stack.append(result)
+
+    def leave_section(self, path: Tuple[str, ...], key: Any, node: Section) -> None:
+        self._stack.pop()
+
+    def visit_leaf(self, path: Tuple[str, ...], key: Any, node: Criterion) -> None:
+        self._stack[-1][key] = node.to_dict()
+
+
+class TreeBuilder(Visitor):
+    """Build a :class:`CriteriaTree` from normalized sections and leaves.
+
+    Use it with :func:`~StudentScore.traversal.walk` over normalized data, or
+    pass it to ``Criteria(..., visitors=[builder])`` to build the tree during
+    validation. Subtotals are accumulated as sections are closed.
+    """
+
+    def __init__(self) -> None:
+        self.root: Section | None = None
+        self.milestones: Dict[str, Subtotal] = {}
+        self._stack: List[Section] = []
+
+    def enter_section(
+        self, path: Tuple[str, ...], key: Any, node: Mapping[str, Any]
+    ) -> None:
+        parent = self._stack[-1] if self._stack else None
+        section = Section("" if parent is None else str(key), parent)
+        if parent is None:
+            self.root = section
+        self._stack.append(section)
+
+    def leave_section(
+        self, path: Tuple[str, ...], key: Any, node: Mapping[str, Any]
+    ) -> None:
+        section = self._stack.pop()
+        description, section.description_key = _description(node)
+        section.description = _intern_text(description)
+        if section.parent is not None:
+            section.parent.children[section.key] = section
+            section.parent.add(section.got, section.total, section.bonus)
+
+    def visit_leaf(
+        self, path: Tuple[str, ...], key: Any, node: Mapping[str, Any]
+    ) -> None:
+        points = node.get("$points")
+        bonus = node.get("$bonus")
+        if not isinstance(points, list) and not isinstance(bonus, list):
+            return  # invalid leaf; validation reports it
+        section = self._stack[-1]
+        is_bonus = not isinstance(points, list)
+        awarded, available = bonus if is_bonus else points
+        description, description_key = _description(node)
+        criterion = Criterion(
+            str(key),
+            section,
+            awarded,
+            available,
+            is_bonus=is_bonus,
+            bonus=None if is_bonus or not isinstance(bonus, list) else bonus,
+            description=description,
+            description_key=description_key,
+            rationale=node.get("$rationale"),
+            prompt=node.get("$test"),
+            milestone=node.get("$milestone"),
+        )
+        contribution = criterion.contribution()
+        if criterion.milestone is not None:
+            self.milestones.setdefault(criterion.milestone, Subtotal()).add(
+                *contribution
+            )
+        section.children[criterion.key] = criterion
+        section.add(*contribution)
+
+    def finish(
+        self,
+        *,
+        schema_version: Any = None,
+        grading: Mapping[str, Any] | None = None,
+    ) -> CriteriaTree:
+        """Return the tree built so far with the given top-level fields."""
+        tree = CriteriaTree(
+            self.root if self.root is not None else Section("", None),
+            schema_version=int(schema_version) if schema_version is not None else None,
+            grading=grading,
+        )
+        tree.milestones = self.milestones
+        return tree
+
+
+def build_tree(data: Mapping[str, Any]) -> CriteriaTree:
+    """Return a :class:`CriteriaTree` built from normalized criteria data."""
+    builder = TreeBuilder()
+    criteria = data.get("criteria")
+    if isinstance(criteria, Mapping):
+        walk(criteria, builder, is_leaf=is_normalized_leaf)
+    return builder.finish(
+        schema_version=data.get("schema_version"), grading=data.get("grading")
+    )
+
+
+__all__ = [
+    "Criterion",
+    "CriteriaTree",
+    "Points",
+    "ScoreSummary",
+    "Section",
+    "Subtotal",
+    "TreeBuilder",
+    "build_tree",
+    "iter_nodes",
+    "walk_nodes",
+]
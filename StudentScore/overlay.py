@@ -0,0 +1,151 @@
+"""Per-student award overlays on a shared base rubric.
+
+A cohort grades the same rubric hundreds of times, and each student file used
+to carry a full copy of it with the awards inlined. An overlay only holds what
+differs for one student, in the results layout of ``score apply``, plus the
+content hash of the rubric it was made for::
+
+    {"rubric": "sha256:3f1c...", "awards": {"code.naming": {"awarded_points": 1}}}
+
+:class:`Rubric` parses and validates the base rubric once; :meth:`Rubric.score`
+then builds a :class:`~StudentScore.score.Score` per overlay without parsing
+or validating anything again. An overlay naming another rubric is rejected.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from .cache import CriteriaCache, load_document
+from .formats import load_file
+from .include import Source
+from .model import CriteriaTree, _export_number
+from .schema import NormalizedCriteria
+from .score import Score
+
+
+def rubric_id(source: Source) -> str:
+    """Return the content hash identifying a rubric and its included files.
+
+    For a rubric without includes it is the SHA-256 of the file, as printed by
+    ``sha256sum``.
+    """
+    digest = hashlib.sha256(b"\0".join(item.content for item in source.walk()))
+    return f"sha256:{digest.hexdigest()}"
+
+
+def is_overlay(data: Any) -> bool:
+    """Return True for an overlay mapping, False for a plain results mapping."""
+    return (
+        isinstance(data, Mapping)
+        and "rubric" in data
+        and isinstance(data.get("awards"), Mapping)
+    )
+
+
+class Overlay:
+    """Awards of one student on top of the rubric identified by ``rubric``."""
+
+    __slots__ = ("awards", "rubric")
+
+    def __init__(self, awards: Mapping[str, Any], rubric: str | None = None) -> None:
+        self.awards = awards
+        self.rubric = rubric
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> Overlay:
+        """Read an overlay mapping; a plain results mapping has no rubric id."""
+        if is_overlay(data):
+            return cls(data["awards"], data.get("rubric"))
+        return cls(data)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Overlay:
+        """Read an overlay (or results) file in any criteria format."""
+        data = load_file(path)
+        if not isinstance(data, Mapping):
+            raise ValueError(f"{path}: an overlay must be a mapping")
+        return cls.from_mapping(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the overlay in its file layout."""
+        return {"rubric": self.rubric, "awards": dict(self.awards)}
+
+
+def extract_overlay(base: CriteriaTree, student: CriteriaTree, rubric: str) -> Overlay:
+    """Return the awards of ``student`` that differ from the ``base`` rubric.
+
+    Both trees must define the same criteria with the same available points,
+    otherwise the student file is not a copy of that rubric and ValueError is
+    raised.
+    """
+    awards: Dict[str, Any] = {}
+    mismatched: List[str] = []
+    seen = 0
+    for _, criterion in base.leaves():
+        cid = criterion.id
+        copy = student.find(cid)
+        if copy is None or copy.available != criterion.available:
+            mismatched.append(cid)
+            continue
+        seen += 1
+        award: Dict[str, Any] = {}
+        if copy.awarded != criterion.awarded:
+            award["awarded_points"] = _export_number(copy.awarded)
+        if copy.rationale is not None and copy.rationale != criterion.rationale:
+            award["rationale"] = copy.rationale
+        if award:
+            award.setdefault("awarded_points", _export_number(copy.awarded))
+            awards[cid] = award
+    if seen != len(student.index):
+        base_ids = set(base.index.ids())
+        mismatched.extend(cid for cid in student.index.ids() if cid not in base_ids)
+    if mismatched:
+        raise ValueError(
+            "criteria differ from the base rubric: " + ", ".join(mismatched)
+        )
+    return Overlay(awards, rubric)
+
+
+class Rubric:
+    """A validated base rubric shared by the overlays of a cohort."""
+
+    __slots__ = ("data", "id")
+
+    def __init__(self, data: NormalizedCriteria, rubric: str) -> None:
+        self.data = data
+        self.id = rubric
+
+    @classmethod
+    def load(cls, path: str | Path, cache: CriteriaCache | None = None) -> Rubric:
+        """Parse and validate a rubric file once, through ``cache`` if given."""
+        _, normalized, source = load_document(path, cache)
+        return cls(normalized, rubric_id(source))
+
+    def check(self, overlay: Overlay) -> None:
+        """Raise ValueError when ``overlay`` was made for another rubric."""
+        if overlay.rubric is not None and overlay.rubric != self.id:
+            raise ValueError(
+                f"overlay was made for rubric {overlay.rubric}, not {self.id}"
+            )
+
+    def score(self, overlay: Overlay | Mapping[str, Any]) -> Score:
+        """Return the score of one student from the rubric and an overlay."""
+        if not isinstance(overlay, Overlay):
+            overlay = Overlay.from_mapping(overlay)
+        self.check(overlay)
+        score = Score.from_normalized(self.data)
+        _, unknown = score.apply_results(overlay.awards)
+        if unknown:
+            raise ValueError("unknown criteria in overlay: " + ", ".join(unknown))
+        return score
+
+    def score_files(self, paths: Iterable[str | Path]) -> Iterator[Tuple[Path, Score]]:
+        """Yield ``(path, score)`` for overlay files, reading each one once."""
+        for path in paths:
+            yield Path(path), self.score(Overlay.load(path))
+
+
+__all__ = ["Overlay", "Rubric", "extract_overlay", "is_overlay", "rubric_id"]
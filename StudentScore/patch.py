@@ -0,0 +1,221 @@
+"""Write updated criteria back by splicing values into the original YAML text.
+
+``score apply`` and ``score grade --llm`` usually change a few
+``awarded_points`` and ``rationale`` values. Dumping the whole tree would
+rewrite every line and drop the comments, so :func:`patch_yaml` composes the
+original text, compares each node with the updated data and only replaces the
+text spans of the scalars that changed, using the node marks. New keys (a
+first ``rationale``) are inserted after the last entry of their mapping.
+
+Anything else (removed keys, resized lists, anchors and aliases...) makes
+:func:`patch_yaml` return None so callers fall back to a full dump. The patched
+text is parsed once more and compared with the data before it is returned.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import re
+from typing import Any, Dict, List, Mapping, Set, Tuple
+
+from . import yaml
+from .formats import YAML, detect_format, dumps
+
+
+_PLAIN = re.compile(r"[$A-Za-z0-9_(][^\n\r\t#:,\[\]{}]*(?<![ ])")
+
+Edit = Tuple[int, int, str]
+
+
+class _Unpatchable(Exception):
+    """Raised when a change cannot be expressed as a text splice."""
+
+
+def _render(value: Any) -> str:
+    """Return a single-line YAML rendering valid in block and flow context."""
+    if isinstance(value, str):
+        if _PLAIN.fullmatch(value) and yaml.load(value) == value:
+            return value
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (Mapping, list)):
+        try:
+            return json.dumps(value, ensure_ascii=False, allow_nan=False)
+        except (TypeError, ValueError) as exc:
+            raise _Unpatchable(str(exc)) from exc
+    text = yaml.dump(value, default_flow_style=True)
+    return text.split("\n", 1)[0]
+
+
+class _Differ:
+    """Collect the text edits turning a composed document into ``data``."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.newline = "\r\n" if "\r\n" in text else "\n"
+        self.edits: List[Edit] = []
+        self._constructor = yaml.SafeConstructor()
+        self._seen: Set[int] = set()
+
+    def _construct(self, node: Any) -> Any:
+        """Return the Python value of a composed node."""
+        return self._constructor.construct_object(node, deep=True)
+
+    def diff(self, node: Any, value: Any) -> None:
+        """Queue the edits needed for ``node`` to load as ``value``."""
+        stack: List[Tuple[Any, Any]] = [(node, value)]
+        while stack:
+            node, value = stack.pop()
+            if id(node) in self._seen:
+                raise _Unpatchable("aliased node")
+            self._seen.add(id(node))
+
+            if isinstance(node, yaml.ScalarNode):
+                if isinstance(value, (Mapping, list)):
+                    raise _Unpatchable("scalar replaced by a collection")
+                current = self._construct(node)
+                if current != value or type(current) is not type(value):
+                    self._replace(node, _render(value))
+            elif isinstance(node, yaml.SequenceNode):
+                if not isinstance(value, list) or len(value) != len(node.value):
+                    raise _Unpatchable("sequence changed shape")
+                stack.extend(zip(node.value, value))
+            elif isinstance(node, yaml.MappingNode):
+                if not isinstance(value, Mapping):
+                    raise _Unpatchable("mapping replaced")
+                stack.extend(self._diff_mapping(node, value))
+            else:  # pragma: no cover - composer only yields the three kinds
+                raise _Unpatchable(f"unexpected node {node!r}")
+
+    def _diff_mapping(
+        self, node: Any, value: Mapping[Any, Any]
+    ) -> List[Tuple[Any, Any]]:
+        """Return child pairs to compare and queue insertions of new keys."""
+        children: Dict[Any, Any] = {}
+        for key_node, value_node in node.value:
+            if not isinstance(key_node, yaml.ScalarNode):
+                raise _Unpatchable("complex mapping key")
+            if key_node.tag == "tag:yaml.org,2002:merge":
+                raise _Unpatchable("merge key")
+            children[self._construct(key_node)] = value_node
+        if set(children) - set(value):
+            raise _Unpatchable("key removed")
+
+        pairs = []
+        for key, child in value.items():
+            if key in children:
+                pairs.append((children[key], child))
+            else:
+                self._insert(node, key, child)
+        return pairs
+
+    def _replace(self, node: Any, rendered: str) -> None:
+        """Queue replacing the text span of a scalar node."""
+        if node.style in {"|", ">"}:
+            # Block scalars end after their line break; keep it.
+            end = node.end_mark.index
+            if self.text[node.start_mark.index : end].endswith("\n"):
+                rendered += self.newline
+        self.edits.append((node.start_mark.index, node.end_mark.index, rendered))
+
+    def _insert(self, node: Any, key: Any, value: Any) -> None:
+        """Queue adding ``key: value`` as the last entry of a mapping."""
+        entry = f"{_render(key)}: {_render(value)}"
+        if node.flow_style:
+            close = node.end_mark.index - 1
+            if self.text[close] != "}":
+                raise _Unpatchable("unterminated flow mapping")
+            prefix = ", " if node.value else ""
+            self.edits.append((close, close, prefix + entry))
+            return
+        if not node.value:
+            raise _Unpatchable("empty block mapping")
+
+        indent = " " * node.value[0][0].start_mark.column
+        last = node.value[-1][1]
+        while not getattr(last, "flow_style", True) and last.value:
+            last = last.value[-1]
+            if isinstance(last, tuple):
+                last = last[1]
+        end = last.end_mark.index
+        if end > 0 and self.text[end - 1] == "\n":
+            self.edits.append((end, end, f"{indent}{entry}{self.newline}"))
+            return
+        line_end = self.text.find("\n", end)
+        if line_end == -1:
+            line_end = len(self.text)
+        elif self.text[line_end - 1] == "\r":
+            line_end -= 1
+        self.edits.append((line_end, line_end, f"{self.newline}{indent}{entry}"))
+
+
+def patch_yaml(text: str, data: Any) -> str | None:
+    """Return ``text`` edited so that it loads as ``data``, or None.
+
+    Only changed scalars and added mapping keys are written; comments,
+    ordering and formatting of everything else are preserved byte for byte.
+    None means the change needs a full ``yaml.dump`` instead.
+    """
+    try:
+        root = yaml.compose(text)
+    except yaml.YAMLError:
+        return None
+    if root is None:
+        return None
+
+    differ = _Differ(text)
+    try:
+        differ.diff(root, data)
+    except _Unpatchable:
+        return None
+    if not differ.edits:
+        return text
+
+    # Apply from the end so earlier offsets stay valid; inserts sharing an
+    # offset come out in the order they were queued.
+    order = sorted(
+        range(len(differ.edits)),
+        key=lambda i: (differ.edits[i][0], differ.edits[i][1], i),
+        reverse=True,
+    )
+    pieces: List[str] = []
+    position = len(text)
+    for i in order:
+        start, end, rendered = differ.edits[i]
+        pieces.append(text[end:position])
+        pieces.append(rendered)
+        position = start
+    pieces.append(text[:position])
+    patched = "".join(reversed(pieces))
+
+    try:
+        if yaml.load(patched) != data:
+            return None
+    except yaml.YAMLError:
+        return None
+    return patched
+
+
+def render_update(
+    data: Any,
+    original: bytes,
+    *,
+    source: str | Path,
+    destination: str | Path,
+) -> bytes:
+    """Return the bytes to write ``data`` read from ``source`` to ``destination``.
+
+    ``original`` is the current content of ``source``. YAML is spliced into
+    it when possible; otherwise the data is serialized in the format of the
+    destination extension, else of the source.
+    """
+    fmt = detect_format(destination, original)
+    if fmt == YAML and detect_format(source, original) == YAML:
+        # Splice into the raw text: universal newlines would shift the marks.
+        text = patch_yaml(original.decode("utf-8"), data)
+        if text is not None:
+            return text.encode("utf-8")
+    return dumps(data, fmt)
+
+
+__all__ = ["patch_yaml", "render_update"]
@@ -0,0 +1,81 @@
+"""Results files merged into criteria by ``score apply``.
+
+A results file is either one JSON object mapping dotted criterion ids to
+awards (``{"code.style": {"awarded_points": 2, "rationale": "..."}}``) or a
+JSON Lines stream (``.jsonl`` / ``.ndjson``). Each line of a stream is an
+object of the same shape, or a single award carrying its id
+(``{"id": "code.style", "awarded_points": 2}``). Streams are read one line at
+a time, so large result sets are applied without holding them in memory.
+
+A JSON object may also be an award overlay (see :mod:`StudentScore.overlay`);
+:func:`load_awards` checks that it was made for the rubric it is applied to.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Tuple
+
+from .include import Source
+from .overlay import Overlay, rubric_id
+
+
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+class ResultsError(ValueError):
+    """Raised when a results file cannot be read."""
+
+
+def is_jsonl(path: str | Path) -> bool:
+    """Return True when ``path`` names a JSON Lines stream."""
+    return Path(path).suffix.lower() in JSONL_SUFFIXES
+
+
+def iter_jsonl(path: str | Path) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(criterion id, award)`` pairs from a JSON Lines stream."""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ResultsError(f"{path}:{number}: {exc.msg}") from None
+            if not isinstance(record, dict):
+                raise ResultsError(f"{path}:{number}: expected a JSON object")
+            cid = record.get("id")
+            if isinstance(cid, str):
+                yield cid, {key: value for key, value in record.items() if key != "id"}
+            else:
+                yield from record.items()
+
+
+def load_awards(path: str | Path, source: Source) -> Iterable[Tuple[str, Any]]:
+    """Return the ``(criterion id, award)`` pairs of any results file.
+
+    ``source`` is the rubric the awards are for: an overlay made for another
+    rubric raises :class:`ResultsError`. JSON Lines streams are read lazily.
+    """
+    path = Path(path)
+    if is_jsonl(path):
+        return iter_jsonl(path)
+    with path.open("r", encoding="utf-8") as handle:
+        try:
+            payload = json.load(handle)
+        except json.JSONDecodeError as exc:
+            raise ResultsError(f"{path}:{exc.lineno}: {exc.msg}") from None
+    if not isinstance(payload, dict):
+        raise ResultsError(f"{path}: results file must be a JSON object")
+    overlay = Overlay.from_mapping(payload)
+    expected = rubric_id(source)
+    if overlay.rubric is not None and overlay.rubric != expected:
+        raise ResultsError(
+            f"{path.name} was made for rubric {overlay.rubric}, "
+            f"but {source.path.name} is {expected}."
+        )
+    return overlay.awards.items()
+
+
+__all__ = ["JSONL_SUFFIXES", "ResultsError", "is_jsonl", "iter_jsonl", "load_awards"]
@@ -3,15 +3,40 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
 
+from .limits import DEFAULT_LIMITS, Limits
+from .traversal import Visitor, is_v1_leaf, is_v2_leaf, walk
 
-class CriteriaValidationError(ValueError):
-    """Raised when the grading criteria definition is invalid."""
 
-    def __init__(self, message: str, *, errors: List[Dict[str, Any]]):
+class CriteriaValidationError(ValueError):
+    """Raised when the grading criteria definition is invalid.
+
+    ``truncated`` is True when validation stopped after ``max_errors`` because
+    another problem was found; more may follow in the rest of the file.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        errors: List[Dict[str, Any]],
+        truncated: bool = False,
+    ):
         super().__init__(message)
         self.errors = errors
+        self.truncated = truncated
+
+
+class NormalizedCriteria(Dict[str, Any]):
+    """Mapping returned by :func:`Criteria`; it already passed validation.
+
+    ``Score`` trusts instances of this type and builds its tree without
+    validating them again. Edit a copy (``dict(normalized)``) rather than the
+    marked mapping itself, so the marker keeps meaning what it says.
+    """
+
+    __slots__ = ()
 
 
 _PERCENT_PATTERN = re.compile(r"^(-?\d+(?:\.\d+)?)%$")
@@ -21,6 +46,26 @@ _MILESTONE_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,49}$")
 _MISSING = object()
 
 
+class _TooManyErrors(Exception):
+    """Raised by :class:`_ErrorList` when an error beyond ``max_errors`` comes."""
+
+
+class _ErrorList(List[Dict[str, Any]]):
+    """Error list stopping validation when ``max_errors`` is exceeded.
+
+    The extra error is dropped: the list keeps the first ``max_errors``.
+    """
+
+    def __init__(self, max_errors: int | None) -> None:
+        super().__init__()
+        self.max_errors = max_errors
+
+    def append(self, error: Dict[str, Any]) -> None:
+        if self.max_errors is not None and len(self) >= self.max_errors:
+            raise _TooManyErrors
+        super().append(error)
+
+
 def _add_error(
     errors: List[Dict[str, Any]],
     path: Sequence[Any],
@@ -178,7 +223,9 @@ def _format_location(parts: Iterable[Any]) -> str:
     return "/".join(filtered) if filtered else "<root>"
 
 
-def _format_validation_errors(errors: List[Dict[str, Any]]) -> str:
+def _format_validation_errors(
+    errors: List[Dict[str, Any]], *, truncated: bool = False
+) -> str:
     """Build a human readable message from collected validation errors."""
     lines = ["Invalid criteria definition detected:"]
     for error in errors:
@@ -190,7 +237,18 @@ def _format_validation_errors(errors: List[Dict[str, Any]]) -> str:
                 message = message.format(**context)
             except (IndexError, KeyError, ValueError):  # pragma: no cover - defensive
                 pass
-        lines.append(f"- {location}: {message}")
+        origin = ""
+        if "file" in error:
+            origin = str(error["file"])
+            if "line" in error:
+                origin += f":{error['line']}:{error.get('column', 1)}"
+            origin += ": "
+        lines.append(f"- {origin}{location}: {message}")
+    if truncated:
+        count = f"{len(errors)} error" + ("s" if len(errors) != 1 else "")
+        lines.append(
+            f"Validation stopped after {count}; the rest of the file was not checked."
+        )
     return "\n".join(lines)
 
 
@@ -307,106 +365,6 @@ def _validate_item(
     return result
 
 
-def _validate_entry(
-    value: Any,
-    errors: List[Dict[str, Any]],
-    path: Sequence[Any],
-) -> Dict[str, Any]:
-    """Choose between item or section validation based on the provided value."""
-    if not isinstance(value, dict):
-        _add_error(errors, path, "criteria entries must be mappings")
-        return {}
-
-    keys = {str(k) for k in value.keys()}
-    if keys and all(key.startswith("$") for key in keys):
-        return _validate_item(value, errors, path)
-    return _validate_section(value, errors, path)
-
-
-def _validate_section(
-    value: Dict[Any, Any],
-    errors: List[Dict[str, Any]],
-    path: Sequence[Any],
-) -> Dict[str, Any]:
-    """Validate a criteria section definition and normalize all nested entries."""
-    if not isinstance(value, dict):
-        _add_error(errors, path, "section entries must be mappings")
-        return {}
-
-    result: Dict[str, Any] = {}
-    has_description = False
-    has_desc = False
-
-    for raw_key, raw_value in value.items():
-        key = str(raw_key)
-        if key in {"$description", "$desc"}:
-            text_value = _ensure_section_text(
-                raw_value, errors, _extend_path(path, key)
-            )
-            if text_value is not None:
-                result[key] = text_value
-                if key == "$description":
-                    has_description = True
-                else:
-                    has_desc = True
-            continue
-
-        result[key] = _validate_entry(raw_value, errors, _extend_path(path, key))
-
-    if has_description and has_desc:
-        _add_error(
-            errors,
-            path,
-            "use either $description or $desc, not both",
-        )
-
-    return result
-
-
-def _validate_v2_entry(
-    value: Any,
-    errors: List[Dict[str, Any]],
-    path: Sequence[Any],
-) -> Dict[str, Any]:
-    """Dispatch version 2 entries to either section or item validators."""
-    if not isinstance(value, dict):
-        _add_error(errors, path, "criteria entries must be mappings")
-        return {}
-
-    keys = {str(k) for k in value.keys()}
-    if {"awarded_points", "max_points", "bonus_points"} & keys:
-        return _validate_v2_item(value, errors, path)
-    return _validate_v2_section(value, errors, path)
-
-
-def _validate_v2_section(
-    value: Dict[Any, Any],
-    errors: List[Dict[str, Any]],
-    path: Sequence[Any],
-) -> Dict[str, Any]:
-    """Validate a version 2 section definition."""
-    if not isinstance(value, dict):
-        _add_error(errors, path, "section entries must be mappings")
-        return {}
-
-    result: Dict[str, Any] = {}
-    description_value = value.get("description")
-    if description_value is not None:
-        text_value = _ensure_section_text(
-            description_value, errors, _extend_path(path, "description")
-        )
-        if text_value is not None:
-            result["$description"] = text_value
-
-    for raw_key, raw_value in value.items():
-        key = str(raw_key)
-        if key == "description":
-            continue
-        result[key] = _validate_v2_entry(raw_value, errors, _extend_path(path, key))
-
-    return result
-
-
 def _validate_v2_item(
     value: Dict[Any, Any],
     errors: List[Dict[str, Any]],
@@ -526,6 +484,118 @@ def _validate_v2_item(
     return result
 
 
+def _validate_leaf(
+    value: Dict[Any, Any],
+    errors: List[Dict[str, Any]],
+    path: Sequence[Any],
+    schema_version: int,
+) -> Dict[str, Any]:
+    """Validate a leaf criterion of either schema version."""
+    if schema_version == 2:
+        return _validate_v2_item(value, errors, path)
+    return _validate_item(value, errors, path)
+
+
+class _SectionValidator(Visitor):
+    """Validate and normalize a criteria section tree during a :func:`walk`.
+
+    Normalized sections and leaves are forwarded to ``sinks`` as they are
+    produced, so other consumers can be fed by the validation pass itself.
+    """
+
+    def __init__(
+        self,
+        errors: List[Dict[str, Any]],
+        schema_version: int,
+        sinks: Sequence[Visitor] = (),
+        limits: Limits = DEFAULT_LIMITS,
+    ) -> None:
+        self.errors = errors
+        self.schema_version = schema_version
+        self.sinks = sinks
+        self.limits = limits
+        self.leaves = 0
+        self.result: Dict[str, Any] = {}
+        self._stack: List[Dict[str, Any]] = []
+        self._text_keys = (
+            {"description"} if schema_version == 2 else {"$description", "$desc"}
+        )
+
+    def prune(self, path: Sequence[Any], key: Any, node: Any) -> bool:
+        # Description keys never hold criteria, whatever their value.
+        return str(key) in self._text_keys
+
+    def _limit_exceeded(self, path: Sequence[Any], message: str) -> None:
+        # Stop right away: going on is what the limit protects against.
+        _add_error(self.errors, path, message)
+        raise CriteriaValidationError(
+            _format_validation_errors(self.errors), errors=list(self.errors)
+        )
+
+    def _check_depth(self, path: Sequence[Any]) -> None:
+        maximum = self.limits.max_depth
+        # The document root is level 1, the criteria mapping level 2.
+        if maximum is not None and len(path) + 1 > maximum:
+            self._limit_exceeded(path, f"nesting is deeper than {maximum} levels")
+
+    def enter_section(self, path: Sequence[Any], key: Any, node: Any) -> None:
+        self._check_depth(path)
+        result: Dict[str, Any] = {}
+        if self.schema_version == 2:
+            description_value = node.get("description")
+            if description_value is not None:
+                text_value = _ensure_section_text(
+                    description_value, self.errors, _extend_path(path, "description")
+                )
+                if text_value is not None:
+                    result["$description"] = text_value
+
+        if self._stack:
+            self._stack[-1][str(key)] = result
+        else:
+            self.result = result
+        self._stack.append(result)
+        for sink in self.sinks:
+            sink.enter_section(path, key, result)
+
+    def leave_section(self, path: Sequence[Any], key: Any, node: Any) -> None:
+        result = self._stack.pop()
+        if self.schema_version != 2 and "$description" in result and "$desc" in result:
+            _add_error(
+                self.errors,
+                path,
+                "use either $description or $desc, not both",
+            )
+        for sink in self.sinks:
+            sink.leave_section(path, key, result)
+
+    def visit_leaf(self, path: Sequence[Any], key: Any, node: Any) -> None:
+        self._check_depth(path)
+        self.leaves += 1
+        maximum = self.limits.max_leaves
+        if maximum is not None and self.leaves > maximum:
+            self._limit_exceeded(path, f"more than {maximum} criteria")
+        item = self._validate_leaf(path, node)
+        self._stack[-1][str(key)] = item
+        for sink in self.sinks:
+            sink.visit_leaf(path, key, item)
+
+    def _validate_leaf(self, path: Sequence[Any], node: Any) -> Dict[str, Any]:
+        """Return the normalized form of one leaf criterion."""
+        return _validate_leaf(node, self.errors, path, self.schema_version)
+
+    def visit_value(self, path: Sequence[Any], key: Any, value: Any) -> None:
+        skey = str(key)
+        if skey in self._text_keys:
+            if self.schema_version != 2:  # version 2 reads it on entry
+                text_value = _ensure_section_text(value, self.errors, path)
+                if text_value is not None:
+                    self._stack[-1][skey] = text_value
+            return
+        _add_error(self.errors, path, "criteria entries must be mappings")
+        self._stack[-1][skey] = {}
+
+
 def _validate_student(
     value: Any,
     errors: List[Dict[str, Any]],
@@ -613,10 +683,56 @@ def _validate_grading(
     return result
 
 
-def _criteria(data: Any) -> Dict[str, Any]:
-    """Normalize a criteria definition and raise if the structure is invalid."""
-    errors: List[Dict[str, Any]] = []
+def _criteria(
+    data: Any,
+    *,
+    visitors: Sequence[Visitor] = (),
+    limits: Limits | None = None,
+    max_errors: int | None = None,
+) -> NormalizedCriteria:
+    """Normalize a criteria definition and raise if the structure is invalid.
+
+    The criteria tree is validated in a single iterative walk; normalized
+    sections and leaves are forwarded to ``visitors`` as they are produced.
+    The walk stops with an error once ``limits`` on nesting depth or leaf
+    count are exceeded, or once ``max_errors`` problems were found.
+    """
+    return _validate(data, visitors, limits, max_errors)
+
+
+def _validate(
+    data: Any,
+    visitors: Sequence[Visitor],
+    limits: Limits | None,
+    max_errors: int | None,
+    factory: Callable[..., _SectionValidator] | None = None,
+) -> NormalizedCriteria:
+    """Run :func:`_validate_document`, stopping after ``max_errors`` errors."""
+    if max_errors is not None and max_errors < 1:
+        raise ValueError("max_errors must be at least 1")
+    errors = _ErrorList(max_errors)
+    try:
+        return _validate_document(data, visitors, limits, errors, factory)
+    except _TooManyErrors:
+        raise CriteriaValidationError(
+            _format_validation_errors(errors, truncated=True),
+            errors=list(errors),
+            truncated=True,
+        ) from None
+
+
+def _validate_document(
+    data: Any,
+    visitors: Sequence[Visitor],
+    limits: Limits | None,
+    errors: List[Dict[str, Any]],
+    factory: Callable[..., _SectionValidator] | None = None,
+) -> NormalizedCriteria:
+    """Validate a whole document, collecting problems into ``errors``.
 
+    ``factory`` builds the section validator, with the arguments of
+    :class:`_SectionValidator`.
+    """
     if not isinstance(data, dict):
         _add_error(errors, (), "criteria definition must be a mapping")
         normalized: Dict[str, Any] = {}
@@ -642,13 +758,22 @@ def _criteria(data: Any) -> Dict[str, Any]:
                 )
 
     criteria_value = normalized.get("criteria")
+    validated_criteria: Dict[str, Any] = {}
     if criteria_value is None:
         _add_error(errors, ("criteria",), "missing criteria definition")
-        validated_criteria: Dict[str, Any] = {}
-    elif schema_version == 2:
-        validated_criteria = _validate_v2_section(criteria_value, errors, ("criteria",))
+    elif not isinstance(criteria_value, dict):
+        _add_error(errors, ("criteria",), "section entries must be mappings")
     else:
-        validated_criteria = _validate_section(criteria_value, errors, ("criteria",))
+        validator = (factory or _SectionValidator)(
+            errors, schema_version, visitors, limits or DEFAULT_LIMITS
+        )
+        walk(
+            criteria_value,
+            validator,
+            is_leaf=is_v2_leaf if schema_version == 2 else is_v1_leaf,
+            prefix=("criteria",),
+        )
+        validated_criteria = validator.result
 
     grading_value = normalized.get("grading")
     validated_grading: Dict[str, Any] | None = None
@@ -664,9 +789,9 @@ def _criteria(data: Any) -> Dict[str, Any]:
 
     if errors:
         message = _format_validation_errors(errors)
-        raise CriteriaValidationError(message, errors=errors)
+        raise CriteriaValidationError(message, errors=list(errors))
 
-    result = {"criteria": validated_criteria}
+    result = NormalizedCriteria(criteria=validated_criteria)
     if "schema_version" in normalized or schema_version == 2:
         result["schema_version"] = schema_version
     if validated_grading is not None:
@@ -677,4 +802,4 @@ def _criteria(data: Any) -> Dict[str, Any]:
 
 Criteria = _criteria
 
-__all__ = ["Criteria", "CriteriaValidationError"]
+__all__ = ["Criteria", "CriteriaValidationError", "NormalizedCriteria"]
@@ -2,99 +2,197 @@
 
 from __future__ import annotations
 
-from collections import namedtuple
-from dataclasses import dataclass
-from typing import Any, Mapping, MutableMapping, TextIO
-
-from . import yaml
-from .schema import Criteria
-
-
-Points = namedtuple("Points", ["got", "total", "bonus"])
-
-
-@dataclass
-class _Accumulator:
-    """Internal structure used while aggregating points."""
-
-    got: float = 0.0
-    total: float = 0.0
-    bonus: float = 0.0
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, TextIO, Tuple
+
+from .apply import _apply_to_tree
+from .formats import detect_format, loads
+from .include import Source, resolve_includes
+from .locate import locate_errors
+from .model import CriteriaTree, Points, ScoreSummary, TreeBuilder, build_tree
+from .schema import (
+    Criteria,
+    CriteriaValidationError,
+    NormalizedCriteria,
+    _format_validation_errors,
+    _validate_pair,
+)
+
+
+class Score(ScoreSummary):
+    """Compute aggregate grade statistics from a criteria definition."""
 
+    def __init__(self, data: str | TextIO | Mapping[str, Any] | CriteriaTree) -> None:
+        """Load YAML content, validate it, and build the criteria tree.
 
-class Score:
-    """Compute aggregate grade statistics from a criteria definition."""
+        ``Criteria`` output (:class:`~StudentScore.schema.NormalizedCriteria`)
+        is trusted and not validated again.
+        """
+        self._points: Points | None = None
+        self._data: Mapping[str, Any] | None = None
 
-    def __init__(self, data: str | TextIO | Mapping[str, Any]) -> None:
-        """Load YAML content, validate it, and store normalized data."""
-        normalized_data: Mapping[str, Any]
+        if isinstance(data, CriteriaTree):
+            self.tree = data
+            return
+        if isinstance(data, NormalizedCriteria):
+            self.tree = build_tree(data)
+            return
 
+        raw_data: Any
+        source: Source | None = None
         if hasattr(data, "read"):
-            normalized_data = Criteria(yaml.load(data, Loader=yaml.FullLoader))
+            content = data.read()
+            name = getattr(data, "name", None)
+            path = name if isinstance(name, str) else None
+            raw_data = loads(content, detect_format(path, content))
+            if path is not None:
+                if isinstance(content, str):
+                    content = content.encode("utf-8")
+                source = Source(Path(path), (), content)
         elif isinstance(data, str):
-            with open(data, "rt", encoding="utf8") as file_handle:
-                normalized_data = Criteria(
-                    yaml.load(file_handle, Loader=yaml.FullLoader)
-                )
+            with open(data, "rb") as file_handle:
+                content = file_handle.read()
+            raw_data = loads(content, detect_format(data, content))
+            raw_data, source = resolve_includes(raw_data, data, content)
         else:
-            normalized_data = Criteria(data)
-
-        self.data = normalized_data
-
-    @property
-    def mark(self) -> float:
-        """Return the final mark on a 1.0 to 6.0 grading scale."""
-        if self.total == 0:
-            raise ValueError("Total is zero points")
-        return max(1.0, min(6.0, round(5.0 * self.got / self.total + 1.0, 1)))
+            raw_data = data
+
+        # Validation and tree building share a single walk of the criteria.
+        builder = TreeBuilder()
+        try:
+            normalized_data = Criteria(raw_data, visitors=[builder])
+        except CriteriaValidationError as exc:
+            if source is None:
+                raise
+            raise locate_errors(exc, source) from None
+        self.tree = builder.finish(
+            schema_version=normalized_data.get("schema_version"),
+            grading=normalized_data.get("grading"),
+        )
 
-    @property
-    def points(self) -> Points:
-        """Return the aggregated points, bonus, and total values."""
-        return self._get_points(self.data)
+    @classmethod
+    def from_normalized(cls, data: Mapping[str, Any]) -> Score:
+        """Build a score from already normalized criteria, skipping validation.
 
-    @property
-    def total(self) -> float:
-        """Return the total number of available points."""
-        return self.points.total
+        Use it for mappings known to come from ``Criteria`` (or from
+        :attr:`data`) that lost their marker type on the way, e.g. after a
+        JSON round trip. The mapping is not modified by later awards.
+        """
+        return cls(build_tree(data))
 
     @property
-    def bonus(self) -> float:
-        """Return the total bonus collected for the criteria tree."""
-        return self.points.bonus
+    def data(self) -> Mapping[str, Any]:
+        """Return the normalized criteria mapping backing this score.
+
+        The mapping is rendered from :attr:`tree` on first access and kept, so
+        in-place edits followed by :meth:`invalidate` are picked up.
+        """
+        if self._data is None:
+            self._data = self.tree.to_dict()
+        return self._data
+
+    @data.setter
+    def data(self, value: Mapping[str, Any]) -> None:
+        """Replace the criteria mapping and drop the cached aggregates."""
+        self._data = value
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forget cached aggregates; call after mutating ``data`` in place."""
+        self._points = None
+        if self._data is not None:
+            self.tree = build_tree(self._data)
 
     @property
-    def got(self) -> float:
-        """Return the number of points obtained, including bonus."""
-        return self.points.got
-
-    @property
-    def success(self) -> bool:
-        """Return True when the final mark reaches the passing threshold."""
-        return self.mark >= 4.0
-
-    def _get_points(self, data: Mapping[str, Any]) -> Points:
-        """Recursively aggregate points stored in a criteria mapping."""
-        accumulator = _Accumulator()
-        for key, value in data.items():
-            if key in {"schema_version", "grading"}:
-                continue
-            if isinstance(value, MutableMapping):
-                nested_points = self._get_points(value)
-                accumulator.got += nested_points.got
-                accumulator.total += nested_points.total
-                accumulator.bonus += nested_points.bonus
-            elif isinstance(value, list) and key in {"$points", "$pts"}:
-                obtained, available = value
-                obtained_value = float(obtained)
-                available_value = float(available)
-                accumulator.got += obtained_value
-                accumulator.total += available_value if available_value > 0 else 0.0
-            elif isinstance(value, list) and key == "$bonus":
-                obtained, _ = value
-                obtained_value = float(obtained)
-                accumulator.bonus += obtained_value
-                accumulator.got += obtained_value
-        return Points(
-            got=accumulator.got, total=accumulator.total, bonus=accumulator.bonus
-        )
+    def points(self) -> Points:
+        """Return the aggregated points, bonus, and total values.
+
+        Section subtotals are computed once while the tree is built; the root
+        totals are memoized until :meth:`invalidate` or :meth:`set_award`.
+        """
+        if self._points is None:
+            self._points = self.tree.points
+        return self._points
+
+    def breakdown(self) -> Dict[str, Dict[str, Points]]:
+        """Return subtotals per section and per ``milestone`` tag.
+
+        Sections are keyed by their dotted id (``"code.overall"``); the
+        subtotals come from the same walk that produces :attr:`points`.
+        """
+        return {
+            "sections": {
+                ".".join(path): section.as_points()
+                for path, section in self.tree.sections()
+            },
+            "milestones": {
+                name: subtotal.as_points()
+                for name, subtotal in self.tree.milestones.items()
+            },
+        }
+
+    def set_award(
+        self,
+        criterion_id: str,
+        points: float | str,
+        rationale: str | None = None,
+        *,
+        bonus: bool = False,
+    ) -> Points:
+        """Change the points awarded to one criterion and return the new totals.
+
+        Only the leaf and the cached subtotals of its ancestor sections are
+        updated, so the cost is proportional to the depth of the criterion
+        rather than to the size of the criteria tree. ``points`` accepts the
+        same values as the criteria file (a number or a ``"42%"`` string).
+        A version 1 leaf with both ``$points`` and ``$bonus`` gets its
+        ``$points`` award changed, or its ``$bonus`` one with ``bonus=True``.
+        """
+        criterion = self.tree.find(criterion_id)
+        if criterion is None:
+            raise KeyError(f"Unknown criterion: {criterion_id}")
+        key = "$bonus" if criterion.is_bonus else "$points"
+        available = criterion.available
+        extra = bonus and not criterion.is_bonus
+        if extra:
+            if criterion.bonus is None:
+                raise ValueError(f"Criterion {criterion_id} has no bonus")
+            key, available = "$bonus", criterion.bonus[1]
+
+        errors: List[Dict[str, Any]] = []
+        path = ("criteria", *criterion.path, key)
+        pair = _validate_pair([points, available], errors, path)
+        if pair is None:
+            raise CriteriaValidationError(
+                _format_validation_errors(errors), errors=errors
+            )
+
+        self.tree.set_points(criterion, pair[0], bonus=extra)
+        if rationale is not None:
+            criterion.rationale = rationale
+
+        if self._data is not None:
+            item: Any = self._data["criteria"]
+            for part in criterion.path:
+                item = item[part]
+            item[key] = pair
+            if rationale is not None:
+                item["$rationale"] = rationale
+
+        self._points = self.tree.points
+        return self._points
+
+    def apply_results(self, results: Mapping[str, Any]) -> Tuple[List[str], List[str]]:
+        """Merge a results mapping in memory and return ``(applied, unknown)``.
+
+        ``results`` has the ``score apply`` layout (``{criterion_id:
+        {"awarded_points": N, "rationale": "..."}}``); points are clamped the
+        same way, but nothing is written back to the criteria file.
+        """
+        _, applied, unknown = _apply_to_tree(self.tree, results.items())
+        self._points = None
+        self._data = None
+        return applied, unknown
+
+
+__all__ = ["Points", "Score", "ScoreSummary"]
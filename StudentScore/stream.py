@@ -0,0 +1,266 @@
+"""Score a criteria file straight from YAML parse events.
+
+The default ``score`` command only needs the aggregated points, yet the full
+path composes the whole document (long LLM ``rationale`` texts included),
+normalizes it and keeps it around. :func:`stream_score` walks the PyYAML event
+stream once instead: each leaf criterion is materialized on its own, checked
+with the same rules as :func:`StudentScore.schema.Criteria`, folded into the
+subtotal of its section and dropped. Memory stays bounded by the nesting depth
+and the size of the largest single criterion.
+
+Documents using a construct the event walk does not model (anchors, aliases
+and explicit tags, ``schema_version`` written after ``criteria``, duplicate
+keys...), failing validation or going past the :mod:`~StudentScore.limits`
+raise :class:`StreamFallback`. Callers then
+rerun the full loader, which yields the same points or the detailed errors.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterator, List, Set, TextIO, Tuple
+
+from . import yaml
+from .limits import DEFAULT_LIMITS, Limits
+from .model import Points, ScoreSummary
+from .schema import (
+    _ensure_section_text,
+    _validate_grading,
+    _validate_item,
+    _validate_v2_item,
+)
+
+
+_SCALAR_TAGS = {
+    "tag:yaml.org,2002:null",
+    "tag:yaml.org,2002:bool",
+    "tag:yaml.org,2002:int",
+    "tag:yaml.org,2002:float",
+    "tag:yaml.org,2002:str",
+    "tag:yaml.org,2002:timestamp",
+}
+_V2_POINT_KEYS = {"awarded_points", "max_points", "bonus_points"}
+_SECTION_TEXT_KEYS = {1: {"$description", "$desc"}, 2: {"description"}}
+
+Subtotal = Tuple[float, float, float]
+
+
+class StreamFallback(Exception):
+    """Raised when a document must go through the full loader instead."""
+
+
+class _EventReader:
+    """Pull parse events and materialize small subtrees on demand."""
+
+    def __init__(self, events: Iterator[Any], limits: Limits = DEFAULT_LIMITS) -> None:
+        self._events = events
+        self.limits = limits
+        self.leaves = 0
+        self._resolver = yaml.Resolver()
+        self._constructor = yaml.SafeConstructor()
+
+    def next(self) -> Any:
+        """Return the next event, refusing the constructs we do not model."""
+        event = next(self._events)
+        if isinstance(event, yaml.events.AliasEvent):
+            raise StreamFallback("aliases need the full loader")
+        if isinstance(event, yaml.events.NodeEvent):
+            if event.anchor is not None:
+                raise StreamFallback("anchors need the full loader")
+            if getattr(event, "tag", None) not in {None, "!"}:
+                raise StreamFallback("explicit tags need the full loader")
+        return event
+
+    def value(self, event: Any) -> Any:
+        """Return the Python value of the node starting with ``event``."""
+        if isinstance(event, yaml.events.ScalarEvent):
+            tag = self._resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+            if tag not in _SCALAR_TAGS:
+                raise StreamFallback(f"unsupported scalar type {tag}")
+            node = yaml.ScalarNode(tag, event.value, style=event.style)
+            return self._constructor.yaml_constructors[tag](self._constructor, node)
+
+        if isinstance(event, yaml.events.SequenceStartEvent):
+            items: List[Any] = []
+            while not isinstance(event := self.next(), yaml.events.SequenceEndEvent):
+                items.append(self.value(event))
+            return items
+
+        if isinstance(event, yaml.events.MappingStartEvent):
+            mapping: Dict[Any, Any] = {}
+            while not isinstance(event := self.next(), yaml.events.MappingEndEvent):
+                key = self.value(event)
+                try:
+                    mapping[key] = self.value(self.next())
+                except TypeError as exc:  # unhashable key
+                    raise StreamFallback(str(exc)) from exc
+            return mapping
+
+        raise StreamFallback(f"unexpected {type(event).__name__}")
+
+    def key(self, event: Any, seen: Set[str]) -> str:
+        """Return a mapping key as text, rejecting duplicates."""
+        key = self.value(event)
+        try:
+            text = str(key)
+        except Exception as exc:  # noqa: BLE001 - defensive
+            raise StreamFallback(str(exc)) from exc
+        if text in seen:
+            raise StreamFallback(f"duplicate key {text!r}")
+        seen.add(text)
+        return text
+
+
+def _is_leaf(keys: Set[str], version: int) -> bool:
+    """Return True when a node with these keys is a leaf criterion."""
+    if version == 2:
+        return bool(keys & _V2_POINT_KEYS)
+    return bool(keys) and all(key.startswith("$") for key in keys)
+
+
+def _leaf_points(
+    fields: Dict[str, Any],
+    path: Tuple[str, ...],
+    version: int,
+) -> Subtotal:
+    """Validate a materialized leaf and return its ``(got, total, bonus)``."""
+    errors: List[Dict[str, Any]] = []
+    if version == 2:
+        item = _validate_v2_item(fields, errors, path)
+    else:
+        item = _validate_item(fields, errors, path)
+    if errors:
+        raise StreamFallback("invalid criterion")
+
+    bonus = float(item["$bonus"][0]) if "$bonus" in item else 0.0
+    if "$points" in item:
+        awarded, available = item["$points"]
+        return float(awarded) + bonus, max(float(available), 0.0), bonus
+    return bonus, 0.0, bonus
+
+
+def _read_node(
+    reader: _EventReader,
+    path: Tuple[str, ...],
+    version: int,
+) -> Subtotal:
+    """Fold the criteria mapping being read (section or leaf) into a subtotal."""
+    max_depth = reader.limits.max_depth
+    if max_depth is not None and len(path) + 1 > max_depth:
+        raise StreamFallback("nesting limit exceeded")
+    fields: Dict[str, Any] = {}
+    keys: Set[str] = set()
+    has_children = False
+    got = total = bonus = 0.0
+
+    while not isinstance(event := reader.next(), yaml.events.MappingEndEvent):
+        key = reader.key(event, keys)
+        event = reader.next()
+        if isinstance(event, yaml.events.MappingStartEvent):
+            child_got, child_total, child_bonus = _read_node(
+                reader, path + (key,), version
+            )
+            got += child_got
+            total += child_total
+            bonus += child_bonus
+            has_children = True
+        else:
+            fields[key] = reader.value(event)
+
+    if _is_leaf(keys, version):
+        if has_children:
+            raise StreamFallback("criterion fields must not be mappings")
+        reader.leaves += 1
+        max_leaves = reader.limits.max_leaves
+        if max_leaves is not None and reader.leaves > max_leaves:
+            raise StreamFallback("criteria count limit exceeded")
+        return _leaf_points(fields, path, version)
+
+    text_keys = _SECTION_TEXT_KEYS[version]
+    if set(fields) - text_keys or (keys - set(fields)) & text_keys:
+        raise StreamFallback("sections may only hold criteria and a description")
+    errors: List[Dict[str, Any]] = []
+    for key, value in fields.items():
+        _ensure_section_text(value, errors, path + (key,))
+    if errors or len(fields) > 1:
+        raise StreamFallback("invalid section description")
+    return got, total, bonus
+
+
+def _read_document(reader: _EventReader) -> Points:
+    """Return the points of a single-document criteria stream."""
+    if not isinstance(reader.next(), yaml.events.StreamStartEvent):
+        raise StreamFallback("expected a YAML stream")
+    if not isinstance(reader.next(), yaml.events.DocumentStartEvent):
+        raise StreamFallback("empty document")
+    if not isinstance(reader.next(), yaml.events.MappingStartEvent):
+        raise StreamFallback("criteria definition must be a mapping")
+
+    keys: Set[str] = set()
+    version: int | None = None
+    criteria_version: int | None = None
+    subtotal: Subtotal | None = None
+    grading: Any = None
+
+    while not isinstance(event := reader.next(), yaml.events.MappingEndEvent):
+        key = reader.key(event, keys)
+        event = reader.next()
+        if key == "criteria":
+            if not isinstance(event, yaml.events.MappingStartEvent):
+                raise StreamFallback("criteria must be a mapping")
+            criteria_version = version or 1
+            subtotal = _read_node(reader, ("criteria",), criteria_version)
+        elif key == "schema_version":
+            try:
+                version = int(reader.value(event))
+            except (TypeError, ValueError) as exc:
+                raise StreamFallback("invalid schema_version") from exc
+            if version not in {1, 2}:
+                raise StreamFallback("invalid schema_version")
+            if criteria_version is not None and criteria_version != version:
+                raise StreamFallback("schema_version follows criteria")
+        elif key == "grading":
+            grading = reader.value(event)
+        else:
+            reader.value(event)  # ignored, as by the full validator
+
+    if not isinstance(reader.next(), yaml.events.DocumentEndEvent):
+        raise StreamFallback("unterminated document")
+    if not isinstance(reader.next(), yaml.events.StreamEndEvent):
+        raise StreamFallback("expected a single document")
+
+    if subtotal is None:
+        raise StreamFallback("missing criteria definition")
+    if grading is not None:
+        errors: List[Dict[str, Any]] = []
+        if version == 2:
+            _validate_grading(grading, errors, ("grading",))
+        if version != 2 or errors:
+            raise StreamFallback("invalid grading block")
+
+    got, total, bonus = subtotal
+    return Points(got=got, total=total, bonus=bonus)
+
+
+def stream_score(data: str | TextIO, limits: Limits | None = None) -> ScoreSummary:
+    """Return the points and mark of a criteria file without loading it whole.
+
+    ``data`` is a path or an open text stream. Raises :class:`StreamFallback`
+    when the full loader must be used instead, which also reports documents
+    exceeding ``limits``.
+    """
+    limits = limits or DEFAULT_LIMITS
+    if isinstance(data, str):
+        if limits.max_bytes is not None and os.path.getsize(data) > limits.max_bytes:
+            raise StreamFallback("size limit exceeded")
+        with open(data, "rt", encoding="utf8") as file_handle:
+            return stream_score(file_handle, limits)
+
+    reader = _EventReader(yaml.parse(data), limits)
+    try:
+        return ScoreSummary(_read_document(reader))
+    except yaml.YAMLError as exc:
+        raise StreamFallback(str(exc)) from exc
+
+
+__all__ = ["StreamFallback", "stream_score"]
@@ -0,0 +1,214 @@
+"""Iterative traversal of criteria trees, shared by every module.
+
+Raw YAML mappings (version 1 or 2), normalized ``Criteria`` output and the
+typed :mod:`StudentScore.model` nodes are all trees of sections and leaf
+criteria. :func:`iter_tree` walks any of them with an explicit stack, so deep
+rubrics never hit the Python recursion limit, and reports what it meets as
+``(event, path, key, node)`` tuples:
+
+* ``ENTER`` / ``LEAVE`` around every section, the root included;
+* ``LEAF`` for every leaf criterion;
+* ``VALUE`` for any other child (descriptions, stray scalars, pruned nodes).
+
+``path`` holds the text keys from the root (the dotted id of a leaf is
+``".".join(path)``) and ``key`` is the raw mapping key, ``None`` for the root.
+:func:`walk` feeds the same events to several :class:`Visitor` objects, so
+validation, aggregation and indexing can share a single pass.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+
+ENTER = "enter"
+LEAVE = "leave"
+LEAF = "leaf"
+VALUE = "value"
+
+Path = Tuple[str, ...]
+Event = Tuple[str, Path, Any, Any]
+
+_V2_POINT_KEYS = {"awarded_points", "max_points", "bonus_points"}
+
+
+def is_v1_leaf(node: Any) -> bool:
+    """Return True for a raw version 1 leaf (only ``$``-prefixed keys)."""
+    if not isinstance(node, Mapping):
+        return False
+    keys = [str(key) for key in node.keys()]
+    return bool(keys) and all(key.startswith("$") for key in keys)
+
+
+def is_v2_leaf(node: Any) -> bool:
+    """Return True for a raw version 2 leaf (it declares points)."""
+    if not isinstance(node, Mapping):
+        return False
+    return any(str(key) in _V2_POINT_KEYS for key in node.keys())
+
+
+def is_raw_leaf(node: Any) -> bool:
+    """Return True for a raw leaf of either schema version."""
+    return is_v2_leaf(node) or is_v1_leaf(node)
+
+
+def is_normalized_leaf(node: Any) -> bool:
+    """Return True for a leaf of normalized ``Criteria`` output."""
+    if not isinstance(node, Mapping):
+        return False
+    return isinstance(node.get("$points"), list) or isinstance(
+        node.get("$bonus"), list
+    )
+
+
+def _mapping_children(node: Any) -> Iterable[Tuple[Any, Any]]:
+    """Return the entries of a mapping node."""
+    return node.items()
+
+
+def _is_mapping(node: Any) -> bool:
+    """Return True when a child value is a mapping node."""
+    return isinstance(node, Mapping)
+
+
+def iter_tree(
+    root: Any,
+    *,
+    is_leaf: Callable[[Any], bool] = is_raw_leaf,
+    is_node: Callable[[Any], bool] = _is_mapping,
+    children: Callable[[Any], Iterable[Tuple[Any, Any]]] = _mapping_children,
+    prune: Callable[[Path, Any, Any], bool] | None = None,
+    prefix: Path = (),
+) -> Iterator[Event]:
+    """Yield traversal events for ``root`` in document order, without recursion.
+
+    ``is_node`` tells which child values are tree nodes and ``is_leaf`` which
+    of those are leaf criteria; the defaults handle raw mappings. ``prune``
+    may turn a node into a plain ``VALUE`` so its subtree is not visited.
+    """
+    yield ENTER, prefix, None, root
+    stack: List[Tuple[Path, Any, Any, Iterator[Tuple[Any, Any]]]] = [
+        (prefix, None, root, iter(children(root)))
+    ]
+    while stack:
+        path, node_key, node, entries = stack[-1]
+        for key, value in entries:
+            child_path = path + (str(key),)
+            if not is_node(value) or (
+                prune is not None and prune(child_path, key, value)
+            ):
+                yield VALUE, child_path, key, value
+            elif is_leaf(value):
+                yield LEAF, child_path, key, value
+            else:
+                yield ENTER, child_path, key, value
+                stack.append((child_path, key, value, iter(children(value))))
+                break
+        else:
+            stack.pop()
+            yield LEAVE, path, node_key, node
+
+
+def iter_leaves(root: Any, **options: Any) -> Iterator[Tuple[Path, Any]]:
+    """Yield ``(path, leaf)`` for every leaf below ``root``."""
+    for event, path, _, node in iter_tree(root, **options):
+        if event == LEAF:
+            yield path, node
+
+
+def _raw_key(node: Mapping[Any, Any], part: str) -> Any:
+    """Return the key of ``node`` whose text is ``part`` (YAML keys may be ints)."""
+    if part in node:
+        return part
+    for key in node:
+        if str(key) == part:
+            return key
+    raise KeyError(part)
+
+
+def get_path(root: Mapping[Any, Any], path: Path) -> Any:
+    """Return the node reached from ``root`` by the text keys of ``path``."""
+    node: Any = root
+    for part in path:
+        node = node[_raw_key(node, part)]
+    return node
+
+
+def copy_path(copies: Dict[Path, Dict[Any, Any]], path: Path) -> Dict[Any, Any]:
+    """Return a private copy of the mapping at ``path`` for copy-on-write edits.
+
+    ``copies[()]`` is the already copied root. Every mapping from the root to
+    ``path`` is copied once, recorded in ``copies`` and linked into its copied
+    parent; the other subtrees stay shared with the original tree.
+    """
+    node = copies[()]
+    for depth in range(1, len(path) + 1):
+        copy = copies.get(path[:depth])
+        if copy is None:
+            key = _raw_key(node, path[depth - 1])
+            copy = copies[path[:depth]] = dict(node[key])
+            node[key] = copy
+        node = copy
+    return node
+
+
+class Visitor:
+    """Base class for consumers of :func:`walk`; every hook is optional."""
+
+    def prune(self, path: Path, key: Any, node: Any) -> bool:
+        """Return True to treat ``node`` as an opaque value."""
+        return False
+
+    def enter_section(self, path: Path, key: Any, node: Any) -> None:
+        """Called before the children of a section are visited."""
+
+    def leave_section(self, path: Path, key: Any, node: Any) -> None:
+        """Called after the children of a section were visited."""
+
+    def visit_leaf(self, path: Path, key: Any, node: Any) -> None:
+        """Called for every leaf criterion."""
+
+    def visit_value(self, path: Path, key: Any, value: Any) -> None:
+        """Called for every child that is not a section or a leaf."""
+
+
+def walk(root: Any, *visitors: Visitor, **options: Any) -> None:
+    """Traverse ``root`` once, dispatching every event to all ``visitors``.
+
+    A node is pruned as soon as one visitor asks for it. Remaining keyword
+    arguments are passed to :func:`iter_tree`.
+    """
+    if len(visitors) == 1:
+        prune = visitors[0].prune
+    else:
+
+        def prune(path: Path, key: Any, node: Any) -> bool:
+            return any(visitor.prune(path, key, node) for visitor in visitors)
+
+    handlers = {
+        ENTER: [visitor.enter_section for visitor in visitors],
+        LEAVE: [visitor.leave_section for visitor in visitors],
+        LEAF: [visitor.visit_leaf for visitor in visitors],
+        VALUE: [visitor.visit_value for visitor in visitors],
+    }
+    for event, path, key, node in iter_tree(root, prune=prune, **options):
+        for handler in handlers[event]:
+            handler(path, key, node)
+
+
+__all__ = [
+    "ENTER",
+    "LEAF",
+    "LEAVE",
+    "VALUE",
+    "Visitor",
+    "copy_path",
+    "get_path",
+    "is_normalized_leaf",
+    "is_raw_leaf",
+    "is_v1_leaf",
+    "is_v2_leaf",
+    "iter_leaves",
+    "iter_tree",
+    "walk",
+]
@@ -1,9 +1,27 @@
-"""Runtime wrapper ensuring PyYAML is available before parsing files."""
+"""Runtime wrapper ensuring PyYAML is available before parsing files.
+
+Criteria files only use plain mappings, lists and scalars, so they are read
+with PyYAML's safe loader. When PyYAML was built with libyaml, the C
+``CSafeLoader`` / ``CSafeDumper`` are used, which parse and emit several
+times faster than the pure Python classes. Set ``STUDENTSCORE_YAML_BACKEND``
+to ``python`` to force the pure Python classes, or to ``c`` to require
+libyaml; the default, ``auto``, picks the fastest one available.
+
+:func:`load` and :func:`compose` enforce :mod:`~StudentScore.limits` while the
+node graph is composed: nesting depth and alias expansion are counted before
+any Python object is built, and recursive aliases are refused. With the C
+backend, libyaml still scans and parses; the composing step runs in Python so
+it can be bounded.
+"""
 
 from __future__ import annotations
 
 from importlib import import_module
-from typing import IO, Any
+import os
+from typing import IO, Any, Dict, Iterator, List, Tuple
+
+from .limits import DEFAULT_LIMITS, Limits
+from .schema import CriteriaValidationError, _add_error, _format_validation_errors
 
 
 try:
@@ -11,14 +29,153 @@ try:
 except ModuleNotFoundError as exc:  # pragma: no cover - import side effect
     raise ImportError("PyYAML is required to parse grading criteria files.") from exc
 
+BACKEND_ENV = "STUDENTSCORE_YAML_BACKEND"
+
 FullLoader = _yaml.FullLoader
 SafeDumper = _yaml.SafeDumper
+SafeLoader = _yaml.SafeLoader
+SafeConstructor = _yaml.constructor.SafeConstructor
+Resolver = _yaml.resolver.Resolver
+ScalarNode = _yaml.ScalarNode
+SequenceNode = _yaml.SequenceNode
+MappingNode = _yaml.MappingNode
+YAMLError = _yaml.YAMLError
+events = _yaml.events
+
+
+def _select_backend(name: str | None) -> Tuple[str, Any, Any]:
+    """Return ``(backend, Loader, Dumper)`` for a backend name."""
+    name = (name or "auto").strip().lower()
+    if name not in {"auto", "c", "python"}:
+        raise ImportError(
+            f"{BACKEND_ENV} must be 'auto', 'c' or 'python', not {name!r}."
+        )
+    has_libyaml = bool(getattr(_yaml, "__with_libyaml__", False))
+    if name == "c" and not has_libyaml:
+        raise ImportError(
+            f"{BACKEND_ENV}=c requires PyYAML built with libyaml support."
+        )
+    if name != "python" and has_libyaml:
+        return "c", _yaml.CSafeLoader, _yaml.CSafeDumper
+    return "python", SafeLoader, SafeDumper
+
+
+BACKEND, DefaultLoader, DefaultDumper = _select_backend(os.environ.get(BACKEND_ENV))
+
+
+class _LimitingComposer(_yaml.composer.Composer):
+    """Composer counting nesting depth and alias expansion as it goes."""
+
+    limits: Limits = DEFAULT_LIMITS
+
+    def _limit_exceeded(self, message: str, event: Any) -> None:
+        mark = event.start_mark
+        errors: List[Dict[str, Any]] = []
+        _add_error(errors, (), f"{message} (line {mark.line + 1})")
+        raise CriteriaValidationError(
+            _format_validation_errors(errors), errors=errors
+        )
+
+    def compose_document(self) -> Any:
+        self._depth = 0
+        self._expanded = 0
+        self._aliases = 0
+        self._sizes: Dict[int, int] = {}
+        return super().compose_document()
+
+    def compose_node(self, parent: Any, index: Any) -> Any:
+        event = self.peek_event()
+        if isinstance(event, _yaml.events.AliasEvent):
+            target = self.anchors.get(event.anchor)
+            if target is not None:
+                size = self._sizes.get(id(target))
+                if size is None:
+                    self._limit_exceeded(
+                        f"alias *{event.anchor} refers to its own anchor", event
+                    )
+                self._aliases += size
+                self._expanded += size
+                maximum = self.limits.max_aliases
+                if maximum is not None and self._aliases > maximum:
+                    self._limit_exceeded(
+                        f"aliases expand to more than {maximum} nodes", event
+                    )
+            return super().compose_node(parent, index)
 
+        collection = isinstance(event, _yaml.events.CollectionStartEvent)
+        if collection:
+            self._depth += 1
+            maximum = self.limits.max_depth
+            if maximum is not None and self._depth > maximum:
+                self._limit_exceeded(
+                    f"nesting is deeper than {maximum} levels", event
+                )
+        start = self._expanded
+        self._expanded += 1
+        node = super().compose_node(parent, index)
+        if collection:
+            self._depth -= 1
+        if event.anchor is not None:
+            self._sizes[id(node)] = self._expanded - start
+        return node
 
-def load(stream: IO[str] | str, *, Loader: Any | None = None) -> Any:
-    """Proxy to ``yaml.load`` ensuring the ``FullLoader`` is used by default."""
-    loader = Loader or FullLoader
-    return _yaml.load(stream, Loader=loader)
+
+def _limited_loader(base: Any) -> Any:
+    """Return ``base`` with its composer replaced by the limiting one."""
+
+    class LimitedLoader(_LimitingComposer, base):
+        def __init__(self, stream: IO[str] | str, limits: Limits) -> None:
+            base.__init__(self, stream)
+            _LimitingComposer.__init__(self)
+            self.limits = limits
+
+    LimitedLoader.__name__ = LimitedLoader.__qualname__ = f"Limited{base.__name__}"
+    return LimitedLoader
+
+
+LimitedLoader = _limited_loader(DefaultLoader)
+
+
+def load(
+    stream: IO[str] | str,
+    *,
+    Loader: Any | None = None,
+    limits: Limits | None = None,
+) -> Any:
+    """Proxy to ``yaml.load`` using the selected safe loader by default.
+
+    Without an explicit ``Loader`` the document is bounded by ``limits``
+    (:data:`~StudentScore.limits.DEFAULT_LIMITS` by default).
+    """
+    if Loader is not None:
+        return _yaml.load(stream, Loader=Loader)
+    loader = LimitedLoader(stream, limits or DEFAULT_LIMITS)
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
+
+
+def parse(stream: IO[str] | str, *, Loader: Any | None = None) -> Iterator[Any]:
+    """Proxy to ``yaml.parse`` yielding parse events with the default loader."""
+    loader = Loader or DefaultLoader
+    return _yaml.parse(stream, Loader=loader)
+
+
+def compose(
+    stream: IO[str] | str,
+    *,
+    Loader: Any | None = None,
+    limits: Limits | None = None,
+) -> Any:
+    """Proxy to ``yaml.compose`` returning the node graph with its marks."""
+    if Loader is not None:
+        return _yaml.compose(stream, Loader=Loader)
+    loader = LimitedLoader(stream, limits or DEFAULT_LIMITS)
+    try:
+        return loader.get_single_node()
+    finally:
+        loader.dispose()
 
 
 def dump(
@@ -28,9 +185,29 @@ def dump(
     Dumper: Any | None = None,
     **kwargs: Any,
 ) -> str | None:
-    """Proxy to ``yaml.dump`` ensuring the ``SafeDumper`` is used by default."""
-    dumper = Dumper or SafeDumper
+    """Proxy to ``yaml.dump`` using the selected safe dumper by default."""
+    dumper = Dumper or DefaultDumper
     return _yaml.dump(data, stream=stream, Dumper=dumper, **kwargs)
 
 
-__all__ = ["FullLoader", "SafeDumper", "dump", "load"]
+__all__ = [
+    "BACKEND",
+    "BACKEND_ENV",
+    "DefaultDumper",
+    "DefaultLoader",
+    "FullLoader",
+    "LimitedLoader",
+    "MappingNode",
+    "Resolver",
+    "SafeConstructor",
+    "SafeDumper",
+    "SafeLoader",
+    "ScalarNode",
+    "SequenceNode",
+    "YAMLError",
+    "compose",
+    "dump",
+    "events",
+    "load",
+    "parse",
+]
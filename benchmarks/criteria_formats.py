@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Compare loading a large rubric from YAML, JSON and MessagePack.
+
+Run with ``python benchmarks/criteria_formats.py [--sections N] [--repeat N]``
+(or ``nox -s benchmark``). Each timing covers parsing plus ``Criteria``
+validation, which is what every command pays on a cache miss.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from yaml_backends import best_of, make_rubric  # noqa: E402
+
+from StudentScore import formats, yaml  # noqa: E402
+from StudentScore.schema import Criteria  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rubric = make_rubric(args.sections)
+    print(f"rubric: {args.sections * 20} criteria, best of {args.repeat}")
+
+    candidates = [(f"yaml ({yaml.BACKEND})", formats.YAML), ("json", formats.JSON)]
+    try:
+        formats.dumps({}, formats.MSGPACK)
+    except RuntimeError:
+        print("msgpack: not installed, skipped")
+    else:
+        candidates.append(("msgpack", formats.MSGPACK))
+
+    validate_ms = best_of(args.repeat, lambda: Criteria(rubric))
+    print(f"{'validation only':>15}: {validate_ms:8.1f} ms")
+    for name, fmt in candidates:
+        content = formats.dumps(rubric, fmt)
+        load_ms = best_of(args.repeat, lambda: Criteria(formats.loads(content, fmt)))
+        print(
+            f"{name:>15}: {load_ms:8.1f} ms "
+            f"({len(content) / 1024:.0f} KiB, parse {load_ms - validate_ms:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Time loading and dumping a large generated rubric with each YAML backend.
+
+Run with ``python benchmarks/yaml_backends.py [--sections N] [--repeat N]``
+(or ``nox -s benchmark``). The rubric mimics a graded version 2 file: nested
+sections with descriptions, points and multi-line LLM rationales.
+
+The ``default`` row is what commands run: ``yaml.load`` without a loader,
+composing with the :mod:`~StudentScore.limits` checks on top of the selected
+backend. The other rows time a plain loader, without limits.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import Any, Callable, Dict
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from StudentScore import yaml  # noqa: E402
+
+
+def make_rubric(sections: int, leaves: int = 20) -> Dict[str, Any]:
+    """Return a version 2 rubric with ``sections`` x ``leaves`` criteria."""
+    criteria: Dict[str, Any] = {}
+    for i in range(sections):
+        section: Dict[str, Any] = {"description": f"Section {i}"}
+        for j in range(leaves):
+            section[f"criterion-{j}"] = {
+                "description": f"Criterion {j} of section {i}",
+                "max_points": 2,
+                "awarded_points": 1.5,
+                "rationale": "The submission mostly meets this criterion.\n" * 3,
+            }
+        criteria[f"section-{i}"] = section
+    return {"schema_version": 2, "criteria": criteria}
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    """Return the fastest of ``repeat`` runs of ``func``, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rubric = make_rubric(args.sections)
+    text = yaml.dump(rubric, sort_keys=False)
+    print(
+        f"rubric: {args.sections * 20} criteria, {len(text) / 1024:.0f} KiB, "
+        f"best of {args.repeat}"
+    )
+
+    # FullLoader + SafeDumper was the fixed pair before backends existed.
+    candidates = [("full", yaml.FullLoader, yaml.SafeDumper)]
+    candidates.append(yaml._select_backend("python"))
+    if getattr(yaml._yaml, "__with_libyaml__", False):
+        candidates.append(yaml._select_backend("c"))
+    # Loader None takes the default path, bounded by the default limits.
+    candidates.append(("default", None, yaml.DefaultDumper))
+    for name, loader, dumper in candidates:
+        load_ms = best_of(args.repeat, lambda: yaml.load(text, Loader=loader))
+        dump_ms = best_of(
+            args.repeat, lambda: yaml.dump(rubric, Dumper=dumper, sort_keys=False)
+        )
+        limits = "no" if loader is not None else "yes"
+        print(
+            f"{name:>7}: load {load_ms:8.1f} ms   dump {dump_ms:8.1f} ms   "
+            f"limits {limits}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 import sys
+import tempfile
 
 
 ROOT = Path(__file__).resolve().parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+# Keep the CLI tests away from the user's criteria cache.
+os.environ.setdefault(
+    "STUDENTSCORE_CACHE_DIR", tempfile.mkdtemp(prefix="studentscore-cache-")
+)
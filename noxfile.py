@@ -37,6 +37,14 @@ def lint(session: nox.Session) -> None:
     session.run("ruff", "check", "StudentScore", "tests")
 
 
+@nox.session
+def benchmark(session: nox.Session) -> None:
+    """Compare YAML backends and criteria formats on a large rubric."""
+    session.install(".[msgpack]")
+    session.run("python", "benchmarks/yaml_backends.py", *session.posargs)
+    session.run("python", "benchmarks/criteria_formats.py", *session.posargs)
+
+
 @nox.session(name="check-manifest")
 def check_manifest_session(session: nox.Session) -> None:
     """Verify that MANIFEST.in matches the repository contents."""
@@ -1,6 +1,8 @@
+import copy
 from unittest import TestCase
 
 from StudentScore.apply import apply_results, filter_milestone
+from StudentScore.index import CriteriaIndex
 from StudentScore.schema import Criteria
 
 
@@ -95,6 +97,38 @@ class TestApplyResults(TestCase):
         # Should not raise.
         Criteria(updated)
 
+    def test_copy_on_write(self):
+        raw = self._v2()
+        before = copy.deepcopy(raw)
+        index = CriteriaIndex.from_raw(raw["criteria"])
+        first, _, _ = apply_results(
+            raw,
+            {"binary.all-tests-passed": {"awarded_points": 4, "rationale": "4/10"}},
+            index=index,
+        )
+        self.assertEqual(raw, before)
+        # Only the path to the applied leaf is copied.
+        self.assertIsNot(first["criteria"]["binary"], raw["criteria"]["binary"])
+        self.assertIs(first["criteria"]["build"], raw["criteria"]["build"])
+
+        # The index still resolves ids in the updated copy.
+        second, _, _ = apply_results(
+            first, {"binary.all-tests-passed": {"awarded_points": 6}}, index=index
+        )
+        self.assertEqual(
+            second["criteria"]["binary"]["all-tests-passed"]["rationale"], "4/10"
+        )
+        self.assertEqual(
+            first["criteria"]["binary"]["all-tests-passed"]["awarded_points"], 4
+        )
+
+    def test_non_text_keys(self):
+        raw = {"criteria": {1: {"$description": "One", "$points": [0, 2]}}}
+        updated, applied, _ = apply_results(raw, {"1": {"awarded_points": 2}})
+        self.assertEqual(applied, ["1"])
+        self.assertEqual(updated["criteria"][1]["$points"], [2, 2])
+        self.assertEqual(raw["criteria"][1]["$points"], [0, 2])
+
     def test_v1_leaf(self):
         raw = {
             "criteria": {
@@ -153,6 +187,18 @@ class TestFilterMilestone(TestCase):
         )
         self.assertEqual(filtered["grading"], {"context": "Be fair."})
 
+    def test_shares_fully_kept_sections(self):
+        raw = self._v2()
+        raw["criteria"]["final"]["output"]["milestone"] = "mid-review"
+        before = copy.deepcopy(raw)
+        filtered, _ = filter_milestone(raw, "mid-review")
+        sections, original = filtered["criteria"], raw["criteria"]
+        self.assertIs(sections["final"], original["final"])
+        self.assertIsNot(sections["structure"], original["structure"])
+
+        apply_results(filtered, {"final.output": {"awarded_points": 4}})
+        self.assertEqual(raw, before)
+
     def test_filtered_result_validates(self):
         filtered, _ = filter_milestone(self._v2(), "mid-review")
         Criteria(filtered)  # should not raise
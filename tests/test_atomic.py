@@ -0,0 +1,153 @@
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore.__main__ import app
+from StudentScore.atomic import (
+    LockTimeout,
+    WriteBatch,
+    atomic_write,
+    file_lock,
+    file_locks,
+    lock_path,
+)
+
+
+CRITERIA = """\
+schema_version: 2
+criteria:
+  tests:
+    description: Tests
+    max_points: 4
+    awarded_points: 0
+"""
+
+
+class TestAtomicWrite(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.path = self.root / "criteria.yml"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _leftovers(self):
+        return [path.name for path in self.root.glob(".*.tmp")]
+
+    def test_replaces_content_and_keeps_mode(self):
+        self.path.write_bytes(b"old")
+        os.chmod(self.path, 0o640)
+        atomic_write(self.path, b"new", fsync=True)
+        self.assertEqual(self.path.read_bytes(), b"new")
+        self.assertEqual(self.path.stat().st_mode & 0o777, 0o640)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_failure_keeps_original(self):
+        self.path.write_bytes(b"old")
+        with mock.patch("StudentScore.atomic.os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                atomic_write(self.path, b"new")
+        self.assertEqual(self.path.read_bytes(), b"old")
+        self.assertEqual(self._leftovers(), [])
+
+    def test_batch_groups_fsyncs(self):
+        first, second = self.root / "a.yml", self.root / "b.yml"
+        first.write_bytes(b"old")
+        with mock.patch("StudentScore.atomic.os.fsync") as fsync:
+            with WriteBatch(fsync=True) as batch:
+                batch.write(first, b"one")
+                batch.write(second, b"two")
+                # Nothing is visible before the batch commits.
+                self.assertEqual(first.read_bytes(), b"old")
+                self.assertFalse(second.exists())
+        # One flush per file, then a single one for their directory.
+        self.assertEqual(fsync.call_count, 3)
+        self.assertEqual((first.read_bytes(), second.read_bytes()), (b"one", b"two"))
+
+    def test_batch_aborts_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with WriteBatch() as batch:
+                batch.write(self.path, b"new")
+                raise RuntimeError
+        self.assertFalse(self.path.exists())
+        self.assertEqual(self._leftovers(), [])
+
+
+class TestFileLock(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "criteria.yml"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_second_writer_times_out(self):
+        with file_lock(self.path):
+            with self.assertRaises(LockTimeout):
+                with file_lock(self.path, timeout=0.1):
+                    pass
+            self.assertTrue(lock_path(self.path).exists())
+        self.assertFalse(lock_path(self.path).exists())
+        with file_lock(self.path, timeout=0):
+            pass
+
+    def test_writers_serialize(self):
+        order = []
+
+        def writer(name):
+            with file_lock(self.path):
+                order.append(f"{name} in")
+                time.sleep(0.05)
+                order.append(f"{name} out")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([entry.split()[1] for entry in order], ["in", "out"] * 2)
+
+    def test_lock_files_are_removed(self):
+        counter = self.path.with_name("counter")
+        counter.write_text("0", encoding="utf-8")
+
+        def writer():
+            for _ in range(50):
+                with file_locks([self.path, counter]):
+                    value = int(counter.read_text(encoding="utf-8"))
+                    counter.write_text(str(value + 1), encoding="utf-8")
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.read_text(encoding="utf-8"), "200")
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["counter"])
+
+    def test_apply_waits_for_lock(self):
+        self.path.write_text(CRITERIA, encoding="utf-8")
+        results = self.path.with_name("results.json")
+        results.write_text(
+            json.dumps({"tests": {"awarded_points": 3}}), encoding="utf-8"
+        )
+        runner = CliRunner()
+        with file_lock(self.path):
+            result = runner.invoke(
+                app,
+                ["--lock-timeout", "0.1", "apply", str(results), str(self.path)],
+            )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIsInstance(result.exception, LockTimeout)
+        self.assertIn("awarded_points: 0", self.path.read_text(encoding="utf-8"))
+
+        result = runner.invoke(app, ["--fsync", "apply", str(results), str(self.path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("awarded_points: 3", self.path.read_text(encoding="utf-8"))
@@ -0,0 +1,189 @@
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+from typer.testing import CliRunner
+
+from StudentScore.__main__ import app
+from StudentScore.atomic import LockTimeout, file_lock
+from StudentScore.bulk import (
+    Job,
+    ManifestError,
+    UnknownCriteria,
+    apply_files,
+    apply_many,
+    read_manifest,
+)
+
+
+CRITERIA = """\
+schema_version: 2
+criteria:
+  style: {description: Style, max_points: 3, awarded_points: 0}
+  tests: {description: Tests, max_points: 2, awarded_points: 0}
+"""
+
+
+class BulkTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _repository(self, name, awards):
+        directory = self.root / name
+        directory.mkdir()
+        (directory / "criteria.yml").write_text(CRITERIA, encoding="utf-8")
+        (directory / "results.json").write_text(json.dumps(awards), encoding="utf-8")
+        return directory
+
+
+class TestReadManifest(BulkTestCase):
+    def test_rows(self):
+        manifest = self.root / "pairs.csv"
+        manifest.write_text(
+            "results,criteria,output\n"
+            "a/tests.json;a/llm.jsonl,a/criteria.yml\n"
+            "\n"
+            "# skipped\n"
+            "b/results.json,b/criteria.yml,out/b.yml\n",
+            encoding="utf-8",
+        )
+        jobs = read_manifest(manifest)
+        self.assertEqual(
+            [(job.results, job.criteria, job.output) for job in jobs],
+            [
+                (
+                    (self.root / "a/tests.json", self.root / "a/llm.jsonl"),
+                    self.root / "a/criteria.yml",
+                    None,
+                ),
+                (
+                    (self.root / "b/results.json",),
+                    self.root / "b/criteria.yml",
+                    self.root / "out/b.yml",
+                ),
+            ],
+        )
+        self.assertEqual(jobs[1].destination, self.root / "out/b.yml")
+
+    def test_errors_name_the_line(self):
+        manifest = self.root / "pairs.csv"
+        manifest.write_text("a.json,a.yml\na.json\n", encoding="utf-8")
+        with self.assertRaises(ManifestError) as context:
+            read_manifest(manifest)
+        self.assertIn(f"{manifest}:2:", str(context.exception))
+
+
+class TestApplyMany(BulkTestCase):
+    def test_failures_are_reported_per_job(self):
+        good = [
+            self._repository(f"student{n}", {"style": {"awarded_points": n}})
+            for n in range(3)
+        ]
+        bad = self._repository("typo", {"styel": {"awarded_points": 1}})
+        jobs = [
+            Job([directory / "results.json"], directory / "criteria.yml")
+            for directory in [*good, bad]
+        ]
+        outcomes = list(apply_many(jobs, workers=2))
+        self.assertEqual([outcome.job for outcome in outcomes], jobs)
+        self.assertEqual([outcome.ok for outcome in outcomes], [True] * 3 + [False])
+        self.assertEqual(outcomes[0].applied, ["style"])
+        self.assertIn("styel", outcomes[3].error)
+        for n, directory in enumerate(good):
+            text = (directory / "criteria.yml").read_text(encoding="utf-8")
+            self.assertIn(f"awarded_points: {n}}}", text)
+        self.assertEqual(
+            (bad / "criteria.yml").read_text(encoding="utf-8"), CRITERIA
+        )
+
+    def test_jobs_sharing_a_destination_take_turns(self):
+        directory = self._repository("shared", {"style": {"awarded_points": 3}})
+        (directory / "tests.json").write_text(
+            '{"tests": {"awarded_points": 2}}', encoding="utf-8"
+        )
+        criteria = directory / "criteria.yml"
+        jobs = [
+            Job([directory / "results.json"], criteria),
+            Job([directory / "tests.json"], criteria),
+        ]
+        self.assertTrue(all(outcome.ok for outcome in apply_many(jobs, workers=2)))
+        text = criteria.read_text(encoding="utf-8")
+        self.assertIn("max_points: 3, awarded_points: 3}", text)
+        self.assertIn("max_points: 2, awarded_points: 2}", text)
+
+    def test_jobs_sharing_a_fragment_take_turns(self):
+        directory = self.root / "labs"
+        directory.mkdir()
+        (directory / "shared.yml").write_text(
+            "style: {description: Style, max_points: 3, awarded_points: 0}\n"
+            "tests: {description: Tests, max_points: 2, awarded_points: 0}\n",
+            encoding="utf-8",
+        )
+        jobs = []
+        for name, awards in (
+            ("a", {"code.style": {"awarded_points": 3}}),
+            ("b", {"code.tests": {"awarded_points": 2}}),
+        ):
+            (directory / f"{name}.yml").write_text(
+                "schema_version: 2\ncriteria:\n  code: {include: shared.yml}\n",
+                encoding="utf-8",
+            )
+            (directory / f"{name}.json").write_text(
+                json.dumps(awards), encoding="utf-8"
+            )
+            jobs.append(Job([directory / f"{name}.json"], directory / f"{name}.yml"))
+
+        with file_lock(directory / "shared.yml"):
+            with self.assertRaises(LockTimeout):
+                apply_files(jobs[0].results, jobs[0].criteria, lock_timeout=0.1)
+        self.assertTrue(all(outcome.ok for outcome in apply_many(jobs, workers=2)))
+        text = (directory / "shared.yml").read_text(encoding="utf-8")
+        self.assertIn("max_points: 3, awarded_points: 3}", text)
+        self.assertIn("max_points: 2, awarded_points: 2}", text)
+        self.assertEqual(
+            sorted(path.name for path in directory.iterdir()),
+            ["a.json", "a.yml", "b.json", "b.yml", "shared.yml"],
+        )
+
+    def test_unknown_criteria(self):
+        directory = self._repository("student", {"nope": {"awarded_points": 1}})
+        with self.assertRaises(UnknownCriteria) as context:
+            apply_files([directory / "results.json"], directory / "criteria.yml")
+        self.assertEqual(context.exception.ids, ["nope"])
+
+
+class TestApplyManifestCli(BulkTestCase):
+    def test_manifest(self):
+        self._repository("alice", {"style": {"awarded_points": 2}})
+        self._repository("bob", {"test": {"awarded_points": 1}})
+        manifest = self.root / "pairs.csv"
+        manifest.write_text(
+            "alice/results.json,alice/criteria.yml,alice/graded.yml\n"
+            "bob/results.json,bob/criteria.yml\n",
+            encoding="utf-8",
+        )
+        result = CliRunner().invoke(
+            app, ["apply", "--manifest", str(manifest), "--workers", "1"]
+        )
+        self.assertEqual(result.exit_code, 1, result.output)
+        graded = self.root / "alice/graded.yml"
+        self.assertIn(f"OK   {graded}: applied 1 criteria", result.output)
+        self.assertIn(f"FAIL {self.root / 'bob/criteria.yml'}:", result.output)
+        self.assertIn("Applied results to 1 of 2 criteria files", result.output)
+        self.assertTrue(graded.is_file())
+        self.assertEqual(
+            (self.root / "bob/criteria.yml").read_text(encoding="utf-8"), CRITERIA
+        )
+
+    def test_manifest_excludes_arguments(self):
+        manifest = self.root / "pairs.csv"
+        manifest.write_text("", encoding="utf-8")
+        result = CliRunner().invoke(
+            app, ["apply", "--manifest", str(manifest), str(manifest)]
+        )
+        self.assertEqual(result.exit_code, 2)
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore.__main__ import app
+from StudentScore.cache import CACHE_DIR_ENV, CriteriaCache, load_criteria
+from StudentScore.schema import CriteriaValidationError, NormalizedCriteria
+
+
+dir_path = Path(__file__).resolve(strict=True).parent
+
+
+class TestCriteriaCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.cache = CriteriaCache(self.root / "cache")
+        self.criteria = self.root / "criteria.yml"
+        self.criteria.write_bytes(dir_path.joinpath("criteria.yml").read_bytes())
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hit_skips_parsing(self):
+        raw, normalized = load_criteria(self.criteria, self.cache)
+        with mock.patch("StudentScore.formats.loads") as parser:
+            cached_raw, cached = load_criteria(self.criteria, self.cache)
+            parser.assert_not_called()
+        self.assertEqual(cached_raw, raw)
+        self.assertEqual(cached, normalized)
+        self.assertIsInstance(cached, NormalizedCriteria)
+        self.assertIsNot(cached, normalized)
+
+    def test_changed_content_misses(self):
+        load_criteria(self.criteria, self.cache)
+        self.criteria.write_text(
+            "criteria:\n  a: {$description: A, $points: [1, 2]}\n", encoding="utf8"
+        )
+        _, normalized = load_criteria(self.criteria, self.cache)
+        self.assertEqual(list(normalized["criteria"]), ["a"])
+
+    def test_invalid_file_is_not_cached(self):
+        self.criteria.write_text("criteria:\n  a: {$points: [1]}\n", encoding="utf8")
+        for _ in range(2):
+            with self.assertRaises(CriteriaValidationError):
+                load_criteria(self.criteria, self.cache)
+        self.assertEqual(list(self.cache.directory.glob("*.pickle")), [])
+
+    def test_evicts_least_recently_used(self):
+        cache = CriteriaCache(self.root / "small", max_bytes=3500)
+        for index in range(3):
+            cache.put(f"file {index}".encode(), "criteria", "x" * 1000)
+            path = cache._path(f"file {index}".encode(), "criteria")
+            os.utime(path, (index, index))
+        cache.get(b"file 0", "criteria")  # refreshes the oldest entry
+        cache.put(b"file 3", "criteria", "x" * 1000)
+        self.assertIsNotNone(cache.get(b"file 0", "criteria"))
+        self.assertIsNone(cache.get(b"file 1", "criteria"))
+        self.assertIsNotNone(cache.get(b"file 3", "criteria"))
+
+    def test_cli_no_cache(self):
+        runner = CliRunner()
+        directory = self.root / "cli"
+        with mock.patch.dict(os.environ, {CACHE_DIR_ENV: str(directory)}):
+            result = runner.invoke(app, ["--no-cache", "json", str(self.criteria)])
+            self.assertEqual(result.exit_code, 0)
+            self.assertFalse(directory.exists())
+
+            for _ in range(2):
+                result = runner.invoke(app, [str(self.criteria)])
+                self.assertEqual(result.output.strip(), "4.5")
+            self.assertEqual(len(list(directory.glob("*.pickle"))), 1)
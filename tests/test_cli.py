@@ -57,6 +57,10 @@ class TestCli(TestCase):
         self.assertEqual(payload["points"]["got"], 9)
         self.assertEqual(payload["points"]["total"], 13)
         self.assertEqual(payload["points"]["bonus"], 2)
+        tests = payload["criteria"]["criteria"]["testing"]["tests"]
+        self.assertEqual(
+            tests["unit-testing"]["4"], {"$desc": "Four", "$points": [0.0, 1]}
+        )
 
     def test_schema_output(self):
         runner = CliRunner()
@@ -110,6 +114,27 @@ class TestCli(TestCase):
                 cli()
         self.assertEqual(exc.exception.code, 1)
 
+    def test_check_fail_fast(self):
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "criteria.yml"
+            items = "".join(
+                f"  item{index}:\n    $points: [1, 1]\n"
+                for index in range(5)
+            )
+            path.write_text(f"criteria:\n{items}", encoding="utf-8")
+
+            result = runner.invoke(app, ["check", "--fail-fast", str(path)])
+            self.assertEqual(result.exit_code, 1)
+            self.assertEqual(result.output.count("must be provided"), 1)
+            self.assertIn("Validation stopped after 1 error;", result.output)
+
+            result = runner.invoke(app, ["check", "--max-errors", "2", str(path)])
+            self.assertEqual(result.output.count("must be provided"), 2)
+
+            result = runner.invoke(app, ["check", str(path)])
+            self.assertEqual(result.output.count("must be provided"), 5)
+
     def test_update_command(self):
         runner = CliRunner()
         source = self.directory.joinpath("criteria.yml")
@@ -127,3 +152,47 @@ class TestCli(TestCase):
             self.assertIn("schema_version: 2", content)
             self.assertIn("max_points: -4", content)
             self.assertIn("awarded_points: -2", content)
+
+    def test_json_breakdown(self):
+        runner = CliRunner()
+        path = self.directory.joinpath("criteria.yml")
+        result = runner.invoke(app, ["json", str(path), "--breakdown"])
+
+        self.assertEqual(result.exit_code, 0)
+        breakdown = json.loads(result.output)["breakdown"]
+        self.assertEqual(
+            breakdown["sections"]["code.overall"],
+            {"got": 1.0, "total": 2.0, "bonus": 0.0},
+        )
+        self.assertEqual(breakdown["milestones"], {})
+
+    def test_json_with_results_overlay(self):
+        runner = CliRunner()
+        path = self.directory.joinpath("criteria.yml")
+        original = path.read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = Path(tmpdir, "results.json")
+            results.write_text(
+                json.dumps({"code.overall.dry": {"awarded_points": -9}}),
+                encoding="utf-8",
+            )
+            result = runner.invoke(
+                app, ["json", str(path), "--results", str(results)]
+            )
+
+            self.assertEqual(result.exit_code, 0)
+            payload = json.loads(result.stdout)
+            self.assertEqual(payload["points"]["got"], 4)
+            dry = payload["criteria"]["criteria"]["code"]["overall"]["dry"]
+            self.assertEqual(dry["$points"], [-5.0, -5])
+            self.assertEqual(path.read_text(encoding="utf-8"), original)
+
+            results.write_text(
+                json.dumps({"code.missing": {"awarded_points": 1}}),
+                encoding="utf-8",
+            )
+            result = runner.invoke(
+                app, ["json", str(path), "--results", str(results)]
+            )
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn("Unknown criterion in results: code.missing", result.output)
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase, skipUnless
+
+from typer.testing import CliRunner
+
+from StudentScore import Score, yaml
+from StudentScore.__main__ import app
+from StudentScore.formats import JSON, MSGPACK, YAML, detect_format, dumps, loads
+
+
+try:
+    import msgpack
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+dir_path = Path(__file__).resolve(strict=True).parent
+
+
+def _criteria():
+    with open(dir_path.joinpath("criteria.yml"), encoding="utf8") as handle:
+        return yaml.load(handle)
+
+
+class TestDetectFormat(TestCase):
+    def test_extension_wins(self):
+        self.assertEqual(detect_format("criteria.json", b"a: 1"), JSON)
+        self.assertEqual(detect_format("criteria.MSGPACK", b"{}"), MSGPACK)
+        self.assertEqual(detect_format("criteria.yml", b"{}"), YAML)
+
+    def test_sniffs_content(self):
+        self.assertEqual(detect_format(None, b'  {"criteria": {}}'), JSON)
+        self.assertEqual(detect_format("criteria", b"\x81\xa8criteria\x80"), MSGPACK)
+        self.assertEqual(detect_format("criteria", "criteria: {}\n".encode()), YAML)
+        self.assertEqual(detect_format(None, "# Critères\n".encode()), YAML)
+
+    def test_json_round_trip(self):
+        data = json.loads(json.dumps(_criteria()))  # JSON keys are strings
+        self.assertEqual(loads(dumps(data, JSON), JSON), data)
+
+
+class TestScoreFormats(TestCase):
+    def test_json_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, "criteria.json")
+            path.write_text(json.dumps(_criteria()), encoding="utf8")
+            self.assertEqual(Score(str(path)).mark, 4.5)
+            with path.open(encoding="utf8") as handle:
+                self.assertEqual(Score(handle).mark, 4.5)
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, "criteria")
+            path.write_bytes(msgpack.packb(_criteria()))
+            self.assertEqual(Score(str(path)).mark, 4.5)
+            with path.open("rb") as handle:
+                self.assertEqual(Score(handle).got, 9)
+
+    def test_cli_check_and_apply_json(self):
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, "criteria.json")
+            path.write_text(json.dumps(_criteria()), encoding="utf8")
+            result = runner.invoke(app, ["check", str(path)])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("OK, schema version 1", result.output)
+
+            results = Path(tmpdir, "results.json")
+            results.write_text(
+                json.dumps({"code.overall.dry": {"awarded_points": -2}}),
+                encoding="utf8",
+            )
+            result = runner.invoke(app, ["apply", str(results), str(path)])
+            self.assertEqual(result.exit_code, 0, result.output)
+            updated = json.loads(path.read_text(encoding="utf8"))
+            dry = updated["criteria"]["code"]["overall"]["dry"]
+            self.assertEqual(dry["$points"], [-2, -5])
+            self.assertEqual(runner.invoke(app, [str(path)]).output.strip(), "3.7")
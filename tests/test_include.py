@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore import Score, formats
+from StudentScore.__main__ import app
+from StudentScore.cache import CriteriaCache, load_document
+from StudentScore.schema import CriteriaValidationError
+
+
+ROOT = """\
+schema_version: 2
+criteria:
+  tests:
+    description: Tests
+    max_points: 4
+    awarded_points: 4
+  code: {include: shared/code.yml}
+"""
+
+CODE = """\
+# Shared between labs
+description: Code quality
+naming:
+  description: Naming
+  max_points: 2
+  awarded_points: 0
+style: {include: shared/style.yml}
+"""
+
+STYLE = """\
+indent:
+  description: Indentation
+  max_points: 1
+  awarded_points: 1
+"""
+
+
+class TestIncludes(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        (self.root / "shared").mkdir()
+        self.files = {
+            "criteria.yml": ROOT,
+            "shared/code.yml": CODE,
+            "shared/style.yml": STYLE,
+        }
+        for name, text in self.files.items():
+            (self.root / name).write_text(text, encoding="utf8")
+        self.criteria = self.root / "criteria.yml"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fragments_are_mounted(self):
+        score = Score(str(self.criteria))
+        self.assertEqual((score.got, score.total), (5, 7))
+        raw, _, source = load_document(self.criteria)
+        self.assertEqual(raw["criteria"]["code"]["style"]["indent"]["max_points"], 1)
+        mounts = [item.mount for item in source.walk()]
+        self.assertEqual(
+            mounts, [(), ("criteria", "code"), ("criteria", "code", "style")]
+        )
+
+    def test_cycle_is_reported(self):
+        (self.root / "shared/style.yml").write_text(
+            "loop: {include: shared/code.yml}\n", encoding="utf8"
+        )
+        with self.assertRaises(CriteriaValidationError) as ctx:
+            load_document(self.criteria)
+        self.assertIn("include cycle: criteria.yml -> code.yml", str(ctx.exception))
+
+    def test_missing_fragment(self):
+        (self.root / "shared/style.yml").unlink()
+        with self.assertRaises(CriteriaValidationError) as ctx:
+            load_document(self.criteria)
+        self.assertIn("criteria/code/style: cannot include", str(ctx.exception))
+
+    def test_fragments_outside_the_root_directory_are_refused(self):
+        lab = self.root / "lab"
+        lab.mkdir()
+        outside = self.root / "shared/style.yml"
+        for target in ("../shared/style.yml", str(outside)):
+            with self.subTest(target=target):
+                (lab / "criteria.yml").write_text(
+                    ROOT.replace("shared/code.yml", target), encoding="utf8"
+                )
+                with self.assertRaises(CriteriaValidationError) as ctx:
+                    load_document(lab / "criteria.yml")
+                self.assertIn(
+                    f"criteria/code: cannot include {target}: outside",
+                    str(ctx.exception),
+                )
+
+    def test_fragments_are_cached_separately(self):
+        cache = CriteriaCache(self.root / "cache")
+        load_document(self.criteria, cache)
+        (self.root / "shared/style.yml").write_text(
+            STYLE.replace("awarded_points: 1", "awarded_points: 0"), encoding="utf8"
+        )
+        with mock.patch("StudentScore.formats.loads", wraps=formats.loads) as parse:
+            _, normalized, _ = load_document(self.criteria, cache)
+        self.assertEqual(parse.call_count, 2)  # the root and the edited fragment
+        indent = normalized["criteria"]["code"]["style"]["indent"]
+        self.assertEqual(indent["$points"], [0.0, 1])
+
+    def test_apply_writes_into_fragments(self):
+        results = self.root / "results.json"
+        results.write_text(
+            json.dumps(
+                {
+                    "code.naming": {"awarded_points": 2, "rationale": "Clear"},
+                    "code.style.indent": {"awarded_points": 0},
+                }
+            ),
+            encoding="utf8",
+        )
+        result = CliRunner().invoke(app, ["apply", str(results), str(self.criteria)])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        self.assertEqual(self.criteria.read_text(encoding="utf8"), ROOT)
+        code = (self.root / "shared/code.yml").read_text(encoding="utf8")
+        self.assertTrue(code.startswith("# Shared between labs\n"))
+        self.assertIn("awarded_points: 2\n  rationale: Clear\n", code)
+        self.assertIn("style: {include: shared/style.yml}\n", code)
+        style = (self.root / "shared/style.yml").read_text(encoding="utf8")
+        self.assertEqual(style, STYLE.replace("awarded_points: 1", "awarded_points: 0"))
+        self.assertEqual(Score(str(self.criteria)).got, 6)
@@ -0,0 +1,189 @@
+import copy
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore.__main__ import app
+from StudentScore.apply import apply_results
+from StudentScore.incremental import IncrementalValidator, revalidate, watch
+from StudentScore.index import CriteriaIndex
+from StudentScore.schema import Criteria, CriteriaValidationError
+
+
+def _leaf(description, total):
+    return {"description": description, "max_points": total, "awarded_points": 0}
+
+
+def _rubric():
+    return {
+        "schema_version": 2,
+        "criteria": {
+            "code": {
+                "description": "Code",
+                "naming": _leaf("Naming", 2),
+                "style": _leaf("Style", 3),
+            },
+            "tests": {
+                "description": "Tests",
+                "unit": _leaf("Unit", 4),
+            },
+        },
+    }
+
+
+class TestIncrementalValidator(TestCase):
+    def setUp(self):
+        self.validator = IncrementalValidator()
+        self.first = self.validator.validate(_rubric())
+
+    def test_first_run_checks_everything(self):
+        self.assertEqual(self.first, Criteria(_rubric()))
+        self.assertEqual(len(self.validator.checked), 3)
+
+    def test_only_edited_leaves_are_checked(self):
+        data = _rubric()
+        data["criteria"]["code"]["style"]["awarded_points"] = 2
+        result = self.validator.validate(data)
+        self.assertEqual(result, Criteria(data))
+        self.assertEqual(self.validator.checked, ["criteria/code/style"])
+        self.assertEqual(self.validator.changed, ["criteria/code/style"])
+        # Untouched subtrees are shared with the previous result.
+        self.assertIs(result["criteria"]["tests"], self.first["criteria"]["tests"])
+
+        self.validator.validate(copy.deepcopy(data))
+        self.assertEqual((self.validator.checked, self.validator.changed), ([], []))
+
+    def test_section_edits_are_reported(self):
+        data = _rubric()
+        data["criteria"]["tests"]["description"] = "Unit tests"
+        del data["criteria"]["code"]["naming"]
+        self.validator.validate(data)
+        self.assertEqual(self.validator.checked, [])
+        self.assertEqual(self.validator.changed, ["criteria/code", "criteria/tests"])
+
+    def test_invalid_leaves_are_checked_again(self):
+        data = _rubric()
+        data["criteria"]["code"]["naming"]["awarded_points"] = 5
+        for _ in range(2):
+            with self.assertRaises(CriteriaValidationError):
+                self.validator.validate(data)
+            self.assertEqual(self.validator.checked, ["criteria/code/naming"])
+
+    def test_invalid_sections_are_checked_again(self):
+        data = _rubric()
+        data["criteria"]["tests"]["description"] = 42
+        with self.assertRaises(CriteriaValidationError):
+            self.validator.validate(data)
+        data["criteria"]["code"]["style"]["awarded_points"] = 1
+        with self.assertRaises(CriteriaValidationError) as context:
+            self.validator.validate(data)
+        self.assertIn("criteria/tests/description", str(context.exception))
+
+    def test_nested_sections_are_digested_once(self):
+        data = {"schema_version": 2, "criteria": {}}
+        section = data["criteria"]
+        path = [f"level-{depth}" for depth in range(50)]
+        for key in path:
+            section[key] = {"other": _leaf("Other", 1)}
+            section = section[key]
+        section["deep"] = _leaf("Deep", 1)
+        self.validator.validate(data)
+        section["deep"]["awarded_points"] = 1
+        with mock.patch(
+            "StudentScore.incremental.hashlib.blake2b", wraps=hashlib.blake2b
+        ) as blake2b:
+            self.validator.validate(data)
+        self.assertEqual(
+            self.validator.checked, ["/".join(["criteria", *path, "deep"])]
+        )
+        # One digest per section, and one per leaf of the edited sections.
+        self.assertEqual(blake2b.call_count, 51 + 51)
+
+    def test_schema_version_change_checks_everything(self):
+        data = _rubric()
+        data["schema_version"] = 1
+        with self.assertRaises(CriteriaValidationError):
+            self.validator.validate(data)
+
+
+class TestRevalidate(TestCase):
+    def setUp(self):
+        self.raw = _rubric()
+        self.normalized = Criteria(self.raw)
+        self.index = CriteriaIndex.from_raw(self.raw["criteria"])
+
+    def test_patches_applied_leaves(self):
+        updated, applied, _ = apply_results(
+            self.raw, {"code.style": {"awarded_points": 2}}, index=self.index
+        )
+        result = revalidate(updated, self.normalized, applied, index=self.index)
+        self.assertEqual(result, Criteria(updated))
+        self.assertIs(result["criteria"]["tests"], self.normalized["criteria"]["tests"])
+        self.assertEqual(
+            self.normalized["criteria"]["code"]["style"]["$points"], [0.0, 3]
+        )
+
+    def test_reports_invalid_edits(self):
+        self.raw["criteria"]["code"]["naming"]["rationale"] = 42
+        with self.assertRaises(CriteriaValidationError) as context:
+            revalidate(self.raw, self.normalized, ["code.naming"])
+        self.assertIn("criteria/code/naming/rationale", str(context.exception))
+
+    def test_keys_with_dots(self):
+        self.raw["criteria"]["v1.2"] = self.raw["criteria"].pop("tests")
+        normalized = Criteria(self.raw)
+        updated, applied, _ = apply_results(
+            self.raw, {"v1.2.unit": {"awarded_points": 3}}
+        )
+        result = revalidate(updated, normalized, applied)
+        self.assertEqual(result["criteria"]["v1.2"]["unit"]["$points"], [3, 4])
+
+
+class TestWatch(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "criteria.yml"
+        self.path.write_text(
+            "schema_version: 2\ncriteria:\n"
+            "  tests: {description: Tests, max_points: 4, awarded_points: 0}\n",
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _edit(self, old, new):
+        stat = self.path.stat()
+        self.path.write_text(
+            self.path.read_text(encoding="utf-8").replace(old, new), encoding="utf-8"
+        )
+        # Make sure the change is visible on coarse-grained file systems.
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_yields_after_each_change(self):
+        validator = IncrementalValidator()
+        results = watch(self.path, interval=0.01, validator=validator)
+        normalized, error = next(results)
+        self.assertIsNone(error)
+
+        self._edit("awarded_points: 0", "awarded_points: 9")
+        normalized, error = next(results)
+        self.assertIsNone(normalized)
+        self.assertIn(f"{self.path}:3:", str(error))
+
+        self._edit("awarded_points: 9", "awarded_points: 3")
+        normalized, error = next(results)
+        self.assertEqual(normalized["criteria"]["tests"]["$points"], [3.0, 4])
+        self.assertEqual(validator.checked, ["criteria/tests"])
+
+    def test_check_watch(self):
+        with mock.patch(
+            "StudentScore.incremental.time.sleep", side_effect=KeyboardInterrupt
+        ):
+            result = CliRunner().invoke(app, ["check", "--watch", str(self.path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("OK, schema version 2", result.output)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from StudentScore.index import CriteriaIndex
+from StudentScore.model import build_tree
+from StudentScore.schema import Criteria
+
+
+def _leaf(key, points):
+    return {"description": "Criterion", key: points, "awarded_points": 0}
+
+
+RAW = {
+    "code": {
+        "description": "Code quality",
+        "naming": _leaf("max_points", 2),
+        "style": {
+            "description": "Style",
+            "indent": _leaf("max_points", 1),
+            "braces": _leaf("max_points", 1),
+        },
+    },
+    "codec": {"speed": _leaf("bonus_points", 1)},
+    "tests": _leaf("max_points", 3),
+}
+IDS = [
+    "code.naming",
+    "code.style.indent",
+    "code.style.braces",
+    "codec.speed",
+    "tests",
+]
+
+
+class TestCriteriaIndex(TestCase):
+    def test_exact_lookup_and_ordinals(self):
+        index = CriteriaIndex.from_raw(RAW)
+        self.assertEqual(index.ids(), IDS)
+        self.assertIs(index["code.naming"], RAW["code"]["naming"])
+        self.assertEqual(index.ordinal("code.style.braces"), 2)
+        self.assertIn("tests", index)
+        self.assertNotIn("code.style", index)
+        self.assertIsNone(index.get("code.missing"))
+
+    def test_prefix_selection(self):
+        index = CriteriaIndex.from_raw(RAW)
+        ids = [cid for cid, _ in index.select("code.*")]
+        self.assertEqual(ids, IDS[:3])
+        self.assertEqual([cid for cid, _ in index.select("code.style")], ids[1:])
+        self.assertEqual([cid for cid, _ in index.select("tests")], ["tests"])
+        self.assertEqual(len(index.select("*")), 5)
+        self.assertEqual(index.select("cod"), [])
+
+    def test_tree_index_is_shared(self):
+        tree = build_tree(Criteria({"schema_version": 2, "criteria": RAW}))
+        self.assertIs(tree.index, tree.index)
+        self.assertIs(tree.find("code.style.indent"), tree.index["code.style.indent"])
+        self.assertEqual(tree.index.ids(), IDS)
@@ -0,0 +1,151 @@
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore import formats, yaml
+from StudentScore.__main__ import app
+from StudentScore.limits import Limits
+from StudentScore.schema import Criteria, CriteriaValidationError
+from StudentScore.stream import StreamFallback, stream_score
+
+
+def _billion_laughs(levels=9):
+    lines = ['a0: &a0 ["lol", "lol", "lol", "lol", "lol", "lol", "lol", "lol"]']
+    for level in range(1, levels):
+        aliases = ", ".join([f"*a{level - 1}"] * 8)
+        lines.append(f"a{level}: &a{level} [{aliases}]")
+    return "\n".join(lines) + "\n"
+
+
+def _nested(depth):
+    return "criteria:\n" + "".join(
+        f"{'  ' * (level + 1)}s{level}:\n" for level in range(depth)
+    ) + f"{'  ' * (depth + 1)}leaf: {{$desc: Leaf, $points: [1, 1]}}\n"
+
+
+class TestYamlLimits(TestCase):
+    def setUp(self):
+        self.loaders = {
+            "default": yaml.LimitedLoader,
+            "python": yaml._limited_loader(yaml.SafeLoader),
+        }
+
+    def _load(self, name, text, limits):
+        loader = self.loaders[name](text, limits)
+        try:
+            return loader.get_single_data()
+        finally:
+            loader.dispose()
+
+    def test_alias_bomb_is_rejected(self):
+        for name in self.loaders:
+            with self.subTest(loader=name):
+                with self.assertRaises(CriteriaValidationError) as context:
+                    self._load(name, _billion_laughs(), Limits())
+                self.assertIn("aliases expand to more than", str(context.exception))
+
+    def test_small_aliases_are_accepted(self):
+        text = "base: &base {max_points: 2}\nfirst: *base\nsecond: *base\n"
+        for name in self.loaders:
+            with self.subTest(loader=name):
+                # Each alias expands to a mapping, a key and a value.
+                data = self._load(name, text, Limits(max_aliases=6))
+                self.assertEqual(data["second"], {"max_points": 2})
+                with self.assertRaises(CriteriaValidationError):
+                    self._load(name, text, Limits(max_aliases=5))
+
+    def test_recursive_alias_is_rejected(self):
+        for name in self.loaders:
+            with self.subTest(loader=name):
+                with self.assertRaises(CriteriaValidationError) as context:
+                    self._load(name, "a: &a [1, *a]\n", Limits())
+                self.assertIn("refers to its own anchor", str(context.exception))
+
+    def test_depth_is_bounded(self):
+        text = "[" * 2000 + "]" * 2000
+        for name in self.loaders:
+            with self.subTest(loader=name):
+                with self.assertRaises(CriteriaValidationError) as context:
+                    self._load(name, text, Limits())
+                self.assertIn("deeper than 64 levels", str(context.exception))
+                self.assertIn("line 1", str(context.exception))
+        data = self._load("default", "[[[1]]]", Limits(max_depth=3))
+        self.assertEqual(data, [[[1]]])
+
+    def test_size_is_checked_before_parsing(self):
+        with self.assertRaises(CriteriaValidationError) as context:
+            formats.loads(b"{}" * 10, formats.JSON, limits=Limits(max_bytes=10))
+        self.assertIn("larger than 10 bytes", str(context.exception))
+
+
+class TestJsonLimits(TestCase):
+    def test_deep_document_is_a_limit_error(self):
+        text = '{"a": ' + "[" * 100_000 + "]" * 100_000 + "}"
+        with self.assertRaises(CriteriaValidationError) as context:
+            formats.loads(text, formats.JSON)
+        self.assertIn("deeper than 64 levels", str(context.exception))
+        with self.assertRaises(CriteriaValidationError) as context:
+            formats.loads(text, formats.JSON, limits=Limits(max_depth=None))
+        self.assertIn("deeper than the JSON parser supports", str(context.exception))
+
+    def test_size_is_checked_before_parsing(self):
+        with mock.patch("json.loads") as parse:
+            with self.assertRaises(CriteriaValidationError):
+                formats.loads("[" * 11, formats.JSON, limits=Limits(max_bytes=10))
+        parse.assert_not_called()
+
+
+class TestCriteriaLimits(TestCase):
+    def test_leaf_count(self):
+        data = {
+            "criteria": {
+                "a": {"$description": "A", "$points": [1, 1]},
+                "b": {"$description": "B", "$points": [1, 1]},
+            }
+        }
+        Criteria(data, limits=Limits(max_leaves=2))
+        with self.assertRaises(CriteriaValidationError) as context:
+            Criteria(data, limits=Limits(max_leaves=1))
+        self.assertIn("criteria/b: more than 1 criteria", str(context.exception))
+
+    def test_depth(self):
+        data = yaml.load(_nested(10))
+        # Root, criteria, ten sections and the leaf mapping.
+        Criteria(data, limits=Limits(max_depth=13))
+        with self.assertRaises(CriteriaValidationError):
+            Criteria(data, limits=Limits(max_depth=12))
+
+    def test_from_env(self):
+        limits = Limits.from_env("max_depth=8, max_leaves=none")
+        self.assertEqual(limits, Limits(max_depth=8, max_leaves=None))
+        with self.assertRaises(ValueError):
+            Limits.from_env("max_nodes=3")
+        with self.assertRaises(ValueError):
+            Limits.from_env("max_depth=deep")
+
+
+class TestLimitsCli(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_check_reports_alias_bomb(self):
+        path = self.root / "criteria.yml"
+        path.write_text(_billion_laughs(), encoding="utf-8")
+        result = CliRunner().invoke(app, ["--no-cache", "check", str(path)])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("aliases expand to more than", result.output)
+
+    def test_default_command_falls_back_on_deep_file(self):
+        path = self.root / "criteria.yml"
+        path.write_text(_nested(80), encoding="utf-8")
+        with self.assertRaises(StreamFallback):
+            stream_score(str(path))
+        result = CliRunner().invoke(app, [str(path)])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("deeper than 64 levels", str(result.exception))
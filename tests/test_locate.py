@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore import Score
+from StudentScore.__main__ import app
+from StudentScore.cache import load_document
+from StudentScore.schema import CriteriaValidationError
+
+
+INVALID = """\
+schema_version: 2
+criteria:
+  code:
+    description: Code
+    naming:
+      description: Naming
+      max_points: 2
+      awarded_points: 5
+    style:
+      max_points: 1
+      awarded_points: 0
+"""
+
+VALID = INVALID.replace("awarded_points: 5", "awarded_points: 1").replace(
+    "    style:\n", "    style:\n      description: Style\n"
+)
+
+
+class TestLocateErrors(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def _positions(self, error):
+        return {
+            "/".join(map(str, entry["loc"])): (entry["line"], entry["column"])
+            for entry in error.errors
+        }
+
+    def test_yaml_errors_get_line_and_column(self):
+        path = self._write("criteria.yml", INVALID)
+        with self.assertRaises(CriteriaValidationError) as context:
+            load_document(path)
+        error = context.exception
+        self.assertEqual(
+            self._positions(error),
+            {
+                "criteria/code/naming/max_points": (7, 7),
+                "criteria/code/style": (9, 5),
+            },
+        )
+        self.assertIn(f"{path}:7:7: criteria/code/naming", str(error))
+
+    def test_valid_files_are_not_composed(self):
+        path = self._write("criteria.yml", VALID)
+        with mock.patch("StudentScore.locate.yaml.compose") as compose:
+            load_document(path)
+            Score(str(path))
+        compose.assert_not_called()
+
+    def test_errors_in_fragments_point_into_them(self):
+        fragment = INVALID.split("  code:\n", 1)[1]
+        fragment = "\n".join(line[4:] for line in fragment.splitlines()) + "\n"
+        self._write("shared/code.yml", fragment)
+        path = self._write(
+            "criteria.yml",
+            "schema_version: 2\ncriteria:\n  code: {include: shared/code.yml}\n",
+        )
+        with self.assertRaises(CriteriaValidationError) as context:
+            Score(str(path))
+        entry = context.exception.errors[0]
+        self.assertEqual(entry["file"], str(self.root / "shared/code.yml"))
+        self.assertEqual((entry["line"], entry["column"]), (4, 3))
+
+    def test_json_errors_are_located(self):
+        data = {
+            "schema_version": 2,
+            "criteria": {"a": {"description": "A", "max_points": 2}},
+        }
+        path = self._write("criteria.json", json.dumps(data, indent=2))
+        with self.assertRaises(CriteriaValidationError) as context:
+            load_document(path)
+        # The missing key is reported on the criterion lacking it.
+        self.assertEqual(
+            self._positions(context.exception), {"criteria/a/awarded_points": (4, 5)}
+        )
+
+    def test_check_prints_locations(self):
+        path = self._write("criteria.yml", INVALID)
+        result = CliRunner().invoke(app, ["check", str(path)])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn(f"{path}:9:5:", result.output)
@@ -0,0 +1,163 @@
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore.__main__ import app
+from StudentScore.apply import apply_results
+from StudentScore.milestones import MilestoneIndex
+from StudentScore.model import build_tree
+from StudentScore.schema import Criteria
+
+
+def _leaf(description, total, milestone=None):
+    leaf = {"description": description, "max_points": total, "awarded_points": 0}
+    if milestone is not None:
+        leaf["milestone"] = milestone
+    return leaf
+
+
+def _rubric():
+    return {
+        "schema_version": 2,
+        "grading": {"sources": ["*.py"]},
+        "criteria": {
+            "description": "Lab",
+            "code": {
+                "description": "Code",
+                "naming": _leaf("Naming", 2, "mid"),
+                "style": _leaf("Style", 3, "mid"),
+            },
+            "tests": {
+                "description": "Tests",
+                "unit": _leaf("Unit", 4, "final"),
+                "smoke": _leaf("Smoke", 1, "mid"),
+                "docs": _leaf("Docs", 1),
+            },
+        },
+    }
+
+
+class TestMilestoneIndex(TestCase):
+    def setUp(self):
+        self.raw = _rubric()
+        self.index = MilestoneIndex.from_raw(self.raw["criteria"])
+
+    def test_names_and_ids(self):
+        self.assertEqual(self.index.names(), ["mid", "final"])
+        self.assertIn("final", self.index)
+        self.assertNotIn("nope", self.index)
+        self.assertEqual(
+            self.index.ids(["final", "mid"]),
+            ["code.naming", "code.style", "tests.unit", "tests.smoke"],
+        )
+
+    def test_view_copies_only_the_kept_paths(self):
+        view, kept = self.index.view(self.raw, ["final"])
+        self.assertEqual(kept, 1)
+        self.assertEqual(
+            view["criteria"],
+            {
+                "description": "Lab",
+                "tests": {"description": "Tests", "unit": _leaf("Unit", 4, "final")},
+            },
+        )
+        self.assertIs(view["grading"], self.raw["grading"])
+        self.assertIs(
+            view["criteria"]["tests"]["unit"], self.raw["criteria"]["tests"]["unit"]
+        )
+        self.assertEqual(self.raw, _rubric())
+
+    def test_view_of_several_milestones(self):
+        view, kept = self.index.view(self.raw, ["mid", "final"])
+        self.assertEqual(kept, 4)
+        # A section keeping all of its leaves is shared.
+        self.assertIs(view["criteria"]["code"], self.raw["criteria"]["code"])
+        self.assertEqual(
+            list(view["criteria"]["tests"]), ["description", "unit", "smoke"]
+        )
+
+    def test_view_drops_what_holds_no_leaf(self):
+        code = self.raw["criteria"]["code"]
+        code["empty"] = {"description": "Nothing yet"}
+        code["note"] = "stray"
+        index = MilestoneIndex.from_raw(self.raw["criteria"])
+        for names in (["mid"], ["mid", "final"]):
+            with self.subTest(names=names):
+                view, _ = index.view(self.raw, names)
+                self.assertEqual(
+                    view["criteria"]["code"],
+                    {
+                        "description": "Code",
+                        "naming": _leaf("Naming", 2, "mid"),
+                        "style": _leaf("Style", 3, "mid"),
+                    },
+                )
+
+    def test_view_of_unknown_milestone_is_empty(self):
+        view, kept = self.index.view(self.raw, ["nope"])
+        self.assertEqual((kept, view["criteria"]), (0, {"description": "Lab"}))
+
+    def test_tree_subtotals_follow_awards(self):
+        tree = build_tree(Criteria(self.raw))
+        index = MilestoneIndex.from_tree(tree)
+        self.assertEqual(index.points(["mid"]), {"mid": (0.0, 6.0, 0.0)})
+        apply_results(tree, {"tests.smoke": {"awarded_points": 1}})
+        self.assertEqual(index.points(["mid", "final"])["mid"], (1.0, 6.0, 0.0))
+
+        normalized = Criteria(self.raw)
+        view, _ = index.view(normalized, ["final"])
+        self.assertEqual(view, Criteria(self.index.view(self.raw, ["final"])[0]))
+
+
+class TestGradeMilestones(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "criteria.yml"
+        self.path.write_text(
+            "schema_version: 2\n"
+            "criteria:\n"
+            "  code:\n"
+            "    description: Code\n"
+            "    style: {description: Style, max_points: 3, awarded_points: 0,"
+            " milestone: a}\n"
+            "  tests: {description: Tests, max_points: 2, awarded_points: 0,"
+            " milestone: b}\n"
+            "  docs: {description: Docs, max_points: 1, awarded_points: 0}\n",
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_prompt_for_several_milestones(self):
+        result = CliRunner().invoke(
+            app, ["grade", str(self.path), "--milestone", "a", "--milestone", "b"]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("style", result.output)
+        self.assertIn("tests", result.output)
+        self.assertNotIn("docs", result.output)
+
+    def test_unknown_name_among_several(self):
+        result = CliRunner().invoke(
+            app, ["grade", str(self.path), "--milestone", "a", "--milestone", "c"]
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("milestone 'c'", result.output)
+
+    def test_llm_grading_reports_subtotals(self):
+        results = {
+            "code.style": {"awarded_points": 2, "rationale": "ok"},
+            "tests": {"awarded_points": 1, "rationale": "ok"},
+        }
+        with mock.patch("StudentScore.llm.grade_with_llm", return_value=results):
+            result = CliRunner().invoke(
+                app,
+                ["grade", "--llm", str(self.path), "--milestone", "a",
+                 "--milestone", "b"],
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Milestone a: 2/3", result.output)
+        self.assertIn("Milestone b: 1/2", result.output)
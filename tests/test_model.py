@@ -0,0 +1,91 @@
+from unittest import TestCase
+
+from StudentScore.apply import apply_results
+from StudentScore.conversion import upgrade_to_v2
+from StudentScore.model import Criterion, Section, build_tree
+from StudentScore.schema import Criteria
+
+
+def _criteria():
+    return Criteria(
+        {
+            "criteria": {
+                "code": {
+                    "$description": "Code quality",
+                    "dry": {
+                        "$description": "No repeated code",
+                        "$points": [-1, -5],
+                        "$milestone": "mid",
+                    },
+                    "style": {"$desc": ["Consistent", "style"], "$points": [2, 2]},
+                },
+                "extra": {"$description": "Extra", "$bonus": [1, 3]},
+            }
+        }
+    )
+
+
+class TestCriteriaTree(TestCase):
+    def test_nodes_are_slotted(self):
+        tree = build_tree(_criteria())
+        leaf = tree.find("code.dry")
+        self.assertIsInstance(leaf, Criterion)
+        self.assertIsInstance(tree.root.children["code"], Section)
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertEqual(leaf.awarded, -1.0)
+        self.assertEqual(leaf.available, -5.0)
+        self.assertEqual(leaf.id, "code.dry")
+
+    def test_descriptions_are_shared(self):
+        first = build_tree(_criteria()).find("code.dry")
+        second = build_tree(_criteria()).find("code.dry")
+        self.assertIs(first.description, second.description)
+
+    def test_section_subtotals(self):
+        tree = build_tree(_criteria())
+        self.assertEqual(tree.points, (2.0, 2.0, 1.0))
+        self.assertEqual(tree.root.children["code"].as_points(), (1.0, 2.0, 0.0))
+        self.assertEqual(tree.milestones["mid"].as_points(), (-1.0, 0.0, 0.0))
+
+    def test_set_points_patches_ancestors(self):
+        tree = build_tree(_criteria())
+        tree.set_points(tree.find("code.dry"), 0)
+        self.assertEqual(tree.root.children["code"].got, 2.0)
+        self.assertEqual(tree.points.got, 3.0)
+        self.assertEqual(tree.milestones["mid"].got, 0.0)
+
+    def test_round_trip_to_dict(self):
+        data = build_tree(_criteria()).to_dict()
+        self.assertEqual(data["criteria"]["code"]["dry"]["$points"], [-1.0, -5])
+        self.assertEqual(
+            data["criteria"]["code"]["style"]["$desc"], ["Consistent", "style"]
+        )
+        self.assertEqual(data, _criteria())
+        Criteria(data)  # should not raise
+
+    def test_description_keys_are_kept(self):
+        criteria = Criteria(
+            {
+                "criteria": {
+                    "code": {"$desc": "Code", "x": {"$desc": "X", "$points": [1, 1]}}
+                }
+            }
+        )
+        self.assertEqual(build_tree(criteria).to_dict(), criteria)
+
+    def test_apply_results_on_tree(self):
+        tree = build_tree(_criteria())
+        _, applied, unknown = apply_results(
+            tree, {"extra": {"awarded_points": 9, "rationale": "wow"}, "nope": {}}
+        )
+        self.assertEqual(applied, ["extra"])
+        self.assertEqual(unknown, ["nope"])
+        self.assertEqual(tree.find("extra").awarded, 3.0)
+        self.assertEqual(tree.points.bonus, 3.0)
+
+    def test_upgrade_from_tree(self):
+        converted = upgrade_to_v2(build_tree(_criteria()))
+        self.assertEqual(
+            converted["criteria"]["code"]["style"],
+            {"description": "Consistent\nstyle", "awarded_points": 2, "max_points": 2},
+        )
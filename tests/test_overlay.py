@@ -0,0 +1,138 @@
+import hashlib
+import json
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+from typer.testing import CliRunner
+
+from StudentScore import Score
+from StudentScore.__main__ import app
+from StudentScore.overlay import Overlay, Rubric, extract_overlay, is_overlay
+
+
+RUBRIC = """\
+schema_version: 2
+criteria:
+  tests:
+    description: Tests
+    max_points: 4
+    awarded_points: 0
+  code:
+    description: Code quality
+    naming:
+      description: Naming
+      max_points: 2
+      awarded_points: 0
+"""
+
+
+class TestOverlay(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.rubric_path = self.root / "rubric.yml"
+        self.rubric_path.write_text(RUBRIC, encoding="utf-8")
+        self.digest = "sha256:" + hashlib.sha256(RUBRIC.encode()).hexdigest()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rubric_id_is_file_hash(self):
+        self.assertEqual(Rubric.load(self.rubric_path).id, self.digest)
+
+    def test_score_merges_awards(self):
+        rubric = Rubric.load(self.rubric_path)
+        first = rubric.score(
+            {"rubric": self.digest, "awards": {"tests": {"awarded_points": 4}}}
+        )
+        second = rubric.score(Overlay({"code.naming": {"awarded_points": 1}}))
+        self.assertEqual(first.got, 4)
+        self.assertEqual(second.got, 1)
+        # The shared rubric is left untouched by both students.
+        self.assertEqual(rubric.score({}).got, 0)
+
+    def test_rejects_other_rubric_and_unknown_ids(self):
+        rubric = Rubric.load(self.rubric_path)
+        with self.assertRaises(ValueError):
+            rubric.score({"rubric": "sha256:00", "awards": {}})
+        with self.assertRaises(ValueError):
+            rubric.score({"missing": {"awarded_points": 1}})
+
+    def test_score_files(self):
+        paths = []
+        for got in (1, 2):
+            path = self.root / f"student{got}.json"
+            awards = {"tests": {"awarded_points": got}}
+            path.write_text(
+                json.dumps({"rubric": self.digest, "awards": awards}),
+                encoding="utf-8",
+            )
+            paths.append(path)
+        scores = dict(Rubric.load(self.rubric_path).score_files(paths))
+        self.assertEqual([scores[path].got for path in paths], [1, 2])
+
+    def test_extract_overlay(self):
+        base = Score(str(self.rubric_path)).tree
+        student = Score(str(self.rubric_path))
+        student.set_award("code.naming", 1.5, "Good names")
+        overlay = extract_overlay(base, student.tree, self.digest)
+        self.assertEqual(
+            overlay.to_dict(),
+            {
+                "rubric": self.digest,
+                "awards": {
+                    "code.naming": {"awarded_points": 1.5, "rationale": "Good names"}
+                },
+            },
+        )
+        self.assertTrue(is_overlay(overlay.to_dict()))
+        self.assertFalse(is_overlay({"tests": {"awarded_points": 1}}))
+
+    def test_extract_overlay_rejects_other_rubric(self):
+        base = Score(str(self.rubric_path)).tree
+        other = Score(
+            {"criteria": {"tests": {"$description": "Tests", "$points": [1, 3]}}}
+        ).tree
+        with self.assertRaises(ValueError) as context:
+            extract_overlay(base, other, self.digest)
+        self.assertIn("tests", str(context.exception))
+        self.assertIn("code.naming", str(context.exception))
+
+    def test_cli_round_trip(self):
+        student_path = self.root / "student.yml"
+        student_path.write_text(
+            RUBRIC.replace("awarded_points: 0\n", "awarded_points: 3\n", 1),
+            encoding="utf-8",
+        )
+        overlay_path = self.root / "awards.json"
+        runner = CliRunner()
+        result = runner.invoke(
+            app,
+            [
+                "overlay",
+                str(student_path),
+                "--rubric",
+                str(self.rubric_path),
+                "-o",
+                str(overlay_path),
+            ],
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(
+            json.loads(overlay_path.read_text(encoding="utf-8"))["awards"],
+            {"tests": {"awarded_points": 3}},
+        )
+
+        result = runner.invoke(
+            app, ["json", "--results", str(overlay_path), str(self.rubric_path)]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(json.loads(result.stdout)["points"]["got"], 3)
+
+        # The overlay names the base rubric, not the student copy.
+        result = runner.invoke(
+            app, ["json", "--results", str(overlay_path), str(student_path)]
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("was made for rubric", result.output)
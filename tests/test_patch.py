@@ -0,0 +1,92 @@
+from pathlib import Path
+import tempfile
+from unittest import TestCase
+
+from typer.testing import CliRunner
+
+from StudentScore import yaml
+from StudentScore.__main__ import app
+from StudentScore.apply import apply_results
+from StudentScore.patch import patch_yaml
+
+
+SOURCE = """\
+# Rubric for lab 3
+schema_version: 2
+criteria:
+  code:
+    description: Code quality  # shown to students
+    naming: {description: Naming, max_points: 2, awarded_points: 0}
+    dry:
+      description: No repeated code
+      max_points: -5
+      awarded_points: 0
+      rationale: |
+        Not graded yet.
+    tests:
+      description: Tests
+      max_points: 3
+      awarded_points: 0
+"""
+
+
+class TestPatchYaml(TestCase):
+    def _apply(self, results, text=SOURCE):
+        updated, _, _ = apply_results(yaml.load(text), results)
+        return updated, patch_yaml(text, updated)
+
+    def test_only_changed_values_are_written(self):
+        _, patched = self._apply({"code.tests": {"awarded_points": 2}})
+        head, _ = SOURCE.rsplit("awarded_points: 0", 1)
+        self.assertEqual(patched, head + "awarded_points: 2\n")
+
+    def test_rationales_are_spliced_and_inserted(self):
+        updated, patched = self._apply(
+            {
+                "code.naming": {"awarded_points": 1.5, "rationale": "Mostly clear"},
+                "code.dry": {"awarded_points": -1, "rationale": "One copy: paste"},
+                "code.tests": {"awarded_points": 3, "rationale": "All pass"},
+            }
+        )
+        self.assertEqual(yaml.load(patched), updated)
+        self.assertIn("# Rubric for lab 3\n", patched)
+        self.assertIn("Code quality  # shown to students\n", patched)
+        self.assertIn(
+            "naming: {description: Naming, max_points: 2, awarded_points: 1.5, "
+            "rationale: Mostly clear}",
+            patched,
+        )
+        self.assertIn('      rationale: "One copy: paste"\n    tests:', patched)
+        self.assertTrue(
+            patched.endswith("awarded_points: 3\n      rationale: All pass\n")
+        )
+
+    def test_unchanged_data_returns_text(self):
+        self.assertEqual(patch_yaml(SOURCE, yaml.load(SOURCE)), SOURCE)
+
+    def test_structural_changes_fall_back(self):
+        data = yaml.load(SOURCE)
+        del data["criteria"]["code"]["tests"]
+        self.assertIsNone(patch_yaml(SOURCE, data))
+
+        aliased = "a: &x {b: 1}\nc: *x\n"
+        self.assertIsNone(patch_yaml(aliased, {"a": {"b": 2}, "c": {"b": 2}}))
+
+
+class TestApplyKeepsLayout(TestCase):
+    def test_apply_command_keeps_comments(self):
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            criteria = Path(tmpdir, "criteria.yml")
+            criteria.write_text(SOURCE, encoding="utf-8")
+            results = Path(tmpdir, "results.json")
+            results.write_text(
+                '{"code.tests": {"awarded_points": 2}}', encoding="utf-8"
+            )
+
+            result = runner.invoke(app, ["apply", str(results), str(criteria)])
+
+            self.assertEqual(result.exit_code, 0, result.output)
+            text = criteria.read_text(encoding="utf-8")
+            self.assertTrue(text.startswith("# Rubric for lab 3\n"))
+            self.assertEqual(len(text.splitlines()), len(SOURCE.splitlines()))
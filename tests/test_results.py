@@ -0,0 +1,131 @@
+import json
+import os
+from pathlib import Path
+import tempfile
+from unittest import TestCase, mock
+
+from typer.testing import CliRunner
+
+from StudentScore.__main__ import app
+from StudentScore.results import ResultsError, is_jsonl, iter_jsonl
+
+
+CRITERIA = """\
+schema_version: 2
+criteria:
+  code:
+    description: Code
+    style: {description: Style, max_points: 3, awarded_points: 0}
+    naming: {description: Naming, max_points: 2, awarded_points: 0}
+"""
+
+
+class TestIterJsonl(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "results.jsonl"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_and_mappings(self):
+        self.path.write_text(
+            '{"id": "code.style", "awarded_points": 2}\n'
+            "\n"
+            '{"code.naming": {"awarded_points": 1}, "id": {"awarded_points": 0}}\n',
+            encoding="utf-8",
+        )
+        self.assertTrue(is_jsonl(self.path))
+        self.assertEqual(
+            list(iter_jsonl(self.path)),
+            [
+                ("code.style", {"awarded_points": 2}),
+                ("code.naming", {"awarded_points": 1}),
+                ("id", {"awarded_points": 0}),
+            ],
+        )
+
+    def test_errors_name_the_line(self):
+        self.path.write_text('{"a": {}}\n[1]\n', encoding="utf-8")
+        with self.assertRaises(ResultsError) as context:
+            list(iter_jsonl(self.path))
+        self.assertEqual(
+            str(context.exception), f"{self.path}:2: expected a JSON object"
+        )
+
+
+class TestApplySeveralResults(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.criteria = self.root / "criteria.yml"
+        self.criteria.write_text(CRITERIA, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = self.root / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def test_later_files_win_and_file_is_written_once(self):
+        tests = self._write(
+            "tests.json",
+            json.dumps(
+                {
+                    "code.style": {"awarded_points": 1, "rationale": "lint"},
+                    "code.naming": {"awarded_points": 1},
+                }
+            ),
+        )
+        manual = self._write(
+            "manual.jsonl", '{"id": "code.style", "awarded_points": 3}\n'
+        )
+        with mock.patch("StudentScore.bulk.write_back") as write:
+            result = CliRunner().invoke(
+                app, ["apply", tests, manual, str(self.criteria)]
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(write.call_count, 1)
+        updated = write.call_args.args[0]["criteria"]["code"]
+        # The override keeps the rationale it does not replace.
+        self.assertEqual(
+            updated["style"],
+            {
+                "description": "Style",
+                "max_points": 3,
+                "awarded_points": 3,
+                "rationale": "lint",
+            },
+        )
+        self.assertEqual(updated["naming"]["awarded_points"], 1)
+
+    def test_bad_stream_leaves_file_untouched(self):
+        good = self._write("good.json", '{"code.style": {"awarded_points": 1}}')
+        bad = self._write("bad.jsonl", '{"code.naming": {"awarded_points": 1}}\nx\n')
+        result = CliRunner().invoke(app, ["apply", good, bad, str(self.criteria)])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("bad.jsonl:2:", result.output)
+        self.assertEqual(self.criteria.read_text(encoding="utf-8"), CRITERIA)
+
+    def test_single_results_file_uses_default_criteria(self):
+        results = self._write("r.json", '{"code.style": {"awarded_points": 2}}')
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            result = CliRunner().invoke(app, ["apply", results])
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("awarded_points: 2", self.criteria.read_text(encoding="utf-8"))
+
+    def test_mark_of_the_merged_criteria(self):
+        results = self._write("r.json", '{"code.style": {"awarded_points": 3}}')
+        graded = self.root / "graded.yml"
+        result = CliRunner().invoke(
+            app, ["apply", "--mark", results, str(self.criteria), "-o", str(graded)]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output, "4\n")
+        self.assertEqual(CliRunner().invoke(app, [str(graded)]).output, "4\n")
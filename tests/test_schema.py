@@ -591,3 +591,45 @@ class TestCriteria(TestCase):
                 }
             )
         self.assertIn("grading requires schema_version 2", str(exc.exception))
+
+
+class TestMaxErrors(TestCase):
+    def _broken(self, count):
+        return {
+            "criteria": {
+                f"item{index}": {"$points": [1, 1]}
+                for index in range(count)
+            }
+        }
+
+    def test_stops_at_max_errors(self):
+        with self.assertRaises(CriteriaValidationError) as exc:
+            Criteria(self._broken(50), max_errors=3)
+        self.assertTrue(exc.exception.truncated)
+        self.assertEqual(
+            [error["loc"][1] for error in exc.exception.errors],
+            ["item0", "item1", "item2"],
+        )
+        self.assertIn("Validation stopped after 3 errors", str(exc.exception))
+
+    def test_exactly_max_errors_is_not_truncated(self):
+        with self.assertRaises(CriteriaValidationError) as exc:
+            Criteria(self._broken(3), max_errors=3)
+        self.assertFalse(exc.exception.truncated)
+        self.assertEqual(len(exc.exception.errors), 3)
+        self.assertNotIn("Validation stopped", str(exc.exception))
+
+        with self.assertRaises(CriteriaValidationError) as exc:
+            Criteria(self._broken(4), max_errors=3)
+        self.assertTrue(exc.exception.truncated)
+        self.assertEqual(len(exc.exception.errors), 3)
+
+    def test_unbounded_by_default(self):
+        with self.assertRaises(CriteriaValidationError) as exc:
+            Criteria(self._broken(50))
+        self.assertFalse(exc.exception.truncated)
+        self.assertEqual(len(exc.exception.errors), 50)
+
+    def test_rejects_non_positive_limit(self):
+        with self.assertRaises(ValueError):
+            Criteria(self._broken(1), max_errors=0)
@@ -1,7 +1,12 @@
 from pathlib import Path
-from unittest import TestCase
+import tempfile
+from unittest import TestCase, mock
 
 from StudentScore import Score
+from StudentScore.cache import CriteriaCache
+from StudentScore.fast import quick_score
+from StudentScore.schema import Criteria, CriteriaValidationError, NormalizedCriteria
+from StudentScore.stream import stream_score
 
 
 dir_path = Path(__file__).resolve(strict=True).parent
@@ -81,3 +86,185 @@ class TestScore(TestCase):
         self.assertEqual(data.points.got, 5)
         self.assertEqual(data.points.total, 4)
         self.assertEqual(data.points.bonus, 1)
+
+    def test_points_are_cached(self):
+        data = Score(
+            {"criteria": {"test": {"$description": "Description", "$points": [1, 2]}}}
+        )
+        self.assertIs(data.points, data.points)
+
+    def test_invalidate_after_in_place_change(self):
+        data = Score(
+            {"criteria": {"test": {"$description": "Description", "$points": [1, 2]}}}
+        )
+        self.assertEqual(data.got, 1)
+        data.data["criteria"]["test"]["$points"] = [2.0, 2]
+        self.assertEqual(data.got, 1)  # still cached
+        data.invalidate()
+        self.assertEqual(data.got, 2)
+
+    def test_reassigning_data_invalidates(self):
+        data = Score(
+            {"criteria": {"test": {"$description": "Description", "$points": [1, 2]}}}
+        )
+        self.assertEqual(data.total, 2)
+        data.data = {"criteria": {"test": {"$points": [3.0, 4]}}}
+        self.assertEqual(data.total, 4)
+
+    def test_normalized_criteria_skip_validation(self):
+        normalized = Criteria(
+            {"criteria": {"test": {"$description": "Description", "$points": [1, 2]}}}
+        )
+        self.assertIsInstance(normalized, NormalizedCriteria)
+        with mock.patch("StudentScore.score.Criteria") as validator:
+            self.assertEqual(Score(normalized).got, 1)
+            plain = Score.from_normalized(dict(normalized))
+            self.assertEqual(plain.total, 2)
+            validator.assert_not_called()
+        plain.set_award("test", 2)
+        self.assertEqual(normalized["criteria"]["test"]["$points"], [1, 2])
+
+    def test_apply_results_in_memory(self):
+        data = Score(
+            str(Path(__file__).resolve(strict=True).parent.joinpath("criteria.yml"))
+        )
+        self.assertEqual(data.got, 9)
+        applied, unknown = data.apply_results(
+            {
+                "code.overall.dry": {"awarded_points": -2, "rationale": "Repeats"},
+                "code.nope": {"awarded_points": 1},
+            }
+        )
+        self.assertEqual(applied, ["code.overall.dry"])
+        self.assertEqual(unknown, ["code.nope"])
+        self.assertEqual(data.got, 7)
+        dry = data.data["criteria"]["code"]["overall"]["dry"]
+        self.assertEqual(dry["$rationale"], "Repeats")
+
+    def test_set_award_updates_totals(self):
+        data = Score(
+            str(Path(__file__).resolve(strict=True).parent.joinpath("criteria.yml"))
+        )
+        self.assertEqual(data.got, 9)
+        points = data.set_award("code.overall.dry", -2)
+        self.assertEqual(points.got, 7)
+        self.assertEqual(data.got, 7)
+        self.assertEqual(data.total, 13)
+        dry = data.data["criteria"]["code"]["overall"]["dry"]
+        self.assertEqual(dry["$points"], [-2.0, -5])
+        data.invalidate()
+        self.assertEqual(data.got, 7)  # a full rebuild agrees
+
+    def test_set_award_bonus_and_rationale(self):
+        data = Score(
+            {
+                "criteria": {
+                    "work": {"$description": "Work", "$points": [1, 2]},
+                    "extra": {"$description": "Extra", "$bonus": [0, 2]},
+                }
+            }
+        )
+        data.set_award("extra", "50%", rationale="partial")
+        self.assertEqual(data.bonus, 1)
+        self.assertEqual(data.got, 2)
+        self.assertEqual(data.data["criteria"]["extra"]["$rationale"], "partial")
+
+    def test_set_award_rejects_invalid_points(self):
+        data = Score(
+            {"criteria": {"test": {"$description": "Description", "$points": [1, 2]}}}
+        )
+        with self.assertRaises(CriteriaValidationError):
+            data.set_award("test", 3)
+        with self.assertRaises(KeyError):
+            data.set_award("missing", 1)
+        self.assertEqual(data.got, 1)
+
+    def test_breakdown(self):
+        data = Score(
+            {
+                "schema_version": 2,
+                "criteria": {
+                    "code": {
+                        "style": {
+                            "description": "Style",
+                            "awarded_points": 1,
+                            "max_points": 2,
+                            "milestone": "mid",
+                        },
+                        "overall": {
+                            "dry": {
+                                "description": "DRY",
+                                "awarded_points": -1,
+                                "max_points": -3,
+                                "milestone": "mid",
+                            },
+                        },
+                    },
+                    "extra": {
+                        "description": "Extra",
+                        "awarded_points": 1,
+                        "bonus_points": 2,
+                    },
+                },
+            }
+        )
+        breakdown = data.breakdown()
+        self.assertEqual(breakdown["sections"]["code"], (0.0, 2.0, 0.0))
+        self.assertEqual(breakdown["sections"]["code.overall"], (-1.0, 0.0, 0.0))
+        self.assertEqual(breakdown["milestones"], {"mid": (0.0, 2.0, 0.0)})
+        data.set_award("code.style", 2)
+        breakdown = data.breakdown()
+        self.assertEqual(breakdown["sections"]["code"].got, 1)
+        self.assertEqual(breakdown["milestones"]["mid"].got, 1)
+
+    def test_leaf_with_points_and_bonus(self):
+        # Both pairs count, as they did before the tree model.
+        content = (
+            "criteria:\n"
+            "  test:\n"
+            "    $description: Description\n"
+            "    $points: [1, 2]\n"
+            "    $bonus: [1, 1]\n"
+        )
+        expected = (2.0, 2.0, 1.0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, "criteria.yml")
+            path.write_text(content, encoding="utf-8")
+            data = Score(str(path))
+            self.assertEqual(data.points, expected)
+            self.assertEqual(stream_score(str(path)).points, expected)
+            cache = CriteriaCache(Path(tmpdir, "cache"))
+            for _ in range(2):  # fills the cache, then reads from it
+                self.assertEqual(quick_score(path, cache).points, expected)
+            self.assertEqual(cache.get(path.read_bytes(), "points"), expected)
+
+        leaf = data.data["criteria"]["test"]
+        self.assertEqual((leaf["$points"], leaf["$bonus"]), ([1.0, 2], [1.0, 1]))
+        self.assertEqual(Score.from_normalized(data.data).points, expected)
+        self.assertEqual(data.set_award("test", 2), (3.0, 2.0, 1.0))
+
+    def test_set_award_on_leaf_with_points_and_bonus(self):
+        data = Score(
+            {
+                "criteria": {
+                    "test": {
+                        "$desc": "Description",
+                        "$points": [1, 2],
+                        "$bonus": [0, 1],
+                    }
+                }
+            }
+        )
+        self.assertEqual(data.set_award("test", 2), (2.0, 2.0, 0.0))
+        self.assertEqual(data.set_award("test", 1, bonus=True), (3.0, 2.0, 1.0))
+        self.assertEqual(data.data["criteria"]["test"]["$bonus"], [1.0, 1])
+        self.assertEqual(data.data["criteria"]["test"]["$points"], [2.0, 2])
+        self.assertEqual(data.set_award("test", 0, bonus=True), (2.0, 2.0, 0.0))
+        self.assertEqual(data.data["criteria"]["test"]["$bonus"], [0.0, 1])
+        with self.assertRaises(CriteriaValidationError):
+            data.set_award("test", 2, bonus=True)
+
+        plain = Score({"criteria": {"test": {"$desc": "Plain", "$points": [1, 2]}}})
+        with self.assertRaises(ValueError):
+            plain.set_award("test", 1, bonus=True)
+        self.assertEqual(plain.got, 1)
@@ -0,0 +1,140 @@
+import contextlib
+import io
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, mock
+
+import typer
+
+import StudentScore
+from StudentScore.__main__ import app
+from StudentScore.fast import COMMANDS, run
+
+
+ROOT = Path(StudentScore.__file__).resolve().parent.parent
+CRITERIA = Path(__file__).resolve().parent / "criteria.yml"
+# Modules the fast path must not import: the application and, when the score
+# is cached, the YAML parser.
+APPLICATION = ("typer", "click", "StudentScore.commands")
+
+
+class StartupTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        shutil.copy(CRITERIA, self.root / "criteria.yml")
+        self.env = dict(
+            os.environ,
+            PYTHONPATH=str(ROOT),
+            STUDENTSCORE_CACHE_DIR=str(self.root / "cache"),
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _importtime(self, *args):
+        """Return the output and ``{module: cumulative µs}`` of a Python run."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=self.root,
+            env=self.env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                # Nested imports are indented; top-level ones hold the totals.
+                depth = len(name) - len(name.lstrip()) - 1
+                modules[name.strip()] = (depth, int(cumulative))
+        return result.stdout, modules
+
+    def _total(self, *args):
+        """Return the best of three total import times of a Python run, in µs."""
+        totals = []
+        for _ in range(3):
+            _, modules = self._importtime(*args)
+            totals.append(sum(time for depth, time in modules.values() if not depth))
+        return min(totals)
+
+
+class TestImportTime(StartupTestCase):
+    def test_cached_score_skips_application_and_parser(self):
+        self._importtime("-m", "StudentScore")  # fills the cache
+        output, modules = self._importtime("-m", "StudentScore", "-v")
+        self.assertEqual(output.splitlines()[-1], "4.5")
+        for name in (*APPLICATION, "yaml", "StudentScore.score"):
+            self.assertNotIn(name, modules)
+
+    def test_check_skips_application(self):
+        output, modules = self._importtime("-m", "StudentScore", "check")
+        self.assertEqual(output, "OK, schema version 1\n")
+        for name in APPLICATION:
+            self.assertNotIn(name, modules)
+
+    def test_other_commands_load_the_application(self):
+        output, modules = self._importtime("-m", "StudentScore", "json")
+        self.assertIn('"mark": 4.5', output)
+        self.assertIn("StudentScore.commands", modules)
+        self.assertNotIn("StudentScore.bulk", modules)
+
+    def test_budget(self):
+        # Relative to the interpreter's own startup and to the application,
+        # measured on the same machine, so that the budget holds anywhere.
+        self._importtime("-m", "StudentScore")
+        startup = self._total("-c", "import runpy")
+        interpreter = self._total("-c", "pass")
+        application = self._total("-c", "import StudentScore.commands")
+        fast = self._total("-m", "StudentScore")
+        self.assertLess(fast - startup, 0.8 * (application - interpreter))
+
+
+class TestFastPath(StartupTestCase):
+    def _run(self, *argv):
+        output = io.StringIO()
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            with contextlib.redirect_stdout(output):
+                with mock.patch.dict(os.environ, self.env):
+                    handled = run(list(argv))
+        finally:
+            os.chdir(cwd)
+        return handled, output.getvalue()
+
+    def test_default_command(self):
+        self.assertEqual(self._run("--no-cache"), (True, "4.5\n"))
+        self.assertEqual(
+            self._run("criteria.yml", "--verbose"),
+            (True, "Got 9 points + 2 points out of 13 points\n4.5\n"),
+        )
+
+    def test_check(self):
+        self.assertEqual(
+            self._run("-v", "check", "criteria.yml"), (True, "OK, schema version 1\n")
+        )
+
+    def test_everything_else_is_left_to_the_application(self):
+        (self.root / "bad.yml").write_text("criteria: [1]\n", encoding="utf-8")
+        for argv in (
+            ["json"],
+            ["missing.yml"],
+            ["check", "bad.yml"],
+            ["check", "--fail-fast", "criteria.yml"],
+            ["--debug", "criteria.yml"],
+            ["criteria.yml", "criteria.yml"],
+        ):
+            with self.subTest(argv=argv):
+                self.assertEqual(self._run(*argv), (False, ""))
+
+    def test_commands_match_the_application(self):
+        commands = typer.main.get_command(app).commands
+        self.assertEqual(set(commands) - {"__default__"}, COMMANDS)
@@ -0,0 +1,76 @@
+import io
+from pathlib import Path
+from unittest import TestCase
+
+from StudentScore import Score
+from StudentScore.stream import StreamFallback, stream_score
+
+
+dir_path = Path(__file__).resolve(strict=True).parent
+
+V2 = """\
+schema_version: 2
+grading:
+  context: Be fair.
+criteria:
+  description: Lab
+  code:
+    description: Code
+    style:
+      description: Style
+      awarded_points: 3
+      max_points: 4
+      rationale: |
+        A very long rationale
+        spanning several lines.
+    dup:
+      description: Duplication
+      awarded_points: -1
+      max_points: -5
+  extra:
+    description: Extra
+    awarded_points: 50%
+    bonus_points: 2
+"""
+
+
+class TestStreamScore(TestCase):
+    def test_matches_full_loader_on_fixtures(self):
+        for name in ("criteria.yml", "criteria-neg.yml", "criteria-percent.yml"):
+            path = str(dir_path.joinpath(name))
+            with self.subTest(name=name):
+                self.assertEqual(stream_score(path).points, Score(path).points)
+
+    def test_v2_document(self):
+        summary = stream_score(io.StringIO(V2))
+        self.assertEqual(summary.points, Score(io.StringIO(V2)).points)
+        self.assertEqual(summary.points, (3.0, 4.0, 1.0))
+        self.assertEqual(summary.mark, 4.8)
+
+    def test_falls_back_on_aliases(self):
+        text = (
+            "criteria:\n"
+            "  a: &item {$description: A, $points: [1, 2]}\n"
+            "  b: *item\n"
+        )
+        with self.assertRaises(StreamFallback):
+            stream_score(io.StringIO(text))
+
+    def test_falls_back_on_invalid_criteria(self):
+        text = "criteria:\n  a: {$description: A, $points: [3, 2]}\n"
+        with self.assertRaises(StreamFallback):
+            stream_score(io.StringIO(text))
+
+    def test_falls_back_on_late_schema_version(self):
+        text = V2.replace("schema_version: 2\n", "") + "schema_version: 2\n"
+        with self.assertRaises(StreamFallback):
+            stream_score(io.StringIO(text))
+
+    def test_falls_back_on_duplicate_keys(self):
+        text = (
+            "criteria:\n"
+            "  a: {$description: A, $points: [1, 2]}\n"
+            "  a: {$description: A, $points: [2, 2]}\n"
+        )
+        with self.assertRaises(StreamFallback):
+            stream_score(io.StringIO(text))
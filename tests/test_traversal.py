@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from StudentScore import Score
+from StudentScore.limits import UNLIMITED
+from StudentScore.schema import Criteria
+from StudentScore.traversal import (
+    ENTER,
+    LEAF,
+    LEAVE,
+    VALUE,
+    Visitor,
+    is_raw_leaf,
+    iter_leaves,
+    iter_tree,
+    walk,
+)
+
+
+def _deep(depth):
+    node = {"leaf": {"$description": "Leaf", "$points": [1, 2]}}
+    for level in range(depth):
+        node = {"$description": f"Level {level}", "next": node}
+    return {"criteria": node}
+
+
+class _Counter(Visitor):
+    def __init__(self):
+        self.sections = 0
+        self.leaves = 0
+
+    def enter_section(self, path, key, node):
+        self.sections += 1
+
+    def visit_leaf(self, path, key, node):
+        self.leaves += 1
+
+
+class TestTraversal(TestCase):
+    def test_events_in_document_order(self):
+        tree = {
+            "description": "Root",
+            "a": {"x": {"description": "X", "awarded_points": 1, "max_points": 2}},
+            "b": {"description": "B", "awarded_points": 0, "bonus_points": 1},
+        }
+        events = [(event, path) for event, path, _, _ in iter_tree(tree)]
+        self.assertEqual(
+            events,
+            [
+                (ENTER, ()),
+                (VALUE, ("description",)),
+                (ENTER, ("a",)),
+                (LEAF, ("a", "x")),
+                (LEAVE, ("a",)),
+                (LEAF, ("b",)),
+                (LEAVE, ()),
+            ],
+        )
+
+    def test_prune_turns_nodes_into_values(self):
+        tree = {"description": {"not": "a section"}, "a": {"$points": [1, 2]}}
+        leaves = list(
+            iter_leaves(tree, prune=lambda path, key, node: key == "description")
+        )
+        self.assertEqual([path for path, _ in leaves], [("a",)])
+
+    def test_walk_feeds_several_visitors(self):
+        first, second = _Counter(), _Counter()
+        walk(_deep(3)["criteria"], first, second, is_leaf=is_raw_leaf)
+        self.assertEqual((first.sections, first.leaves), (4, 1))
+        self.assertEqual((second.sections, second.leaves), (4, 1))
+
+    def test_deep_rubric_does_not_recurse(self):
+        data = _deep(2000)
+        score = Score(Criteria(data, limits=UNLIMITED))
+        self.assertEqual(score.got, 1)
+        self.assertEqual(len(score.breakdown()["sections"]), 2000)
@@ -0,0 +1,38 @@
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+from StudentScore import yaml
+
+
+dir_path = Path(__file__).resolve(strict=True).parent
+HAS_LIBYAML = bool(getattr(yaml._yaml, "__with_libyaml__", False))
+
+
+class TestBackend(TestCase):
+    def test_python_backend(self):
+        backend, loader, dumper = yaml._select_backend("python")
+        self.assertEqual(backend, "python")
+        self.assertIs(loader, yaml.SafeLoader)
+        self.assertIs(dumper, yaml.SafeDumper)
+
+    def test_auto_prefers_libyaml(self):
+        backend, loader, _ = yaml._select_backend(None)
+        self.assertEqual(backend, "c" if HAS_LIBYAML else "python")
+        expected = "CSafeLoader" if HAS_LIBYAML else "SafeLoader"
+        self.assertEqual(loader.__name__, expected)
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ImportError):
+            yaml._select_backend("fast")
+
+    @skipUnless(HAS_LIBYAML, "PyYAML built without libyaml")
+    def test_backends_agree(self):
+        text = dir_path.joinpath("criteria.yml").read_text(encoding="utf8")
+        _, c_loader, c_dumper = yaml._select_backend("c")
+        _, py_loader, py_dumper = yaml._select_backend("python")
+        data = yaml.load(text, Loader=c_loader)
+        self.assertEqual(data, yaml.load(text, Loader=py_loader))
+        self.assertEqual(
+            yaml.dump(data, Dumper=c_dumper, sort_keys=False),
+            yaml.dump(data, Dumper=py_dumper, sort_keys=False),
+        )